@@ -0,0 +1,197 @@
+import datetime
+
+from attendance_store import ATTENDANCE_COLUMNS, normalize_emp_id
+from reports import DATE_FORMAT, finish_report, report_columns
+
+# Cell values: one byte per employee per day
+NOT_RECORDED = 0
+PRESENT = 1
+ABSENT = 2
+_CODES = {"P": PRESENT, "A": ABSENT}
+
+STREAK_COLUMNS = ["Employee ID", "Employee Name", "Present", "Absent", "Attendance %",
+                  "Longest Absence", "Current Absence"]
+
+
+class AttendanceMatrix:
+    """Attendance as a uint8 employees x days matrix of NOT_RECORDED / PRESENT / ABSENT
+    
+    Rows are (Employee ID, Employee Name) pairs, as in the reports, and
+    columns are consecutive calendar days from first_day. Compared with the
+    five object columns of the attendance DataFrame this takes one byte per
+    employee-day, and counts, percentages and streaks become vectorized NumPy
+    reductions over a slice of columns.
+    
+    A day marked more than once keeps its last status, and rows whose date
+    or status cannot be read are left out. Both are counted (duplicates,
+    skipped); only when they are zero does report() match the row-based
+    report exactly, which ``exact`` tells.
+    """
+    
+    def __init__(self, employee_ids, employee_names, first_day, cells, duplicates=0, skipped=0):
+        self.employee_ids = employee_ids
+        self.employee_names = employee_names
+        self.first_day = first_day
+        self.cells = cells
+        self.duplicates = duplicates
+        self.skipped = skipped
+    
+    @property
+    def exact(self):
+        return not self.duplicates and not self.skipped
+    
+    @classmethod
+    def from_chunks(cls, chunks):
+        """Build the matrix from row chunks in ATTENDANCE_COLUMNS order (e.g. Repository.iter_attendance())
+        
+        Each chunk is reduced to three small integer arrays before the next
+        one is read, so the full history is never held as a DataFrame.
+        """
+        import numpy as np
+        import pandas as pd
+        
+        keys = {}
+        parts = []
+        skipped = 0
+        epoch = pd.Timestamp("1970-01-01")
+        for chunk in chunks:
+            df = chunk if hasattr(chunk, "columns") else pd.DataFrame(chunk, columns=ATTENDANCE_COLUMNS)
+            dates = pd.to_datetime(df["Date"].astype(str), format=DATE_FORMAT, errors="coerce")
+            codes = df["Status"].map(_CODES)
+            valid = dates.notna() & codes.notna() & df["Employee Name"].notna()
+            skipped += int((~valid).sum())
+            df, dates, codes = df[valid], dates[valid], codes[valid]
+            
+            # Factorize within the chunk, then map only its distinct employees to matrix rows
+            local, pairs = pd.factorize(pd.MultiIndex.from_arrays([df["Employee ID"], df["Employee Name"]]))
+            rows = np.fromiter((keys.setdefault((normalize_emp_id(emp_id), str(name)), len(keys)) for emp_id, name in pairs),
+                               dtype=np.int32, count=len(pairs))
+            ordinals = rows[local]
+            days = ((dates - epoch).dt.days).to_numpy(dtype=np.int32)
+            parts.append((ordinals, days, codes.to_numpy(dtype=np.uint8)))
+        
+        if not keys:
+            return cls([], [], None, np.zeros((0, 0), dtype=np.uint8), skipped=skipped)
+        
+        ordinals = np.concatenate([part[0] for part in parts])
+        days = np.concatenate([part[1] for part in parts])
+        codes = np.concatenate([part[2] for part in parts])
+        first = int(days.min())
+        days -= first
+        
+        cells = np.zeros((len(keys), int(days.max()) + 1), dtype=np.uint8)
+        # With repeated (row, day) pairs NumPy keeps the last assignment, i.e. the latest mark
+        cells[ordinals, days] = codes
+        duplicates = len(codes) - int(np.count_nonzero(cells))
+        
+        ids = [emp_id for emp_id, _ in keys]
+        names = [name for _, name in keys]
+        return cls(ids, names, datetime.date(1970, 1, 1) + datetime.timedelta(days=first), cells, duplicates, skipped)
+    
+    @classmethod
+    def from_frame(cls, df):
+        return cls.from_chunks([df[ATTENDANCE_COLUMNS]])
+    
+    @property
+    def nbytes(self):
+        return self.cells.nbytes
+    
+    def day_columns(self, start=None, end=None):
+        """Slice of day columns inside [start, end]"""
+        if self.first_day is None:
+            return slice(0, 0)
+        first = 0 if start is None else max((start - self.first_day).days, 0)
+        last = self.cells.shape[1] if end is None else max((end - self.first_day).days + 1, 0)
+        return slice(first, max(first, last))
+    
+    def days_present(self, start=None, end=None):
+        """Present days per employee row in [start, end]"""
+        return (self.cells[:, self.day_columns(start, end)] == PRESENT).sum(axis=1)
+    
+    def days_absent(self, start=None, end=None):
+        return (self.cells[:, self.day_columns(start, end)] == ABSENT).sum(axis=1)
+    
+    def attendance_percentage(self, start=None, end=None):
+        """Present days as a percentage of recorded days per row, 0.0 for rows with no records"""
+        import numpy as np
+        
+        present = self.days_present(start, end)
+        total = present + self.days_absent(start, end)
+        return np.round(np.divide(present * 100.0, total, out=np.zeros(len(total)), where=total > 0), 1)
+    
+    def absence_streaks(self, start=None, end=None):
+        """Return (longest, current) runs of consecutive absences per row
+        
+        Only working days count: days on which nobody has a record (weekends,
+        holidays) neither extend nor break a streak.
+        """
+        import numpy as np
+        
+        cells = self.cells[:, self.day_columns(start, end)]
+        cells = cells[:, (cells != NOT_RECORDED).any(axis=0)]
+        if not cells.size:
+            zeros = np.zeros(cells.shape[0], dtype=np.int64)
+            return zeros, zeros
+        
+        absent = cells == ABSENT
+        count = np.cumsum(absent, axis=1, dtype=np.int32)
+        # At every non-absent day remember the running count; a streak is the count since the last one
+        last_break = np.maximum.accumulate(np.where(absent, 0, count), axis=1)
+        runs = count - last_break
+        return runs.max(axis=1), runs[:, -1]
+    
+    def report(self, start=None, end=None, by_month=False):
+        """The attendance report (see reports.attendance_report) computed from the matrix"""
+        import numpy as np
+        import pandas as pd
+        
+        columns = self.day_columns(start, end)
+        cells = self.cells[:, columns]
+        if by_month and cells.size:
+            first = self.first_day + datetime.timedelta(days=columns.start)
+            months = np.array([(first + datetime.timedelta(days=i)).strftime("%Y-%m") for i in range(cells.shape[1])])
+            bounds = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+            present = np.add.reduceat((cells == PRESENT).astype(np.int32), bounds, axis=1)
+            absent = np.add.reduceat((cells == ABSENT).astype(np.int32), bounds, axis=1)
+            rows, cols = np.nonzero(present + absent)
+            report = pd.DataFrame({
+                "Employee ID": np.array(self.employee_ids, dtype=object)[rows],
+                "Employee Name": np.array(self.employee_names, dtype=object)[rows],
+                "Month": months[bounds][cols],
+                "Present": present[rows, cols],
+                "Absent": absent[rows, cols],
+            })
+        else:
+            present = (cells == PRESENT).sum(axis=1)
+            absent = (cells == ABSENT).sum(axis=1)
+            rows = np.flatnonzero(present + absent)
+            report = pd.DataFrame({
+                "Employee ID": np.array(self.employee_ids, dtype=object)[rows],
+                "Employee Name": np.array(self.employee_names, dtype=object)[rows],
+                "Present": present[rows],
+                "Absent": absent[rows],
+            })
+        
+        if report.empty:
+            return pd.DataFrame(columns=report_columns(by_month))
+        return finish_report(report, by_month)
+    
+    def streak_report(self, start=None, end=None):
+        """Per employee: days present and absent, attendance % and the longest and current absence streaks"""
+        import numpy as np
+        import pandas as pd
+        
+        present = self.days_present(start, end)
+        absent = self.days_absent(start, end)
+        longest, current = self.absence_streaks(start, end)
+        rows = np.flatnonzero(present + absent)
+        report = pd.DataFrame({
+            "Employee ID": np.array(self.employee_ids, dtype=object)[rows],
+            "Employee Name": np.array(self.employee_names, dtype=object)[rows],
+            "Present": present[rows],
+            "Absent": absent[rows],
+            "Attendance %": self.attendance_percentage(start, end)[rows],
+            "Longest Absence": longest[rows],
+            "Current Absence": current[rows],
+        }, columns=STREAK_COLUMNS)
+        return report.sort_values(["Longest Absence", "Current Absence"], ascending=False, kind="stable").reset_index(drop=True)
@@ -0,0 +1,140 @@
+import csv
+import datetime
+import json
+import os
+import shutil
+import threading
+from urllib.parse import quote
+
+from attendance_store import ATTENDANCE_COLUMNS
+from reports import DATE_FORMAT
+
+# Partition of rows whose date does not parse; range queries never match them
+UNDATED = "undated"
+
+
+def month_key(date):
+    """YYYY-MM partition key of a DD-MM-YYYY date"""
+    if hasattr(date, "strftime"):
+        return date.strftime("%Y-%m")
+    try:
+        return datetime.datetime.strptime(str(date).strip(), DATE_FORMAT).strftime("%Y-%m")
+    except ValueError:
+        return UNDATED
+
+
+class AttendancePartitions:
+    """Attendance rows split into one small CSV per key (e.g. per employee) in a sidecar directory
+    
+    A view that only needs one key reads that key's file, so its cost depends
+    on the size of the partition and not on the size of the whole history.
+    Like AttendanceSummary, the directory records the signature of the
+    attendance data it was built from and is rebuilt when that no longer
+    matches.
+    
+    The manifest doubles as a catalog of the partitions and their row counts,
+    so a query can pick the keys it needs (for example the months overlapping
+    a date range) without listing or opening the others.
+    """
+    
+    MANIFEST = "index.json"
+    # Bumped when the partition keys change; partitions built by older versions are rebuilt
+    FORMAT = 2
+    
+    def __init__(self, directory, column, key):
+        self.directory = directory
+        self.column = column
+        self.key = key
+        self._lock = threading.RLock()
+    
+    def _manifest_path(self):
+        return os.path.join(self.directory, self.MANIFEST)
+    
+    def _path(self, key):
+        # Quote the key so any ID is a valid, distinct file name
+        return os.path.join(self.directory, quote(str(key), safe="") + ".csv")
+    
+    def _manifest(self):
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+    
+    def _write_manifest(self, signature, partitions):
+        path = self._manifest_path()
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump({"format": self.FORMAT, "signature": signature, "column": self.column, "partitions": partitions}, file)
+        os.replace(temp_path, path)
+    
+    def is_current(self, signature):
+        """Check whether the partitions describe the attendance data with this signature"""
+        manifest = self._manifest()
+        return manifest.get("format") == self.FORMAT and manifest.get("signature") == json.loads(json.dumps(signature))
+    
+    def mark_current(self, signature):
+        """Record that the data changed on disk without its content changing (e.g. after compaction)"""
+        with self._lock:
+            self._write_manifest(signature, self.catalog())
+    
+    def catalog(self):
+        """Return {key: row count} for every partition"""
+        return self._manifest().get("partitions", {})
+    
+    def add(self, records, signature):
+        """Append newly saved records to their partitions; signature is that of the data after the append"""
+        groups = {}
+        for record in records:
+            groups.setdefault(self.key(record[self.column]), []).append(record)
+        
+        with self._lock:
+            partitions = self.catalog()
+            for key, rows in groups.items():
+                path = self._path(key)
+                new_file = not os.path.exists(path)
+                with open(path, "a", newline="", encoding="utf-8") as file:
+                    writer = csv.DictWriter(file, fieldnames=ATTENDANCE_COLUMNS, extrasaction="ignore")
+                    if new_file:
+                        writer.writeheader()
+                    writer.writerows(rows)
+                partitions[str(key)] = partitions.get(str(key), 0) + len(rows)
+            self._write_manifest(signature, partitions)
+    
+    def rebuild(self, df, signature):
+        """Split the full attendance history into partitions"""
+        with self._lock:
+            self.clear()
+            os.makedirs(self.directory)
+            partitions = {}
+            if not df.empty:
+                keys = df[self.column].map(self.key)
+                for key, rows in df[ATTENDANCE_COLUMNS].groupby(keys, sort=False):
+                    rows.to_csv(self._path(key), index=False, encoding="utf-8")
+                    partitions[str(key)] = len(rows)
+            self._write_manifest(signature, partitions)
+    
+    def read(self, key):
+        """Read one partition; IDs and dates come back as text, exactly as stored"""
+        import pandas as pd
+        
+        with self._lock:
+            path = self._path(key)
+            if not os.path.exists(path):
+                return pd.DataFrame(columns=ATTENDANCE_COLUMNS)
+            return pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8")
+    
+    def read_many(self, keys):
+        """Read several partitions as one DataFrame, in the order given"""
+        import pandas as pd
+        
+        frames = [self.read(key) for key in keys]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=ATTENDANCE_COLUMNS)
+        return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    
+    def clear(self):
+        with self._lock:
+            if os.path.isdir(self.directory):
+                shutil.rmtree(self.directory)
@@ -0,0 +1,326 @@
+import csv
+import itertools
+import os
+
+from concurrency import FileLock
+from file_utils import file_signature
+
+ATTENDANCE_COLUMNS = ["Date", "Time", "Employee ID", "Employee Name", "Status"]
+# Times read() starts over when the files change under it before settling for what it read
+READ_ATTEMPTS = 3
+# The journal is due for compaction once it holds this share of the workbook's rows (and at
+# least compact_threshold rows), so rewriting the workbook costs a constant amount per saved row
+COMPACT_RATIO = 0.5
+# Bumped when the parsed frame changes shape, so older pickle sidecars are ignored
+SIDECAR_VERSION = 2
+# Employee IDs are text: "007" must not come back as 7
+ID_DTYPES = {"Employee ID": str}
+
+# Parsed frames shared by every store in the process: key -> (signature, DataFrame)
+_frame_cache = {}
+
+
+def _chunks(rows, size):
+    """Group an iterable of rows into lists of at most size rows"""
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _count_records(path):
+    """Count the records in a journal file, not counting its header"""
+    if not os.path.exists(path):
+        return 0
+    with open(path, "r", encoding="utf-8") as file:
+        return max(sum(1 for _ in file) - 1, 0)
+
+
+def _merge(frames):
+    """Concatenate the parsed parts of the history, skipping missing and empty ones"""
+    import pandas as pd
+    
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=ATTENDANCE_COLUMNS)
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+
+def normalize_emp_id(value):
+    """Canonical string form of an employee ID, whatever type pandas parsed it as"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+class AttendanceStore:
+    """Attendance history kept as a compacted Excel workbook plus an append-only journal
+    
+    Saving a day's attendance only appends the new rows to the journal, so the
+    cost of a save no longer grows with the size of the history. Readers get the
+    workbook and the journal tail as one merged DataFrame, and compact() folds
+    the journal back into the workbook.
+    
+    Parsed frames are cached for the whole process and invalidated by file
+    mtime and size. The parsed workbook is also kept in a pickle sidecar next to
+    it, so a fresh process does not pay for openpyxl either. Frames returned by
+    read() are shared and must be treated as read-only.
+    
+    Appends hold an exclusive lock on attendance.xlsx.lock. Compaction renames
+    the journal aside and writes the new workbook without the lock, taking it
+    again only to swap the workbook in, so saves never wait for a rewrite.
+    """
+    
+    def __init__(self, excel_path, journal_path, compact_threshold=5000):
+        self.excel_path = excel_path
+        self.journal_path = journal_path
+        self.compact_threshold = compact_threshold
+        base, _ = os.path.splitext(excel_path)
+        self.cache_path = f"{base}.cache.pkl"
+        journal_base, journal_ext = os.path.splitext(journal_path)
+        # The journal being folded into the workbook by a compaction
+        self.rotated_path = f"{journal_base}.compacting{journal_ext}"
+        self.lock = FileLock(excel_path)
+        # Held for a whole compaction, so only one runs at a time
+        self.compact_lock = FileLock(f"{base}.compact")
+    
+    def exists(self):
+        """Check whether any attendance data has been recorded"""
+        return any(os.path.exists(path) for path in (self.excel_path, self.rotated_path, self.journal_path))
+    
+    def append(self, records):
+        """Append attendance records to the journal"""
+        if not records:
+            return
+        
+        with self.lock:
+            new_journal = not os.path.exists(self.journal_path)
+            with open(self.journal_path, "a", newline="", encoding="utf-8") as file:
+                writer = csv.DictWriter(file, fieldnames=ATTENDANCE_COLUMNS, extrasaction="ignore")
+                if new_journal:
+                    writer.writeheader()
+                writer.writerows(records)
+                file.flush()
+                os.fsync(file.fileno())
+    
+    def journal_rows(self):
+        """Count the records waiting in the journal"""
+        return _count_records(self.journal_path)
+    
+    def needs_compaction(self):
+        """Check whether the journal has grown large enough, relative to the workbook, to be worth folding in"""
+        rows = self.journal_rows()
+        return rows >= self.compact_threshold and rows >= COMPACT_RATIO * self.workbook_rows()
+    
+    def signature(self):
+        """Return a value that changes whenever the stored attendance changes"""
+        return (file_signature(self.excel_path), file_signature(self.rotated_path), file_signature(self.journal_path))
+    
+    def workbook_rows(self):
+        """Count the rows in the workbook, from the parsed frame if cached or else from its dimensions"""
+        signature = file_signature(self.excel_path)
+        if signature is None:
+            return 0
+        cached = _frame_cache.get(self.excel_path)
+        if cached and cached[0] == signature:
+            return len(cached[1])
+        
+        from openpyxl import load_workbook
+        
+        workbook = load_workbook(self.excel_path, read_only=True)
+        try:
+            return max((workbook.active.max_row or 1) - 1, 0)
+        finally:
+            workbook.close()
+    
+    def row_count(self):
+        """Count the stored records without parsing the workbook (its dimensions give the row count)"""
+        return self.workbook_rows() + _count_records(self.rotated_path) + self.journal_rows()
+    
+    def iter_rows(self, chunk_size=5000):
+        """Yield the records as lists of tuples in ATTENDANCE_COLUMNS order, streaming the workbook then the journal
+        
+        Only one chunk is in memory at a time, so exports of long histories
+        run in constant memory.
+        """
+        # Open every file under the lock, so a compaction cannot swap the workbook in between;
+        # the open handles keep reading the files as they were at that moment
+        workbook, df, journals = None, None, []
+        with self.lock:
+            signature = file_signature(self.excel_path)
+            cached = _frame_cache.get(self.excel_path)
+            if cached and cached[0] == signature:
+                # Already parsed in this process: chunk the shared frame rather than parse the workbook again
+                df = cached[1][ATTENDANCE_COLUMNS]
+            elif signature is not None:
+                from openpyxl import load_workbook
+                
+                workbook = load_workbook(self.excel_path, read_only=True)
+            for path in (self.rotated_path, self.journal_path):
+                if os.path.exists(path):
+                    journals.append(open(path, "r", newline="", encoding="utf-8"))
+        
+        try:
+            if df is not None:
+                for start in range(0, len(df), chunk_size):
+                    chunk = df.iloc[start:start + chunk_size].astype(object)
+                    yield list(chunk.where(chunk.notna(), None).itertuples(index=False, name=None))
+            elif workbook is not None:
+                rows = workbook.active.iter_rows(values_only=True)
+                header = next(rows, None) or ()
+                positions = [header.index(column) for column in ATTENDANCE_COLUMNS]
+                rows = (tuple(row[i] for i in positions) for row in rows if any(value is not None for value in row))
+                # Workbooks written before IDs were kept as text may still hold numeric cells
+                rows = ((date, time, None if emp_id is None else normalize_emp_id(emp_id), name, status)
+                        for date, time, emp_id, name, status in rows)
+                yield from _chunks(rows, chunk_size)
+            
+            for file in journals:
+                reader = csv.reader(file)
+                next(reader, None)
+                yield from _chunks((tuple(row) for row in reader), chunk_size)
+        finally:
+            if workbook is not None:
+                workbook.close()
+            for file in journals:
+                file.close()
+    
+    def read(self):
+        """Read the workbook and the journal tail as one DataFrame"""
+        import pandas as pd
+        
+        key = ("merged", self.excel_path, self.journal_path)
+        for _ in range(READ_ATTEMPTS):
+            signature = self.signature()
+            cached = _frame_cache.get(key)
+            if cached and cached[0] == signature:
+                return cached[1]
+            
+            if signature[1] is not None:
+                # A compaction is under way: read under the lock, so its swap cannot land between the files
+                with self.lock:
+                    signature = self.signature()
+                    frames = self._read_parts(signature)
+                break
+            
+            frames = self._read_parts(signature)
+            # Another process may have compacted between the reads, which would count the journal twice
+            if self.signature() == signature:
+                break
+        df = _merge(frames)
+        _frame_cache[key] = (signature, df)
+        return df
+    
+    def _read_parts(self, signature):
+        """Parse the workbook, the journal being compacted and the journal for the given signature"""
+        return [
+            self._read_excel(signature[0]),
+            self._read_journal(self.rotated_path, signature[1]),
+            self._read_journal(self.journal_path, signature[2]),
+        ]
+    
+    def _read_excel(self, signature):
+        """Parse the workbook, reusing the in-process cache or the pickle sidecar when current"""
+        import pandas as pd
+        
+        if signature is None:
+            return None
+        
+        cached = _frame_cache.get(self.excel_path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        
+        df = None
+        if os.path.exists(self.cache_path):
+            try:
+                version, sidecar_signature, sidecar_df = pd.read_pickle(self.cache_path)
+                if version == SIDECAR_VERSION and sidecar_signature == signature:
+                    df = sidecar_df
+            except Exception:
+                df = None
+        
+        if df is None:
+            df = pd.read_excel(self.excel_path, dtype=ID_DTYPES)
+            self._write_sidecar(signature, df)
+        
+        _frame_cache[self.excel_path] = (signature, df)
+        return df
+    
+    def _read_journal(self, path, signature):
+        """Parse a journal file, reusing the in-process cache when current"""
+        import pandas as pd
+        
+        if signature is None:
+            return None
+        
+        cached = _frame_cache.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        
+        df = pd.read_csv(path, dtype=ID_DTYPES, encoding="utf-8")
+        _frame_cache[path] = (signature, df)
+        return df
+    
+    def _write_sidecar(self, signature, df):
+        """Store the parsed workbook next to it; the sidecar is only an accelerator"""
+        import pandas as pd
+        
+        try:
+            pd.to_pickle((SIDECAR_VERSION, signature, df), self.cache_path)
+        except OSError:
+            pass
+    
+    def compact(self, moved=None):
+        """Fold the journal into the workbook and return the number of rows folded
+        
+        The journal is first renamed aside, so saves carry on into a new journal
+        while the new workbook is written from the renamed one without the lock.
+        The lock is taken again only to swap the workbook in and delete the
+        renamed journal. moved(before, after) is called under the lock each time
+        the files' signature changes without the records changing. A compaction
+        that was cut short leaves the renamed journal behind for the next one.
+        """
+        with self.compact_lock:
+            with self.lock:
+                before = self.signature()
+                if before[1] is None:
+                    if before[2] is None:
+                        return 0
+                    os.replace(self.journal_path, self.rotated_path)
+                    after = self.signature()
+                    if moved:
+                        moved(before, after)
+                    before = after
+            
+            rotated = self._read_journal(self.rotated_path, before[1])
+            df = _merge([self._read_excel(before[0]), rotated])
+            base, ext = os.path.splitext(self.excel_path)
+            temp_path = f"{base}.compacting{ext}"
+            df.to_excel(temp_path, index=False)
+            
+            with self.lock:
+                current = self.signature()
+                if current[:2] != before[:2]:
+                    # The files were restored or cleared meanwhile, and what is there now wins
+                    os.remove(temp_path)
+                    return 0
+                os.replace(temp_path, self.excel_path)
+                os.remove(self.rotated_path)
+                if moved:
+                    moved(current, self.signature())
+        
+        # The merged frame is exactly the new workbook, so keep it warm
+        signature = file_signature(self.excel_path)
+        _frame_cache[self.excel_path] = (signature, df)
+        self._write_sidecar(signature, df)
+        return len(rotated)
+    
+    def clear(self):
+        """Delete the workbook and the journals"""
+        for path in (self.excel_path, self.rotated_path, self.journal_path, self.cache_path):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,161 @@
+import calendar
+import datetime
+import json
+import os
+
+from attendance_store import normalize_emp_id
+from file_utils import file_signature
+from reports import DATE_FORMAT, STATUS_CODES, finish_report, parse_dates, report_columns
+
+
+def month_span(start=None, end=None):
+    """Return the (first, last) YYYY-MM months covered by a range made of whole months, else None
+    
+    Month buckets can answer a date-range report exactly only when the range
+    starts on the first and ends on the last day of a month.
+    """
+    if start is not None and start.day != 1:
+        return None
+    if end is not None and end.day != calendar.monthrange(end.year, end.month)[1]:
+        return None
+    first = start.strftime("%Y-%m") if start is not None else None
+    last = end.strftime("%Y-%m") if end is not None else None
+    return first, last
+
+
+def _jsonable(value):
+    return json.loads(json.dumps(value))
+
+
+class AttendanceSummary:
+    """Present/Absent counters per employee and per month, kept in a small JSON sidecar
+    
+    The counters are updated as attendance is appended, so a report costs
+    O(employees x months) instead of a pass over the whole history. The
+    sidecar records the signature of the attendance data it describes; when
+    that no longer matches (the files were edited, restored or written by
+    another process) the summary is stale and must be rebuilt. The sidecar is
+    re-read whenever it changes on disk, so a summary another process brought
+    up to date is used rather than rebuilt again.
+    """
+    
+    # Bumped when the counters are keyed differently; summaries of older versions are rebuilt
+    FORMAT = 2
+    
+    def __init__(self, path):
+        self.path = path
+        self._data = None
+        # Signature of the sidecar file _data was read from or written to
+        self._file_signature = None
+    
+    def _load(self):
+        signature = file_signature(self.path)
+        if signature != self._file_signature:
+            try:
+                with open(self.path, "r", encoding="utf-8") as file:
+                    self._data = json.load(file)
+            except (OSError, ValueError):
+                self._data = None
+            self._file_signature = signature
+        return self._data
+    
+    def _save(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self._data, file)
+        os.replace(temp_path, self.path)
+        self._file_signature = file_signature(self.path)
+    
+    def is_current(self, signature):
+        """Check whether the summary describes the attendance data with this signature"""
+        data = self._load()
+        return data is not None and data.get("format") == self.FORMAT and data.get("signature") == _jsonable(signature)
+    
+    def mark_current(self, signature):
+        """Record that the data changed on disk without its content changing (e.g. after compaction)"""
+        self._data["signature"] = _jsonable(signature)
+        self._save()
+    
+    def add(self, records, signature):
+        """Count newly appended records; signature is that of the data after the append"""
+        counts = self._data["employees"]
+        months = self._data["months"]
+        for record in records:
+            status = record["Status"]
+            if status not in STATUS_CODES:
+                continue
+            emp_id = normalize_emp_id(record["Employee ID"])
+            name = str(record["Employee Name"])
+            try:
+                month = datetime.datetime.strptime(str(record["Date"]), DATE_FORMAT).strftime("%Y-%m")
+            except ValueError:
+                month = None
+            
+            totals = counts.setdefault(emp_id, {}).setdefault(name, {"P": 0, "A": 0})
+            totals[status] += 1
+            if month:
+                bucket = months.setdefault(emp_id, {}).setdefault(name, {}).setdefault(month, {"P": 0, "A": 0})
+                bucket[status] += 1
+        
+        self.mark_current(signature)
+    
+    def rebuild(self, df, signature):
+        """Recount everything from the full attendance history"""
+        data = {"format": self.FORMAT, "signature": _jsonable(signature), "employees": {}, "months": {}}
+        df = df[df["Status"].isin(list(STATUS_CODES))]
+        if not df.empty:
+            ids = df["Employee ID"].map(normalize_emp_id)
+            names = df["Employee Name"].astype(str)
+            month = parse_dates(df["Date"]).dt.strftime("%Y-%m")
+            
+            for (emp_id, name, status), count in df.groupby([ids, names, df["Status"]]).size().items():
+                totals = data["employees"].setdefault(emp_id, {}).setdefault(name, {"P": 0, "A": 0})
+                totals[status] = int(count)
+            
+            by_month = df.groupby([ids, names, month, df["Status"]]).size()
+            for (emp_id, name, month, status), count in by_month.items():
+                bucket = data["months"].setdefault(emp_id, {}).setdefault(name, {}).setdefault(month, {"P": 0, "A": 0})
+                bucket[status] = int(count)
+        
+        previous = self._load()
+        self._data = data
+        self._save()
+        return previous is not None and previous.get("employees") == data["employees"] \
+            and previous.get("months") == data["months"]
+    
+    def report(self, start=None, end=None, by_month=False):
+        """Build the report from the counters, or return None if the range is not whole months"""
+        import pandas as pd
+        
+        span = month_span(start, end)
+        if span is None:
+            return None
+        first, last = span
+        
+        rows = []
+        if by_month or first or last:
+            for emp_id, names in self._data["months"].items():
+                for name, months in names.items():
+                    for month, counts in months.items():
+                        if (first and month < first) or (last and month > last):
+                            continue
+                        rows.append((emp_id, name, month, counts["P"], counts["A"]))
+            columns = ["Employee ID", "Employee Name", "Month", "Present", "Absent"]
+            report = pd.DataFrame(rows, columns=columns)
+            if not by_month:
+                report = report.groupby(["Employee ID", "Employee Name"], as_index=False, sort=False)[["Present", "Absent"]].sum()
+        else:
+            for emp_id, names in self._data["employees"].items():
+                for name, counts in names.items():
+                    rows.append((emp_id, name, counts["P"], counts["A"]))
+            report = pd.DataFrame(rows, columns=["Employee ID", "Employee Name", "Present", "Absent"])
+        
+        if report.empty:
+            return pd.DataFrame(columns=report_columns(by_month))
+        return finish_report(report, by_month)
+    
+    def clear(self):
+        self._data = None
+        self._file_signature = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,195 @@
+import os
+import queue
+import shutil
+import threading
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import ttk
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class JobCancelled(Exception):
+    """Raised inside a background job once the user has cancelled it"""
+
+
+class Job:
+    """Handle given to every background task for progress reporting and cancellation"""
+    
+    def __init__(self, runner, title=None):
+        self.title = title
+        self._runner = runner
+        self._cancel_event = threading.Event()
+        self._dialog = None
+    
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+    
+    def cancel(self):
+        """Ask the task to stop at its next checkpoint"""
+        self._cancel_event.set()
+    
+    def check_cancelled(self):
+        """Checkpoint: raise JobCancelled if the user has cancelled the job"""
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+    
+    def progress(self, fraction=None, message=""):
+        """Report progress (0..1, or None when unknown) and act as a cancellation checkpoint"""
+        self.check_cancelled()
+        if self._dialog is not None:
+            self._runner.post(self._dialog.update_progress, fraction, message)
+
+
+class ProgressDialog:
+    """Small modal-looking window with a progress bar and a Cancel button"""
+    
+    def __init__(self, root, job):
+        self.job = job
+        self.window = tk.Toplevel(root)
+        self.window.title(job.title)
+        self.window.geometry("360x130")
+        self.window.resizable(False, False)
+        self.window.protocol("WM_DELETE_WINDOW", self.cancel)
+        
+        self.message = ttk.Label(self.window, text=f"{job.title}...")
+        self.message.pack(pady=(15, 5))
+        
+        self.bar = ttk.Progressbar(self.window, length=300, mode="indeterminate", maximum=100)
+        self.bar.pack(pady=5)
+        self.bar.start(10)
+        
+        self.cancel_btn = ttk.Button(self.window, text="Cancel", command=self.cancel)
+        self.cancel_btn.pack(pady=5)
+    
+    def update_progress(self, fraction, message):
+        if fraction is not None:
+            if str(self.bar.cget("mode")) != "determinate":
+                self.bar.stop()
+                self.bar.configure(mode="determinate")
+            self.bar["value"] = fraction * 100
+        if message:
+            self.message.configure(text=message)
+    
+    def cancel(self):
+        self.job.cancel()
+        self.message.configure(text="Cancelling...")
+        self.cancel_btn.state(["disabled"])
+    
+    def close(self):
+        self.bar.stop()
+        self.window.destroy()
+
+
+class BackgroundRunner:
+    """Runs file jobs on a worker pool and hands their results back to the Tk thread
+    
+    Workers never touch Tk: results, errors and progress updates go through a
+    queue that the Tk thread drains with root.after. Jobs submitted as writers
+    share one lock, so two saves can never interleave.
+    """
+    
+    def __init__(self, root, max_workers=4, poll_interval=50, monitor=None):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.monitor = monitor
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ems-io")
+        self._write_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self.root.after(self.poll_interval, self._poll)
+    
+    def submit(self, task, on_done=None, on_error=None, writer=False, title=None, name=None):
+        """Run task(job) on a worker thread
+        
+        on_done(result) or on_error(exception) is called on the Tk thread
+        afterwards; neither is called if the job was cancelled. Passing a title
+        shows a progress dialog with a Cancel button while the job runs. The
+        job is timed as "job:<name>", or "job:<title>" when no name is given.
+        """
+        job = Job(self, title)
+        if title:
+            job._dialog = ProgressDialog(self.root, job)
+        if self.monitor is not None:
+            task = self.monitor.wrap(task, f"job:{name or title or getattr(task, '__name__', 'task')}")
+        
+        def run():
+            try:
+                if writer:
+                    with self._write_lock:
+                        job.check_cancelled()
+                        result = task(job)
+                else:
+                    result = task(job)
+            except JobCancelled:
+                self.post(self._finish, job, None, None)
+            except Exception as e:
+                self.post(self._finish, job, on_error or self._report_error, e)
+            else:
+                self.post(self._finish, job, on_done, result)
+        
+        self._executor.submit(run)
+        return job
+    
+    def post(self, callback, *args):
+        """Schedule callback(*args) on the Tk thread; safe to call from any thread"""
+        self._queue.put((callback, args))
+    
+    def shutdown(self):
+        """Wait for running jobs, so no write is cut off when the application exits"""
+        self._executor.shutdown(wait=True)
+    
+    def _finish(self, job, callback, value):
+        if job._dialog is not None:
+            job._dialog.close()
+        if callback is not None and not job.cancelled:
+            callback(value)
+    
+    def _report_error(self, error):
+        self.root.report_callback_exception(type(error), error, error.__traceback__)
+    
+    def _poll(self):
+        while True:
+            try:
+                callback, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except tk.TclError:
+                # The widgets the result was meant for were closed in the meantime
+                pass
+            except Exception as e:
+                self._report_error(e)
+        try:
+            self.root.after(self.poll_interval, self._poll)
+        except tk.TclError:
+            pass
+
+
+def copy_file(job, src, dst):
+    """Copy a file in chunks so a long copy reports progress and can be cancelled
+    
+    The copy is written next to dst and renamed into place at the end, so a
+    cancelled or failed copy never leaves dst half-written.
+    """
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    partial = f"{dst}.partial"
+    total = max(os.path.getsize(src), 1)
+    copied = 0
+    try:
+        with open(src, "rb") as source, open(partial, "wb") as target:
+            while True:
+                chunk = source.read(COPY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                target.write(chunk)
+                copied += len(chunk)
+                job.progress(copied / total)
+        shutil.copystat(src, partial)
+        os.replace(partial, dst)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
@@ -0,0 +1,269 @@
+import contextlib
+import datetime
+import gzip
+import hashlib
+import json
+import os
+
+from background import copy_file
+from concurrency import FileLock
+from file_utils import file_signature
+
+HASH_CHUNK_SIZE = 1024 * 1024
+STORE_DIR_NAME = "ems_backups"
+# Retention: always keep the newest KEEP_LAST snapshots and everything younger than KEEP_DAYS days
+KEEP_LAST = 10
+KEEP_DAYS = 30
+
+
+class BackupStore:
+    """Snapshots of the data files kept as compressed, content-addressed blobs
+    
+    Each file is stored once per distinct content under blobs/<sha256>.gz, so
+    a snapshot of files that did not change since the last one only writes
+    its manifest. Every snapshot has a JSON manifest under snapshots/ naming
+    the blob of each file, and restore checks every blob against its hash
+    before any data file is replaced.
+    
+    create() and prune() hold the store's lock file, so pruning can never
+    sweep away blobs that a snapshot being created has not recorded yet.
+    create() also holds the repository's write locks while it reads the data
+    files, so the snapshot never catches another process half-way through a save.
+    """
+    
+    def __init__(self, root):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self.snapshot_dir = os.path.join(root, "snapshots")
+        self.hash_cache_path = os.path.join(root, "hashes.json")
+        self.lock = FileLock(os.path.join(root, "store"))
+    
+    @staticmethod
+    def is_store(path):
+        """Check whether path is a backup store (as opposed to an old-style backup folder)"""
+        return os.path.isdir(os.path.join(path, "snapshots"))
+    
+    @classmethod
+    def for_directory(cls, path):
+        """Use path itself if it is a store, otherwise the ems_backups store inside it"""
+        return cls(path if cls.is_store(path) else os.path.join(path, STORE_DIR_NAME))
+    
+    def _blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest[:2], f"{digest}.gz")
+    
+    def _snapshot_path(self, name):
+        return os.path.join(self.snapshot_dir, f"{name}.json")
+    
+    def _load_hash_cache(self):
+        try:
+            with open(self.hash_cache_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+    
+    def _write_json(self, path, data):
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+        os.replace(temp_path, path)
+    
+    def _hash_file(self, job, path, cache):
+        """Hash a file, reusing the cached digest while its mtime and size are unchanged; None if it is gone"""
+        key = os.path.abspath(path)
+        signature = file_signature(path)
+        if signature is None:
+            return None
+        signature = list(signature)
+        cached = cache.get(key)
+        if cached and cached["signature"] == signature:
+            return cached["sha256"]
+        
+        digest = hashlib.sha256()
+        try:
+            with open(path, "rb") as file:
+                for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+                    job.check_cancelled()
+                    digest.update(chunk)
+        except FileNotFoundError:
+            return None
+        cache[key] = {"signature": signature, "sha256": digest.hexdigest()}
+        return cache[key]["sha256"]
+    
+    def _store_blob(self, job, path, digest):
+        """Compress a file into its blob unless that content is already stored; returns bytes written"""
+        blob_path = self._blob_path(digest)
+        if os.path.exists(blob_path):
+            return 0
+        
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        partial = f"{blob_path}.partial"
+        try:
+            with open(path, "rb") as source, gzip.open(partial, "wb", compresslevel=6) as target:
+                for chunk in iter(lambda: source.read(HASH_CHUNK_SIZE), b""):
+                    job.check_cancelled()
+                    target.write(chunk)
+            os.replace(partial, blob_path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        return os.path.getsize(blob_path)
+    
+    def create(self, job, data_files, data_locks=()):
+        """Snapshot the (path, required) data files under data_locks; returns the snapshot name and what was written"""
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        with self.lock, contextlib.ExitStack() as stack:
+            for lock in data_locks:
+                stack.enter_context(lock)
+            return self._create(job, data_files)
+    
+    def _create(self, job, data_files):
+        cache = self._load_hash_cache()
+        now = datetime.datetime.now()
+        name = now.strftime("%Y%m%d_%H%M%S_%f")
+        manifest = {"created": now.isoformat(timespec="seconds"), "files": []}
+        stored = skipped = written = 0
+        
+        existing = [(path, required) for path, required in data_files if os.path.exists(path)]
+        for index, (path, required) in enumerate(existing):
+            job.progress(index / len(existing), f"Backing up {os.path.basename(path)}...")
+            digest = self._hash_file(job, path, cache)
+            if digest is None:
+                # Removed since the list was taken (e.g. a journal folded in by a compaction)
+                continue
+            size = self._store_blob(job, path, digest)
+            if size:
+                stored += 1
+                written += size
+            else:
+                skipped += 1
+            manifest["files"].append({
+                "name": os.path.basename(path),
+                "sha256": digest,
+                "size": os.path.getsize(path),
+                "required": required,
+            })
+        
+        self._write_json(self.hash_cache_path, cache)
+        self._write_json(self._snapshot_path(name), manifest)
+        return {"snapshot": name, "stored": stored, "skipped": skipped, "bytes_written": written}
+    
+    def snapshots(self):
+        """Return (name, manifest) pairs, newest first"""
+        if not os.path.isdir(self.snapshot_dir):
+            return []
+        result = []
+        for filename in sorted(os.listdir(self.snapshot_dir), reverse=True):
+            if filename.endswith(".json"):
+                with open(os.path.join(self.snapshot_dir, filename), "r", encoding="utf-8") as file:
+                    result.append((filename[:-5], json.load(file)))
+        return result
+    
+    def manifest(self, name):
+        with open(self._snapshot_path(name), "r", encoding="utf-8") as file:
+            return json.load(file)
+    
+    def _unpack(self, job, entry, target):
+        """Decompress a blob to target, raising ValueError if the content does not match its hash"""
+        blob_path = self._blob_path(entry["sha256"])
+        if not os.path.exists(blob_path):
+            raise ValueError(f"Backup blob for {entry['name']} is missing")
+        
+        digest = hashlib.sha256()
+        with gzip.open(blob_path, "rb") as source, open(target, "wb") as output:
+            for chunk in iter(lambda: source.read(HASH_CHUNK_SIZE), b""):
+                job.check_cancelled()
+                digest.update(chunk)
+                output.write(chunk)
+        if digest.hexdigest() != entry["sha256"]:
+            raise ValueError(f"Backup of {entry['name']} is corrupt (checksum mismatch)")
+    
+    def verify(self, job, name):
+        """Check every blob of a snapshot against its checksum; raises ValueError on the first bad one"""
+        files = self.manifest(name)["files"]
+        for index, entry in enumerate(files):
+            job.progress(index / len(files), f"Verifying {entry['name']}...")
+            self._unpack(job, entry, os.devnull)
+    
+    def restore(self, job, name, data_files):
+        """Restore a snapshot over the (path, required) data files
+        
+        Every file is first unpacked next to its target and verified; the
+        targets are only replaced once all of them have passed, so a corrupt
+        or cancelled restore leaves the current data untouched.
+        """
+        entries = {entry["name"]: entry for entry in self.manifest(name)["files"]}
+        missing = [path for path, required in data_files if required and os.path.basename(path) not in entries]
+        if missing:
+            raise ValueError(f"Backup is missing required files:\n{', '.join(missing)}")
+        
+        staged = []
+        try:
+            for index, (path, _) in enumerate(data_files):
+                entry = entries.get(os.path.basename(path))
+                if entry is None:
+                    continue
+                job.progress(index / len(data_files), f"Restoring {entry['name']}...")
+                partial = f"{path}.partial"
+                staged.append((partial, path))
+                self._unpack(job, entry, partial)
+        except BaseException:
+            for partial, _ in staged:
+                if os.path.exists(partial):
+                    os.remove(partial)
+            raise
+        
+        for partial, path in staged:
+            os.replace(partial, path)
+        # Optional files (such as the attendance journal) that were not in the snapshot
+        for path, _ in data_files:
+            if os.path.basename(path) not in entries and os.path.exists(path):
+                os.remove(path)
+    
+    def prune(self, keep_last=KEEP_LAST, keep_days=KEEP_DAYS):
+        """Delete snapshots outside the retention policy and the blobs no snapshot uses any more
+        
+        Returns (snapshots removed, blobs removed).
+        """
+        with self.lock:
+            return self._prune(keep_last, keep_days)
+    
+    def _prune(self, keep_last, keep_days):
+        cutoff = datetime.datetime.now() - datetime.timedelta(days=keep_days)
+        snapshots = self.snapshots()
+        removed = 0
+        for index, (name, manifest) in enumerate(snapshots):
+            if index < keep_last or datetime.datetime.fromisoformat(manifest["created"]) >= cutoff:
+                continue
+            os.remove(self._snapshot_path(name))
+            removed += 1
+        
+        in_use = {entry["sha256"] for _, manifest in self.snapshots() for entry in manifest["files"]}
+        blobs_removed = 0
+        if os.path.isdir(self.blob_dir):
+            for prefix in os.listdir(self.blob_dir):
+                prefix_dir = os.path.join(self.blob_dir, prefix)
+                for filename in os.listdir(prefix_dir):
+                    if filename.split(".")[0] not in in_use:
+                        os.remove(os.path.join(prefix_dir, filename))
+                        blobs_removed += 1
+                if not os.listdir(prefix_dir):
+                    os.rmdir(prefix_dir)
+        return removed, blobs_removed
+
+
+def restore_legacy_folder(job, folder, data_files):
+    """Restore an old-style ems_backup_<timestamp> folder of plain file copies"""
+    missing = [path for path, required in data_files
+               if required and not os.path.exists(os.path.join(folder, os.path.basename(path)))]
+    if missing:
+        raise ValueError(f"Backup is missing required files:\n{', '.join(missing)}")
+    
+    for path, _ in data_files:
+        backup_file = os.path.join(folder, os.path.basename(path))
+        if os.path.exists(backup_file):
+            job.progress(None, f"Restoring {path}...")
+            copy_file(job, backup_file, path)
+        elif os.path.exists(path):
+            # Optional files (such as the attendance journal) may be absent from older backups
+            os.remove(path)
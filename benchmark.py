@@ -0,0 +1,197 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from attendance_store import ATTENDANCE_COLUMNS
+from background import Job
+from backup import BackupStore
+from exporters import export_all, write_rows
+from reports import DATE_FORMAT
+from storage import FlatFileRepository, open_repository
+
+# Rows an .xlsx worksheet can hold below its header
+EXCEL_MAX_ROWS = 1048575
+GENERATE_CHUNK_SIZE = 50000
+
+
+def working_days(count, end=None):
+    """The last count weekdays up to end (default yesterday), oldest first"""
+    day = end or datetime.date.today() - datetime.timedelta(days=1)
+    days = []
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= datetime.timedelta(days=1)
+    return days[::-1]
+
+
+def generate_data(repo, employees, days, present_rate=0.9, seed=42):
+    """Fill an empty repository with employees, one user per employee plus a manager, and attendance"""
+    rng = random.Random(seed)
+    roster = [(str(emp_id), f"Employee {emp_id}") for emp_id in range(1, employees + 1)]
+    repo.add_employees(roster)
+    
+    repo.add_user("manager", "manager", "manager")
+    if isinstance(repo, FlatFileRepository):
+        # One write instead of one append per account
+        with open(repo.user_file, "a") as file:
+            file.write("".join(f"user{emp_id},pass{emp_id},employee,{emp_id}\n" for emp_id, _ in roster))
+    else:
+        for emp_id, _ in roster:
+            repo.add_user(f"user{emp_id}", f"pass{emp_id}", "employee", emp_id)
+    
+    def rows():
+        for day in working_days(days):
+            date = day.strftime(DATE_FORMAT)
+            for emp_id, name in roster:
+                yield (date, "09:00:00", int(emp_id), name, "P" if rng.random() < present_rate else "A")
+    
+    def chunks():
+        batch = []
+        for row in rows():
+            batch.append(row)
+            if len(batch) == GENERATE_CHUNK_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    job = Job(None)
+    if isinstance(repo, FlatFileRepository):
+        if employees * days > EXCEL_MAX_ROWS:
+            raise ValueError(f"{employees * days:,} rows do not fit in one Excel sheet; use --backend sqlite")
+        write_rows(job, repo.attendance_store.excel_path, ATTENDANCE_COLUMNS, chunks())
+    else:
+        for batch in chunks():
+            repo.append_attendance([dict(zip(ATTENDANCE_COLUMNS, row)) for row in batch])
+    repo.rebuild_summary()
+
+
+def time_runs(func, repeat):
+    """Time func repeat times; the first run is reported on its own as it pays for cold caches"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {
+        "first": timings[0],
+        "median": statistics.median(timings),
+        "min": min(timings),
+        "max": max(timings),
+        "runs": repeat,
+    }
+
+
+def run_benchmarks(open_repo, employees, repeat, work_dir):
+    """Time each hot path on a freshly opened repository; returns {operation: timings}"""
+    repo = open_repo()
+    emp_id = str(max(employees // 2, 1))
+    today = datetime.date.today().strftime(DATE_FORMAT)
+    day_records = [
+        {"Date": today, "Time": "09:00:00", "Employee ID": str(i), "Employee Name": f"Employee {i}", "Status": "P"}
+        for i in range(1, employees + 1)
+    ]
+    month_start = datetime.date.today().replace(day=1) - datetime.timedelta(days=45)
+    job = Job(None)
+    export_path = os.path.join(work_dir, "export_all.xlsx")
+    backup_store = BackupStore(os.path.join(work_dir, "backups"))
+    
+    operations = [
+        ("load_employees", lambda: open_repo().load_employees()),
+        ("login", lambda: open_repo().authenticate(f"user{emp_id}", f"pass{emp_id}", "employee")),
+        ("save_attendance_to_excel", lambda: repo.append_attendance(day_records)),
+        ("update_attendance_list_employee", lambda: repo.read_attendance(emp_id=emp_id)),
+        ("update_attendance_list_manager", lambda: repo.read_attendance()),
+        ("generate_attendance_report", lambda: repo.attendance_report()),
+        ("generate_attendance_report_range",
+         lambda: repo.attendance_report(month_start, datetime.date.today(), by_month=True)),
+        ("export_all_data", lambda: export_all(job, repo, export_path)),
+        ("create_backup", lambda: backup_store.create(job, repo.data_files(), repo.data_locks())),
+    ]
+    
+    results = {}
+    for name, func in operations:
+        print(f"  {name}...", end="", flush=True)
+        results[name] = time_runs(func, repeat)
+        print(f" median {results[name]['median'] * 1000:.1f} ms")
+    return results
+
+
+def compare(previous_path, results):
+    """Print how each operation's median changed against an earlier results file"""
+    with open(previous_path, "r", encoding="utf-8") as file:
+        previous = json.load(file)["results"]
+    print(f"\n{'Operation':<36}{'Before':>12}{'After':>12}{'Change':>10}")
+    for name, timings in results.items():
+        if name not in previous:
+            continue
+        before, after = previous[name]["median"], timings["median"]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{name:<36}{before * 1000:>10.1f}ms{after * 1000:>10.1f}ms{change:>+9.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the EMS hot paths on synthetic data")
+    parser.add_argument("--backend", choices=["flat", "sqlite"], default="flat")
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=260, help="working days of attendance history")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", metavar="RESULTS", help="an earlier results file to compare against")
+    args = parser.parse_args(argv)
+    
+    output = os.path.abspath(args.output)
+    previous = os.path.abspath(args.compare) if args.compare else None
+    
+    with tempfile.TemporaryDirectory(prefix="ems-bench-") as work_dir:
+        # Keep every generated and derived file out of the real data directory
+        data_dir = os.path.join(work_dir, "data")
+        os.makedirs(data_dir)
+        
+        def open_repo():
+            return open_repository(args.backend, os.path.join(data_dir, "users.txt"),
+                                   os.path.join(data_dir, "employees.txt"),
+                                   os.path.join(data_dir, "attendance.xlsx"),
+                                   os.path.join(data_dir, "attendance_journal.csv"),
+                                   os.path.join(data_dir, "ems.db"))
+        
+        print(f"Generating {args.employees:,} employees x {args.days:,} days ({args.backend})...")
+        started = time.perf_counter()
+        generate_data(open_repo(), args.employees, args.days)
+        generate_seconds = time.perf_counter() - started
+        
+        print("Running benchmarks:")
+        results = run_benchmarks(open_repo, args.employees, args.repeat, work_dir)
+    
+    report = {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "backend": args.backend,
+            "employees": args.employees,
+            "days": args.days,
+            "attendance_rows": args.employees * args.days,
+            "repeat": args.repeat,
+            "generate_seconds": generate_seconds,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {output}")
+    
+    if previous:
+        compare(previous, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import datetime
+
+from attendance_store import normalize_emp_id
+from reports import DATE_FORMAT, STATUS_CODES
+from storage import EMPLOYEE_COLUMNS
+
+# How many problems to list before summarising the rest
+MAX_REPORTED_ERRORS = 20
+
+STATUS_ALIASES = {"P": "P", "PRESENT": "P", "A": "A", "ABSENT": "A"}
+
+
+def _read_csv(path, required):
+    """Read a CSV with every column as text and check it has the required columns"""
+    import pandas as pd
+    
+    df = pd.read_csv(path, dtype=str, keep_default_na=False, skipinitialspace=True)
+    df.columns = [column.strip() for column in df.columns]
+    missing = [column for column in required if column not in df.columns]
+    if missing:
+        raise ValueError(f"{path} is missing the column(s): {', '.join(missing)}")
+    for column in df.columns:
+        df[column] = df[column].str.strip()
+    return df
+
+
+def _problems(df, mask, message):
+    """Describe the rows selected by mask; CSV line numbers count the header as line 1"""
+    return [(index + 2, message.format(**row)) for index, row in df[mask].iterrows()]
+
+
+def _check(errors):
+    if errors:
+        errors.sort()
+        lines = [f"Line {line}: {message}" for line, message in errors[:MAX_REPORTED_ERRORS]]
+        if len(errors) > MAX_REPORTED_ERRORS:
+            lines.append(f"... and {len(errors) - MAX_REPORTED_ERRORS} more")
+        raise ValueError(f"{len(errors)} problem(s) found, nothing was imported:\n" + "\n".join(lines))
+
+
+def validate_employees(df, existing_ids):
+    """Check an employees frame; returns a list of (line, message) problems"""
+    ids = df["Employee ID"].map(normalize_emp_id)
+    errors = []
+    errors += _problems(df, ids == "", "missing Employee ID")
+    errors += _problems(df, df["Employee Name"] == "", "missing Employee Name for ID '{Employee ID}'")
+    # employees.txt is comma-separated, so neither field may contain a comma
+    errors += _problems(df, ids.str.contains(",") | df["Employee Name"].str.contains(","),
+                        "commas are not allowed in '{Employee ID}' / '{Employee Name}'")
+    errors += _problems(df, ids.duplicated(keep="first") & (ids != ""), "duplicate Employee ID '{Employee ID}'")
+    errors += _problems(df, ids.isin(existing_ids), "Employee ID '{Employee ID}' already exists")
+    return errors
+
+
+def import_employees(repo, path, dry_run=False):
+    """Validate a CSV of Employee ID, Employee Name and add every row in one batch; returns the row count"""
+    df = _read_csv(path, EMPLOYEE_COLUMNS)
+    existing_ids = {normalize_emp_id(emp_id) for emp_id in repo.load_employees()}
+    _check(validate_employees(df, existing_ids))
+    
+    employees = list(zip(df["Employee ID"].map(normalize_emp_id), df["Employee Name"]))
+    if not dry_run:
+        repo.add_employees(employees)
+    return len(employees)
+
+
+def _parse_import_dates(dates):
+    """Accept DD-MM-YYYY (the application's format) or YYYY-MM-DD; unparseable dates become NaT"""
+    import pandas as pd
+    
+    parsed = pd.to_datetime(dates, format=DATE_FORMAT, errors="coerce")
+    iso = pd.to_datetime(dates, format="%Y-%m-%d", errors="coerce")
+    return parsed.fillna(iso)
+
+
+def validate_attendance(df, employees):
+    """Check an attendance frame against the roster; returns a list of (line, message) problems"""
+    ids = df["Employee ID"].map(normalize_emp_id)
+    dates = _parse_import_dates(df["Date"])
+    status = df["Status"].str.upper().map(STATUS_ALIASES)
+    today = datetime.datetime.combine(datetime.date.today(), datetime.time())
+    
+    errors = []
+    errors += _problems(df, dates.isna(), "bad date '{Date}' (use DD-MM-YYYY)")
+    errors += _problems(df, dates > today, "date '{Date}' is in the future")
+    errors += _problems(df, ~ids.isin(employees), "unknown Employee ID '{Employee ID}'")
+    errors += _problems(df, status.isna(), f"bad status '{{Status}}' (use {' or '.join(STATUS_CODES)})")
+    errors += _problems(df, dates.notna() & ids.to_frame().assign(date=dates).duplicated(keep="first"),
+                        "duplicate row for Employee ID '{Employee ID}' on {Date}")
+    return errors
+
+
+def import_attendance(repo, path, dry_run=False):
+    """Validate a CSV of Date, Employee ID, Status (and optionally Time) and append it in one batch
+    
+    Names come from the employee roster; a missing Time is recorded as 00:00:00.
+    Returns the number of records imported.
+    """
+    df = _read_csv(path, ["Date", "Employee ID", "Status"])
+    employees = {normalize_emp_id(emp_id): name for emp_id, name in repo.load_employees().items()}
+    _check(validate_attendance(df, employees))
+    
+    ids = df["Employee ID"].map(normalize_emp_id)
+    times = df["Time"].replace("", "00:00:00") if "Time" in df.columns else "00:00:00"
+    records = df.assign(
+        **{
+            "Date": _parse_import_dates(df["Date"]).dt.strftime(DATE_FORMAT),
+            "Time": times,
+            "Employee ID": ids,
+            "Employee Name": ids.map(employees),
+            "Status": df["Status"].str.upper().map(STATUS_ALIASES),
+        }
+    ).to_dict("records")
+    if not dry_run:
+        repo.append_attendance(records)
+    return len(records)
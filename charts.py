@@ -0,0 +1,130 @@
+import datetime
+import io
+import threading
+from collections import OrderedDict
+
+from attendance_matrix import ABSENT, PRESENT
+
+CHART_KINDS = {
+    "daily": "Daily Present/Absent",
+    "monthly": "Monthly Attendance %",
+    "employees": "Lowest Attendance by Employee",
+}
+# Daily series longer than this are averaged into buckets of several days
+MAX_POINTS = 365
+MAX_BARS = 30
+CHART_CACHE_SIZE = 24
+
+
+def daily_series(matrix, start=None, end=None):
+    """Return (days, present, absent) counts for every day on which anything was recorded"""
+    import numpy as np
+    
+    columns = matrix.day_columns(start, end)
+    cells = matrix.cells[:, columns]
+    present = (cells == PRESENT).sum(axis=0)
+    absent = (cells == ABSENT).sum(axis=0)
+    recorded = np.flatnonzero(present + absent)
+    first = matrix.first_day + datetime.timedelta(days=columns.start) if matrix.first_day else None
+    days = [first + datetime.timedelta(days=int(i)) for i in recorded]
+    return days, present[recorded], absent[recorded]
+
+
+def downsample(days, present, absent, max_points=MAX_POINTS):
+    """Average a long daily series into at most max_points buckets, each labelled with its first day"""
+    import numpy as np
+    
+    if len(days) <= max_points:
+        return days, present, absent
+    bounds = np.linspace(0, len(days), max_points + 1).astype(int)[:-1]
+    sizes = np.diff(np.r_[bounds, len(days)])
+    return ([days[i] for i in bounds],
+            np.add.reduceat(present, bounds) / sizes,
+            np.add.reduceat(absent, bounds) / sizes)
+
+
+def monthly_series(matrix, start=None, end=None):
+    """Return (months, attendance %) from the per-month report totals"""
+    report = matrix.report(start, end, by_month=True)
+    if report.empty:
+        return [], []
+    totals = report.groupby("Month", sort=True)[["Present", "Absent"]].sum()
+    percent = (totals["Present"] / (totals["Present"] + totals["Absent"]) * 100).round(1)
+    return list(totals.index), list(percent)
+
+
+def render_chart(matrix, kind, start=None, end=None, width=800, height=400, dpi=100):
+    """Draw a chart of the matrix and return it as PNG bytes
+    
+    Uses matplotlib's object API with the Agg canvas rather than pyplot, so
+    it is safe to call from a worker thread; the Tk thread only has to show
+    the finished image.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    
+    figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    axes.set_title(CHART_KINDS[kind])
+    
+    if kind == "daily":
+        days, present, absent = daily_series(matrix, start, end)
+        sampled = downsample(days, present, absent)
+        if len(sampled[0]) < len(days):
+            axes.set_title(f"{CHART_KINDS[kind]} (average per day, {len(days):,} days)")
+        axes.plot(sampled[0], sampled[1], label="Present", color="tab:green")
+        axes.plot(sampled[0], sampled[2], label="Absent", color="tab:red")
+        axes.set_ylabel("Employees")
+        axes.legend(loc="upper left")
+        figure.autofmt_xdate()
+    elif kind == "monthly":
+        months, percent = monthly_series(matrix, start, end)
+        axes.bar(range(len(months)), percent, color="tab:blue")
+        step = max(1, len(months) // 24)
+        axes.set_xticks(range(0, len(months), step), months[::step], rotation=45, ha="right")
+        axes.set_ylabel("Attendance %")
+        axes.set_ylim(0, 100)
+    elif kind == "employees":
+        report = matrix.streak_report(start, end)
+        report = report.sort_values(["Attendance %", "Absent"], ascending=[True, False]).head(MAX_BARS)
+        labels = [f"{emp_id} {name}" for emp_id, name in zip(report["Employee ID"], report["Employee Name"])]
+        axes.barh(labels, report["Present"], label="Present", color="tab:green")
+        axes.barh(labels, report["Absent"], left=report["Present"], label="Absent", color="tab:red")
+        axes.invert_yaxis()
+        axes.tick_params(axis="y", labelsize=8)
+        axes.set_xlabel("Days")
+        axes.legend(loc="lower right")
+    else:
+        raise ValueError(f"Unknown chart: {kind}")
+    
+    if not axes.has_data():
+        axes.text(0.5, 0.5, "No attendance in this range", ha="center", va="center", transform=axes.transAxes)
+    figure.tight_layout()
+    
+    output = io.BytesIO()
+    figure.savefig(output, format="png")
+    return output.getvalue()
+
+
+class ChartCache:
+    """The most recently rendered charts, keyed by chart, filter, size and attendance version"""
+    
+    def __init__(self, size=CHART_CACHE_SIZE):
+        self.size = size
+        self._charts = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            png = self._charts.get(key)
+            if png is not None:
+                self._charts.move_to_end(key)
+            return png
+    
+    def put(self, key, png):
+        with self._lock:
+            self._charts[key] = png
+            self._charts.move_to_end(key)
+            while len(self._charts) > self.size:
+                self._charts.popitem(last=False)
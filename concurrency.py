@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# How long a writer waits for another process (or manager) to finish before giving up
+LOCK_TIMEOUT = 30
+LOCK_POLL_INTERVAL = 0.05
+
+# One OS lock per lock file for the whole process: flock()/locking() locks are
+# per open file, so a second open in the same process would deadlock against the first
+_held = {}
+_held_guard = threading.Lock()
+
+
+class _HeldLock:
+    def __init__(self):
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.file = None
+
+
+def _try_lock(file):
+    try:
+        if fcntl:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(file):
+    if fcntl:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class FileLock:
+    """Advisory exclusive lock on a <path>.lock file, for writers in other processes and on other machines
+    
+    The lock is reentrant and shared by every thread of the process, so a
+    locked operation may call other operations that take the same lock. Use
+    it as a context manager; waiting longer than timeout raises TimeoutError.
+    """
+    
+    def __init__(self, path, timeout=LOCK_TIMEOUT):
+        self.path = f"{path}.lock"
+        self.timeout = timeout
+        with _held_guard:
+            self._held = _held.setdefault(os.path.abspath(self.path), _HeldLock())
+    
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        if not self._held.thread_lock.acquire(timeout=self.timeout):
+            raise TimeoutError(f"Timed out waiting for {self.path}")
+        if self._held.depth:
+            self._held.depth += 1
+            return
+        
+        try:
+            file = open(self.path, "a+")
+            while not _try_lock(file):
+                if time.monotonic() >= deadline:
+                    file.close()
+                    raise TimeoutError(f"Timed out waiting for {self.path}; another user is saving")
+                time.sleep(LOCK_POLL_INTERVAL)
+        except BaseException:
+            self._held.thread_lock.release()
+            raise
+        self._held.file = file
+        self._held.depth = 1
+    
+    def release(self):
+        self._held.depth -= 1
+        if not self._held.depth:
+            _unlock(self._held.file)
+            self._held.file.close()
+            self._held.file = None
+        self._held.thread_lock.release()
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, *exc):
+        self.release()
+
+
+class GroupCommit:
+    """Batch concurrent writes into one call of write(items)
+    
+    The first caller to arrive becomes the leader and writes its items; callers
+    arriving while that write is in progress queue theirs, and the next leader
+    writes the whole queue at once. Under load this turns many small
+    lock-append-fsync cycles into a few large ones. Every caller returns once
+    its own items are durable, or gets the exception of the write that
+    carried them.
+    """
+    
+    def __init__(self, write):
+        self._write = write
+        self._condition = threading.Condition()
+        self._pending = []
+        self._writing = False
+    
+    def commit(self, items):
+        entry = {"items": list(items), "done": False, "error": None}
+        with self._condition:
+            self._pending.append(entry)
+            while not entry["done"]:
+                if self._writing:
+                    self._condition.wait()
+                    continue
+                
+                batch, self._pending = self._pending, []
+                self._writing = True
+                error = None
+                self._condition.release()
+                try:
+                    self._write([item for queued in batch for item in queued["items"]])
+                except BaseException as e:
+                    error = e
+                finally:
+                    self._condition.acquire()
+                    for queued in batch:
+                        queued["done"] = True
+                        queued["error"] = error
+                    self._writing = False
+                    self._condition.notify_all()
+        
+        if entry["error"] is not None:
+            raise entry["error"]
@@ -0,0 +1,141 @@
+import os
+import threading
+
+from concurrency import FileLock
+from file_utils import file_signature
+
+
+class EmployeeDirectory:
+    """The employees.txt roster held in memory and reloaded only when the file changes
+    
+    Adds are appended as "id,name" lines and removals as "-id" tombstone lines
+    (which never contain a comma, so they cannot be confused with a record),
+    making every change O(1) instead of a rewrite of the whole file. Lines
+    made dead by tombstones are counted, and once they outnumber the live
+    records the file is compacted: rewritten to a temporary file and renamed
+    over the original.
+    
+    Writes hold an exclusive lock on employees.txt.lock and re-read any changes
+    made by other processes first, so two managers cannot both add the same ID
+    and a compaction never drops a line another manager just appended.
+    """
+    
+    def __init__(self, path, compact_min_dead=100):
+        self.path = path
+        self.compact_min_dead = compact_min_dead
+        self._employees = {}
+        self._signature = None
+        self._dead_lines = 0
+        self._lock = threading.RLock()
+        self.file_lock = FileLock(path)
+    
+    def refresh(self):
+        """Reload the roster if the file was changed by someone else"""
+        with self._lock:
+            signature = file_signature(self.path)
+            if signature != self._signature:
+                self._load(signature)
+    
+    def _load(self, signature):
+        employees = {}
+        dead = 0
+        if signature is not None:
+            with open(self.path, "r") as file:
+                for line in file:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    if "," in line:
+                        emp_id, emp_name = line.split(",")
+                        if emp_id in employees:
+                            dead += 1
+                        employees[emp_id] = emp_name
+                    elif line.startswith("-"):
+                        # Tombstone: both it and the record it removes are dead lines
+                        dead += 2 if employees.pop(line[1:], None) is not None else 1
+        self._employees = employees
+        self._dead_lines = dead
+        self._signature = signature
+    
+    def _append(self, text):
+        """Append to the file and remember its new signature, so our own write does not trigger a reload"""
+        # A file last edited by hand may not end in a newline; don't glue our first line onto its last
+        needs_newline = False
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, "rb") as file:
+                file.seek(-1, os.SEEK_END)
+                needs_newline = file.read(1) != b"\n"
+        
+        with open(self.path, "a") as file:
+            if needs_newline:
+                file.write("\n")
+            file.write(text)
+        self._signature = file_signature(self.path)
+    
+    def all(self):
+        """Return a copy of the roster as a dict of employee ID to name"""
+        with self._lock:
+            self.refresh()
+            return dict(self._employees)
+    
+    def __contains__(self, emp_id):
+        with self._lock:
+            self.refresh()
+            return emp_id in self._employees
+    
+    def __len__(self):
+        with self._lock:
+            self.refresh()
+            return len(self._employees)
+    
+    def add(self, emp_id, emp_name):
+        """Append one employee; raises ValueError if the ID is already taken"""
+        with self.file_lock, self._lock:
+            self.refresh()
+            if emp_id in self._employees:
+                raise ValueError(f"Employee ID '{emp_id}' already exists!")
+            self._append(f"{emp_id},{emp_name}\n")
+            self._employees[emp_id] = emp_name
+    
+    def add_many(self, employees):
+        """Append (emp_id, emp_name) pairs in one write"""
+        employees = list(employees)
+        with self.file_lock, self._lock:
+            self.refresh()
+            self._append("".join(f"{emp_id},{emp_name}\n" for emp_id, emp_name in employees))
+            for emp_id, emp_name in employees:
+                if emp_id in self._employees:
+                    self._dead_lines += 1
+                self._employees[emp_id] = emp_name
+    
+    def remove(self, emp_id):
+        """Remove an employee by appending a tombstone; raises KeyError for an unknown ID"""
+        with self.file_lock, self._lock:
+            self.refresh()
+            if emp_id not in self._employees:
+                raise KeyError(emp_id)
+            self._append(f"-{emp_id}\n")
+            del self._employees[emp_id]
+            self._dead_lines += 2
+            if self.needs_compaction():
+                self.compact()
+    
+    def needs_compaction(self):
+        return self._dead_lines >= self.compact_min_dead and self._dead_lines > len(self._employees)
+    
+    def compact(self):
+        """Rewrite the file with only the live records; returns the number of dead lines dropped"""
+        with self.file_lock, self._lock:
+            self.refresh()
+            dropped = self._dead_lines
+            if not dropped:
+                return 0
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w") as file:
+                file.write("".join(f"{emp_id},{emp_name}\n" for emp_id, emp_name in self._employees.items()))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.path)
+            self._signature = file_signature(self.path)
+            self._dead_lines = 0
+            return dropped
@@ -0,0 +1,235 @@
+import csv
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from attendance_store import ATTENDANCE_COLUMNS
+from background import copy_file
+from storage import EMPLOYEE_COLUMNS, USER_COLUMNS
+
+EXPORT_FORMATS = {".xlsx": "Excel", ".csv": "CSV", ".parquet": "Parquet"}
+EXPORT_CHUNK_SIZE = 5000
+# Attendance chunks read ahead of the workbook writer in export_all
+READ_AHEAD_CHUNKS = 4
+
+_END = object()
+
+
+def export_format(path):
+    """Pick the export format from the file extension"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{ext}'. Use .xlsx, .csv or .parquet")
+    return ext
+
+
+def _write_xlsx(path, columns, chunks):
+    from openpyxl import Workbook
+    
+    # Write-only mode streams rows to disk instead of keeping every cell in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    sheet.append(columns)
+    for rows in chunks:
+        for row in rows:
+            sheet.append(row)
+    workbook.save(path)
+
+
+def _write_csv(path, columns, chunks):
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        for rows in chunks:
+            writer.writerows(rows)
+
+
+def _write_parquet(path, columns, chunks):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow:\npip install pyarrow") from None
+    
+    # Every column is written as text so IDs keep their exact form for downstream jobs
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in chunks:
+            arrays = [
+                pa.array([None if value is None else str(value) for value in values], pa.string())
+                for values in zip(*rows)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+
+WRITERS = {".xlsx": _write_xlsx, ".csv": _write_csv, ".parquet": _write_parquet}
+
+
+def _track(job, chunks, total=None, label="rows"):
+    """Pass chunks through, reporting progress (and checking for cancellation) after each one"""
+    done = 0
+    for rows in chunks:
+        if not rows:
+            continue
+        yield rows
+        done += len(rows)
+        fraction = min(done / total, 1.0) if total else None
+        job.progress(fraction, f"Exported {done:,} {label}...")
+
+
+def _save_atomically(path, save):
+    """Call save(temp_path) and rename the result into place
+    
+    A cancelled or failed export never leaves a half-written file behind.
+    """
+    partial = f"{path}.partial"
+    try:
+        save(partial)
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+
+def write_rows(job, path, columns, chunks, total=None, label="rows"):
+    """Write chunks of row tuples to path in the format its extension names"""
+    writer = WRITERS[export_format(path)]
+    _save_atomically(path, lambda partial: writer(partial, columns, _track(job, chunks, total, label)))
+
+
+def export_attendance(job, repo, path):
+    """Export the attendance history to Excel, CSV or Parquet without loading it into memory
+    
+    An Excel export of a fully compacted history is a plain file copy; every
+    other case streams the rows through in chunks.
+    """
+    ext = export_format(path)
+    workbook = repo.attendance_workbook()
+    if ext == ".xlsx" and workbook:
+        copy_file(job, workbook, path)
+        return
+    
+    job.progress(None, "Counting attendance records...")
+    total = repo.count_attendance()
+    write_rows(job, path, ATTENDANCE_COLUMNS, repo.iter_attendance(EXPORT_CHUNK_SIZE), total, "records")
+
+
+def _timed(timings, stage, func, *args):
+    started = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        timings[stage] = time.perf_counter() - started
+
+
+def _user_rows(repo):
+    if not repo.has_users():
+        return None
+    users = repo.users_frame().astype(object)
+    # Missing employee IDs become empty cells rather than NaN
+    return list(users.where(users.notna(), None).itertuples(index=False, name=None))
+
+
+def _employee_rows(repo):
+    return list(repo.load_employees().items())
+
+
+def _put(buffer, item, stop):
+    """Put item in the bounded buffer, giving up once the consumer has stopped"""
+    while not stop.is_set():
+        try:
+            buffer.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _read_ahead(chunks, buffer, stop):
+    """Producer: read attendance chunks into the buffer while the writer works on earlier ones"""
+    try:
+        for rows in chunks:
+            if not _put(buffer, rows, stop):
+                return
+    except Exception as e:
+        _put(buffer, e, stop)
+    else:
+        _put(buffer, _END, stop)
+
+
+def _drain(buffer):
+    while True:
+        item = buffer.get()
+        if item is _END:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+def _append_sheet(workbook, title, columns, rows):
+    sheet = workbook.create_sheet(title)
+    sheet.append(columns)
+    for row in rows:
+        sheet.append(row)
+
+
+def export_all(job, repo, path, max_workers=3):
+    """Export users, employees and attendance to one workbook and return per-stage timings in seconds
+    
+    The three sources are read on a thread pool at the same time. Attendance
+    is streamed through a small read-ahead buffer into an openpyxl write-only
+    workbook, so memory stays flat however long the history is.
+    """
+    from openpyxl import Workbook
+    
+    if export_format(path) != ".xlsx":
+        raise ValueError("All data can only be exported to an Excel workbook (.xlsx)")
+    
+    started = time.perf_counter()
+    timings = {}
+    stop = threading.Event()
+    buffer = queue.Queue(maxsize=READ_AHEAD_CHUNKS)
+    
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ems-export") as pool:
+        users = pool.submit(_timed, timings, "Read users", _user_rows, repo)
+        employees = pool.submit(_timed, timings, "Read employees", _employee_rows, repo)
+        has_attendance = repo.has_attendance()
+        if has_attendance:
+            total = repo.count_attendance()
+            pool.submit(_timed, timings, "Read attendance", _read_ahead,
+                        repo.iter_attendance(EXPORT_CHUNK_SIZE), buffer, stop)
+        
+        def save(partial):
+            writing = time.perf_counter()
+            workbook = Workbook(write_only=True)
+            
+            job.progress(None, "Exporting users...")
+            user_rows = users.result()
+            if user_rows is not None:
+                _append_sheet(workbook, "Users", USER_COLUMNS, user_rows)
+            
+            job.progress(None, "Exporting employees...")
+            employee_rows = employees.result()
+            if employee_rows:
+                _append_sheet(workbook, "Employees", EMPLOYEE_COLUMNS, employee_rows)
+            
+            if has_attendance:
+                chunks = _track(job, _drain(buffer), total, "attendance records")
+                _append_sheet(workbook, "Attendance", ATTENDANCE_COLUMNS, (row for rows in chunks for row in rows))
+            
+            job.progress(1.0, "Saving workbook...")
+            workbook.save(partial)
+            timings["Write workbook"] = time.perf_counter() - writing
+        
+        try:
+            _save_atomically(path, save)
+        finally:
+            # Lets the reader stop early when the export failed or was cancelled
+            stop.set()
+    
+    timings["Total"] = time.perf_counter() - started
+    return timings
@@ -0,0 +1,10 @@
+import os
+
+
+def file_signature(path):
+    """Return the (mtime, size) pair used to detect changes to a file, or None if it is missing"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,136 @@
+import cProfile
+import datetime
+import functools
+import io
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+PERF_LOG_FILE = "ems_perf.log"
+PERF_LOG_MAX_BYTES = 1024 * 1024
+PERF_LOG_BACKUPS = 3
+# Calls faster than this are logged but not shown in the status bar
+STATUS_MIN_SECONDS = 0.001
+
+
+def _row_count(result):
+    """Rows in a DataFrame, array, list or dict result; None for anything else"""
+    if hasattr(result, "shape"):
+        return result.shape[0] if result.shape else None
+    if isinstance(result, (list, tuple, dict, set)):
+        return len(result)
+    return None
+
+
+class PerfMonitor:
+    """Times instrumented calls, logs every one to a rotating file and keeps the latest in memory
+    
+    Listeners are called with each new entry from whichever thread made the
+    call, so GUI listeners must hand the entry over to the Tk thread. When
+    profile_action names an instrumented action, the next calls of that
+    action are run under cProfile and tracemalloc and dumped to profile_dir.
+    """
+    
+    def __init__(self, log_path=PERF_LOG_FILE, profile_action=None, profile_dir=".", history=200):
+        self.entries = deque(maxlen=history)
+        self.listeners = []
+        self.profile_action = profile_action
+        self.profile_dir = profile_dir
+        self._profile_lock = threading.Lock()
+        
+        self.logger = logging.getLogger(f"ems.perf.{os.path.abspath(log_path)}" if log_path else "ems.perf")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        if log_path and not self.logger.handlers:
+            handler = RotatingFileHandler(log_path, maxBytes=PERF_LOG_MAX_BYTES,
+                                          backupCount=PERF_LOG_BACKUPS, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(threadName)s %(message)s"))
+            self.logger.addHandler(handler)
+    
+    def record(self, action, seconds, rows=None, failed=False):
+        """Store and log one timing, then notify the listeners"""
+        entry = {"action": action, "seconds": seconds, "rows": rows, "failed": failed}
+        self.entries.append(entry)
+        self.logger.info("%s %.1fms rows=%s%s", action, seconds * 1000, "-" if rows is None else rows,
+                         " FAILED" if failed else "")
+        for listener in self.listeners:
+            listener(entry)
+    
+    def wrap(self, func, action):
+        """Return func timed (and, if selected, profiled) under the given action name"""
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            failed = True
+            result = None
+            try:
+                if action == self.profile_action:
+                    result = self._profile(action, func, args, kwargs)
+                else:
+                    result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                self.record(action, time.perf_counter() - started, _row_count(result), failed)
+        
+        return timed
+    
+    def instrument(self, obj, names, prefix=""):
+        """Replace the named methods of obj (on the instance only) with timed versions"""
+        for name in names:
+            setattr(obj, name, self.wrap(getattr(obj, name), f"{prefix}{name}"))
+    
+    def _profile(self, action, func, args, kwargs):
+        # Only one profiler can run at a time; overlapping calls just run untraced
+        if not self._profile_lock.acquire(blocking=False):
+            return func(*args, **kwargs)
+        try:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start(25)
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.disable()
+                snapshot = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                if started_tracing:
+                    tracemalloc.stop()
+                self._dump_profile(action, profiler, snapshot, peak)
+        finally:
+            self._profile_lock.release()
+    
+    def _dump_profile(self, action, profiler, snapshot, peak):
+        """Write <name>.prof (for pstats/snakeviz) and a readable <name>.txt summary"""
+        safe_action = re.sub(r"[^A-Za-z0-9_.-]+", "_", action)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        base = os.path.join(self.profile_dir, f"ems_profile_{safe_action}_{timestamp}")
+        profiler.dump_stats(f"{base}.prof")
+        
+        summary = io.StringIO()
+        summary.write(f"Profile of {action}\n\nTop functions by cumulative time:\n")
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(30)
+        summary.write(f"\nPeak traced memory: {peak / (1024 * 1024):.1f} MB\nTop allocations:\n")
+        for stat in snapshot.statistics("lineno")[:20]:
+            summary.write(f"{stat}\n")
+        with open(f"{base}.txt", "w", encoding="utf-8") as file:
+            file.write(summary.getvalue())
+        self.logger.info("profile of %s written to %s.prof/.txt", action, base)
+
+
+def format_status(entry):
+    """One-line status bar text for a timing entry"""
+    text = f"{entry['action']}: {entry['seconds'] * 1000:,.1f} ms"
+    if entry["rows"] is not None:
+        text += f" ({entry['rows']:,} rows)"
+    if entry["failed"]:
+        text += " - failed"
+    return text
@@ -1,20 +1,50 @@
+import time
+
+_STARTED = time.perf_counter()
+
+import argparse
+import base64
 import datetime
-import pandas as pd
 import os
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from PIL import Image, ImageTk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import shutil
+
+# pandas (and openpyxl behind it) are imported inside the functions that need
+# them, so the login window is shown before they are loaded
+from attendance_store import ATTENDANCE_COLUMNS
+from background import BackgroundRunner
+from charts import CHART_KINDS, ChartCache, render_chart
+from backup import KEEP_DAYS, KEEP_LAST, BackupStore, restore_legacy_folder
+from exporters import export_all, export_attendance
+from instrumentation import STATUS_MIN_SECONDS, PerfMonitor, format_status
+from reports import REPORT_COLUMNS
+from search_index import SearchIndex
+from storage import Repository, open_repository
+from widgets import AttendanceGrid, EmployeePicker, SearchEntry, VirtualTable
+
+_IMPORTED = time.perf_counter()
 
 # File Paths
 USER_FILE = "users.txt"
 EMPLOYEE_FILE = "employees.txt"
 ATTENDANCE_FILE = "attendance.xlsx"
+ATTENDANCE_JOURNAL_FILE = "attendance_journal.csv"
+DATABASE_FILE = "ems.db"
+
+# Storage backend: "flat" for the files above, "sqlite" for DATABASE_FILE
+STORAGE_BACKEND = os.environ.get("EMS_STORAGE", "flat")
+
+# Handlers timed by the performance monitor; every public repository method is timed as well.
+# Handlers that wait on a dialog would time the user, and ones that hand their work to the
+# background runner would only time the hand-off, so those are timed as their "job:<name>" instead.
+INSTRUMENTED_ACTIONS = [
+    "show_dashboard", "load_employees", "update_employee_list", "filter_employee_list", "mark_attendance",
+    "save_attendance_to_excel", "show_report",
+]
 
 class EmployeeManagementSystem:
-    def __init__(self, root):
+    def __init__(self, root, monitor=None):
         self.root = root
         self.root.title("🏢 Employee Management System")
         self.root.geometry("1000x650")
@@ -22,6 +52,14 @@ class EmployeeManagementSystem:
         self.current_user = None
         self.current_role = None
         self.current_emp_id = None
+        self.current_report = None
+        self.roster = None
+        self.employee_index = SearchIndex()
+        self.repo = open_repository(STORAGE_BACKEND, USER_FILE, EMPLOYEE_FILE, ATTENDANCE_FILE,
+                                    ATTENDANCE_JOURNAL_FILE, DATABASE_FILE)
+        self.monitor = monitor or PerfMonitor()
+        self.runner = BackgroundRunner(self.root, monitor=self.monitor)
+        self.instrument()
         
         # Configure styles
         self.style = ttk.Style()
@@ -38,6 +76,20 @@ class EmployeeManagementSystem:
         # Initialize the application
         self.show_login_screen()
     
+    def instrument(self):
+        """Time the handlers and every repository call, and show the latest timing in the status bar"""
+        self.status_var = tk.StringVar(value="Ready")
+        repo_methods = [name for name in vars(Repository) if not name.startswith("_") and name != "iter_attendance"]
+        self.monitor.instrument(self.repo, repo_methods, prefix="repo.")
+        self.monitor.instrument(self, INSTRUMENTED_ACTIONS)
+        
+        def on_timing(entry):
+            if entry["seconds"] >= STATUS_MIN_SECONDS:
+                # Timings arrive from worker threads too; only the Tk thread may touch the variable
+                self.runner.post(self.status_var.set, format_status(entry))
+        
+        self.monitor.listeners.append(on_timing)
+    
     def clear_window(self):
         """Clear all widgets from the window"""
         for widget in self.root.winfo_children():
@@ -142,6 +194,10 @@ class EmployeeManagementSystem:
                 messagebox.showerror("Error", "Passwords do not match!")
                 return
             
+            if self.repo.user_exists(username):
+                messagebox.showerror("Error", "Username already exists!")
+                return
+            
             if role == "employee" and not emp_id:
                 messagebox.showerror("Error", "Employee ID is required for employee role!")
                 return
@@ -152,7 +208,11 @@ class EmployeeManagementSystem:
                     messagebox.showerror("Error", "Employee ID not found in system!")
                     return
             
-            self.register_user(username, password, role, emp_id)
+            try:
+                self.register_user(username, password, role, emp_id)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
             dialog.destroy()
             messagebox.showinfo("Success", "Account created successfully!")
         
@@ -166,8 +226,7 @@ class EmployeeManagementSystem:
     
     def register_user(self, username, password, role, emp_id=None):
         """Register a new user"""
-        with open(USER_FILE, "a") as file:
-            file.write(f"{username},{password},{role},{emp_id if emp_id else ''}\n")
+        self.repo.add_user(username, password, role, emp_id)
     
     def login(self):
         """Handle login process"""
@@ -179,25 +238,18 @@ class EmployeeManagementSystem:
             messagebox.showerror("Error", "Username and password are required!")
             return
         
-        if not os.path.exists(USER_FILE):
+        if not self.repo.has_users():
             messagebox.showinfo("Info", "No users found! Please register first.")
             return
         
-        with open(USER_FILE, "r") as file:
-            users = file.readlines()
-        
-        for user in users:
-            parts = user.strip().split(",")
-            if len(parts) >= 4:  # username,password,role,emp_id
-                stored_user, stored_pass, stored_role, stored_emp_id = parts[:4]
-                if (username == stored_user and password == stored_pass and 
-                    role == stored_role):
-                    self.current_user = username
-                    self.current_role = stored_role
-                    self.current_emp_id = stored_emp_id if stored_emp_id else None
-                    messagebox.showinfo("Success", f"Login successful! Welcome, {username}")
-                    self.show_dashboard()
-                    return
+        user = self.repo.authenticate(username, password, role)
+        if user:
+            self.current_user = user.username
+            self.current_role = user.role
+            self.current_emp_id = user.emp_id
+            messagebox.showinfo("Success", f"Login successful! Welcome, {username}")
+            self.show_dashboard()
+            return
         
         messagebox.showerror("Error", "Invalid credentials or role! Try again.")
     
@@ -215,6 +267,10 @@ class EmployeeManagementSystem:
         logout_btn = ttk.Button(header_frame, text="Logout", command=self.show_login_screen)
         logout_btn.pack(side=tk.RIGHT, padx=5)
         
+        # Status bar with the latest timing; packed before the notebook so it keeps its row
+        ttk.Label(self.root, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W,
+                  padding=(6, 2)).pack(side=tk.BOTTOM, fill=tk.X)
+        
         # Main content
         notebook = ttk.Notebook(self.root)
         notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
@@ -258,18 +314,12 @@ class EmployeeManagementSystem:
         list_frame = ttk.LabelFrame(parent, text="Employee List", padding=10)
         list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
         
-        columns = ("ID", "Name")
-        self.employee_tree = ttk.Treeview(list_frame, columns=columns, show="headings", selectmode="browse")
-        
-        for col in columns:
-            self.employee_tree.heading(col, text=col)
-            self.employee_tree.column(col, width=150, anchor=tk.CENTER)
+        self.employee_search = SearchEntry(list_frame, self.filter_employee_list)
+        self.employee_search.pack(fill=tk.X, pady=(0, 5))
         
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.employee_tree.yview)
-        self.employee_tree.configure(yscroll=scrollbar.set)
-        
-        self.employee_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.employee_tree = VirtualTable(list_frame, ("ID", "Name"), column_width=150, selectmode="browse",
+                                          horizontal_scroll=False)
+        self.employee_tree.pack(fill=tk.BOTH, expand=True)
         
         self.update_employee_list()
     
@@ -301,16 +351,21 @@ class EmployeeManagementSystem:
                 messagebox.showerror("Error", "Employee ID and Name are required!")
                 return
             
-            employees = self.load_employees()
-            if emp_id in employees:
+            if self.repo.has_employee(emp_id):
                 messagebox.showerror("Error", "Employee ID already exists!")
                 return
             
-            with open(EMPLOYEE_FILE, "a") as file:
-                file.write(f"{emp_id},{emp_name}\n")
+            try:
+                # Another manager may have taken the ID since the check above
+                self.repo.add_employee(emp_id, emp_name)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
             
             messagebox.showinfo("Success", f"Employee {emp_name} added successfully!")
-            self.update_employee_list()
+            self.roster[emp_id] = emp_name
+            self.employee_index.add(emp_id, f"{emp_id} {emp_name}")
+            self.filter_employee_list()
             dialog.destroy()
         
         btn_frame = ttk.Frame(dialog)
@@ -323,43 +378,41 @@ class EmployeeManagementSystem:
     
     def show_remove_employee_dialog(self):
         """Show dialog to remove employee (Manager only)"""
-        employees = self.load_employees()
-        if not employees:
+        if not self.roster:
             messagebox.showinfo("Info", "No employees to remove.")
             return
         
         dialog = tk.Toplevel(self.root)
         dialog.title("Remove Employee")
-        dialog.geometry("400x200")
+        dialog.geometry("420x330")
         dialog.resizable(False, False)
         
         ttk.Label(dialog, text="Remove Employee", style='Header.TLabel').pack(pady=10)
         
-        frame = ttk.Frame(dialog)
-        frame.pack(pady=10, padx=20)
-        
-        ttk.Label(frame, text="Employee ID:").grid(row=0, column=0, padx=5, pady=5, sticky=tk.E)
-        emp_id_entry = ttk.Entry(frame, width=25)
-        emp_id_entry.grid(row=0, column=1, padx=5, pady=5)
+        # Type an ID or part of a name and pick from the matches
+        picker = EmployeePicker(dialog, self.roster, self.employee_index)
+        picker.pack(pady=10, padx=20, fill=tk.X)
+        selected = self.employee_tree.selected_rows()
+        if selected:
+            picker.set(self.employee_tree.rows()[selected[0]][0])
         
         def remove_employee():
-            emp_id = emp_id_entry.get().strip()
+            emp_id = picker.selected_id()
             
             if not emp_id:
                 messagebox.showerror("Error", "Employee ID is required!")
                 return
             
-            if emp_id not in employees:
+            if not self.repo.has_employee(emp_id):
                 messagebox.showerror("Error", "Employee ID not found!")
                 return
             
-            del employees[emp_id]
-            with open(EMPLOYEE_FILE, "w") as file:
-                for e_id, e_name in employees.items():
-                    file.write(f"{e_id},{e_name}\n")
+            self.repo.remove_employee(emp_id)
             
             messagebox.showinfo("Success", "Employee removed successfully!")
-            self.update_employee_list()
+            self.roster.pop(emp_id, None)
+            self.employee_index.remove(emp_id)
+            self.filter_employee_list()
             dialog.destroy()
         
         btn_frame = ttk.Frame(dialog)
@@ -368,25 +421,29 @@ class EmployeeManagementSystem:
         ttk.Button(btn_frame, text="Remove", command=remove_employee).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
         
-        emp_id_entry.focus_set()
+        picker.focus_set()
     
     def load_employees(self):
-        """Load employees from file"""
-        employees = {}
-        if os.path.exists(EMPLOYEE_FILE):
-            with open(EMPLOYEE_FILE, "r") as file:
-                for line in file:
-                    emp_id, emp_name = line.strip().split(",")
-                    employees[emp_id] = emp_name
-        return employees
+        """Load employees from storage"""
+        return self.repo.load_employees()
+    
+    def index_roster(self, employees):
+        """Make employees the indexed roster; the search index is only rebuilt if the roster changed"""
+        if employees != self.roster:
+            self.roster = employees
+            self.employee_index = SearchIndex.from_items((emp_id, f"{emp_id} {name}") for emp_id, name in employees.items())
+        return self.employee_index
     
     def update_employee_list(self):
         """Update the employee list in the treeview"""
-        employees = self.load_employees()
-        self.employee_tree.delete(*self.employee_tree.get_children())
-        
-        for emp_id, emp_name in employees.items():
-            self.employee_tree.insert("", tk.END, values=(emp_id, emp_name))
+        self.index_roster(self.load_employees())
+        self.filter_employee_list()
+    
+    def filter_employee_list(self, text=None):
+        """Show the employees matching the search box"""
+        if text is None:
+            text = self.employee_search.get()
+        self.employee_tree.set_rows([[emp_id, self.roster[emp_id]] for emp_id in self.employee_index.search(text)])
     
     def setup_attendance_tab(self, parent, manager_view=True):
         """Setup the attendance tab"""
@@ -401,20 +458,44 @@ class EmployeeManagementSystem:
         view_frame = ttk.LabelFrame(parent, text="Attendance Records" if manager_view else "My Attendance Records", padding=10)
         view_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
         
-        columns = ("Date", "Time", "Employee ID", "Employee Name", "Status")
-        self.attendance_tree = ttk.Treeview(view_frame, columns=columns, show="headings", selectmode="extended")
+        # Filters: only the partitions overlapping the range (or the employee's own) are read
+        filter_frame = ttk.Frame(view_frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 5))
         
-        for col in columns:
-            self.attendance_tree.heading(col, text=col)
-            self.attendance_tree.column(col, width=120, anchor=tk.CENTER)
+        ttk.Label(filter_frame, text="From (DD-MM-YYYY):").pack(side=tk.LEFT)
+        self.attendance_start_entry = ttk.Entry(filter_frame, width=12)
+        self.attendance_start_entry.pack(side=tk.LEFT, padx=5)
         
-        scroll_y = ttk.Scrollbar(view_frame, orient=tk.VERTICAL, command=self.attendance_tree.yview)
-        scroll_x = ttk.Scrollbar(view_frame, orient=tk.HORIZONTAL, command=self.attendance_tree.xview)
-        self.attendance_tree.configure(yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set)
+        ttk.Label(filter_frame, text="To:").pack(side=tk.LEFT)
+        self.attendance_end_entry = ttk.Entry(filter_frame, width=12)
+        self.attendance_end_entry.pack(side=tk.LEFT, padx=5)
         
-        self.attendance_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
-        scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
+        self.attendance_emp_entry = None
+        if manager_view:
+            ttk.Label(filter_frame, text="Employee ID:").pack(side=tk.LEFT)
+            self.attendance_emp_entry = ttk.Entry(filter_frame, width=10)
+            self.attendance_emp_entry.pack(side=tk.LEFT, padx=5)
+        
+        def apply_filter():
+            self.update_attendance_list(manager_view)
+        
+        ttk.Button(filter_frame, text="Apply", command=apply_filter).pack(side=tk.LEFT, padx=5)
+        ttk.Button(filter_frame, text="Last 7 Days",
+                   command=lambda: self.set_attendance_filter(datetime.date.today() - datetime.timedelta(days=6),
+                                                              datetime.date.today(), manager_view)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(filter_frame, text="This Month",
+                   command=lambda: self.set_attendance_filter(datetime.date.today().replace(day=1),
+                                                              datetime.date.today(), manager_view)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(filter_frame, text="Clear",
+                   command=lambda: self.set_attendance_filter(None, None, manager_view, clear_employee=True)).pack(side=tk.LEFT, padx=2)
+        for entry in (self.attendance_start_entry, self.attendance_end_entry, self.attendance_emp_entry):
+            if entry is not None:
+                entry.bind("<Return>", lambda e: apply_filter())
+        
+        # Only the rows in view are materialized, so large histories render, sort and page instantly
+        self.attendance_tree = VirtualTable(view_frame, ATTENDANCE_COLUMNS, column_width=120, selectmode="extended",
+                                            paged=True)
+        self.attendance_tree.pack(fill=tk.BOTH, expand=True)
         
         # Buttons for attendance
         btn_frame = ttk.Frame(view_frame)
@@ -436,53 +517,22 @@ class EmployeeManagementSystem:
         
         date = datetime.date.today().strftime("%d-%m-%Y")
         time = datetime.datetime.now().strftime("%H:%M:%S")
-        records = []
         
         dialog = tk.Toplevel(self.root)
         dialog.title("Mark Attendance")
-        dialog.geometry("600x400")
+        dialog.geometry("640x520")
         
         ttk.Label(dialog, text=f"Mark Attendance for {date}", style='Header.TLabel').pack(pady=10)
         
-        # Create a frame for the employee list
-        frame = ttk.Frame(dialog)
-        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-        
-        # Create a canvas and scrollbar
-        canvas = tk.Canvas(frame)
-        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas)
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(
-                scrollregion=canvas.bbox("all")
-            )
-        )
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # Create radio buttons for each employee
-        self.attendance_vars = {}
-        for emp_id, emp_name in employees.items():
-            frame = ttk.Frame(scrollable_frame)
-            frame.pack(fill=tk.X, padx=5, pady=2)
-            
-            ttk.Label(frame, text=f"{emp_name} ({emp_id})", width=30).pack(side=tk.LEFT)
-            
-            var = tk.StringVar(value="P")
-            self.attendance_vars[emp_id] = var
-            
-            ttk.Radiobutton(frame, text="Present", variable=var, value="P").pack(side=tk.LEFT, padx=5)
-            ttk.Radiobutton(frame, text="Absent", variable=var, value="A").pack(side=tk.LEFT, padx=5)
+        # One virtualized grid for the whole roster instead of a row of widgets per employee
+        grid = AttendanceGrid(dialog, employees, index=self.index_roster(employees))
+        grid.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
         def save_attendance():
+            statuses = grid.statuses()
+            records = []
             for emp_id, emp_name in employees.items():
-                status = self.attendance_vars[emp_id].get()
+                status = statuses[emp_id]
                 records.append({
                     "Date": date,
                     "Time": time,
@@ -491,120 +541,251 @@ class EmployeeManagementSystem:
                     "Status": status
                 })
             
-            self.save_attendance_to_excel(records)
-            messagebox.showinfo("Success", "Attendance recorded successfully!")
-            self.update_attendance_list(manager_view=True)
-            dialog.destroy()
+            def on_saved(_):
+                messagebox.showinfo("Success", "Attendance recorded successfully!")
+                self.update_attendance_list(manager_view=True)
+                dialog.destroy()
+                self.compact_if_needed()
+            
+            def on_failed(e):
+                save_btn.state(["!disabled"])
+                messagebox.showerror("Error", f"Failed to save attendance:\n{str(e)}")
+            
+            # Saving runs on the writer thread; block a second click until it finishes
+            save_btn.state(["disabled"])
+            self.runner.submit(lambda job: self.save_attendance_to_excel(records),
+                               on_done=on_saved, on_error=on_failed, writer=True, name="save_attendance")
         
         btn_frame = ttk.Frame(dialog)
         btn_frame.pack(pady=10)
         
-        ttk.Button(btn_frame, text="Save Attendance", command=save_attendance).pack(side=tk.LEFT, padx=5)
+        save_btn = ttk.Button(btn_frame, text="Save Attendance", command=save_attendance)
+        save_btn.pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
     
     def save_attendance_to_excel(self, records):
-        """Save attendance records to Excel file"""
-        df = pd.DataFrame(records)
-        
-        if os.path.exists(ATTENDANCE_FILE):
-            existing_data = pd.read_excel(ATTENDANCE_FILE)
-            df = pd.concat([existing_data, df], ignore_index=True)
-        
-        df.to_excel(ATTENDANCE_FILE, index=False)
+        """Save attendance records (appended to the journal when using the Excel files)"""
+        self.repo.append_attendance(records)
+    
+    def set_attendance_filter(self, start, end, manager_view=True, clear_employee=False):
+        """Fill the attendance date filter (None leaves a field empty) and apply it"""
+        entries = [(self.attendance_start_entry, start), (self.attendance_end_entry, end)]
+        if clear_employee and self.attendance_emp_entry is not None:
+            entries.append((self.attendance_emp_entry, None))
+        for entry, value in entries:
+            entry.delete(0, tk.END)
+            if value is not None:
+                entry.insert(0, value.strftime("%d-%m-%Y"))
+        self.update_attendance_list(manager_view)
     
     def update_attendance_list(self, manager_view=True):
         """Update the attendance records in the treeview"""
-        if not os.path.exists(ATTENDANCE_FILE):
+        if not self.repo.has_attendance():
             return
         
-        df = pd.read_excel(ATTENDANCE_FILE)
-        self.attendance_tree.delete(*self.attendance_tree.get_children())
+        try:
+            start = self.parse_report_date(self.attendance_start_entry.get())
+            end = self.parse_report_date(self.attendance_end_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "Dates must be in DD-MM-YYYY format!")
+            return
         
-        if not manager_view and self.current_emp_id:
-            # Employee view - only show their records
-            df = df[df['Employee ID'] == self.current_emp_id]
+        # Employee view - only show their records
+        if manager_view:
+            emp_id = self.attendance_emp_entry.get().strip() or None
+        else:
+            emp_id = self.current_emp_id
+        table = self.attendance_tree
+        
+        def load(job):
+            if not manager_view and not emp_id:
+                return []
+            df = self.repo.read_attendance(emp_id=emp_id, start=start, end=end)
+            return df[ATTENDANCE_COLUMNS].to_numpy(dtype=object)
         
-        for _, row in df.iterrows():
-            self.attendance_tree.insert("", tk.END, values=(
-                row['Date'],
-                row['Time'],
-                row['Employee ID'],
-                row['Employee Name'],
-                row['Status']
-            ))
+        self.runner.submit(load, on_done=table.set_rows, name="attendance_list",
+                           on_error=lambda e: messagebox.showerror("Error", f"Failed to load attendance:\n{str(e)}"))
     
     def export_attendance(self):
-        """Export attendance data to a new Excel file (Manager only)"""
-        if not os.path.exists(ATTENDANCE_FILE):
+        """Export attendance data to a new Excel, CSV or Parquet file (Manager only)"""
+        if not self.repo.has_attendance():
             messagebox.showinfo("Info", "No attendance data to export.")
             return
         
         file_path = filedialog.asksaveasfilename(
             defaultextension=".xlsx",
-            filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")],
+            filetypes=[("Excel files", "*.xlsx"), ("CSV files", "*.csv"), ("Parquet files", "*.parquet"),
+                       ("All files", "*.*")],
             title="Save Attendance File As"
         )
         
         if file_path:
-            df = pd.read_excel(ATTENDANCE_FILE)
-            df.to_excel(file_path, index=False)
-            messagebox.showinfo("Success", f"Attendance data exported to:\n{file_path}")
+            self.runner.submit(
+                lambda job: export_attendance(job, self.repo, file_path),
+                title="Exporting Attendance",
+                on_done=lambda _: messagebox.showinfo("Success", f"Attendance data exported to:\n{file_path}"),
+                on_error=lambda e: messagebox.showerror("Error", f"Failed to export attendance:\n{str(e)}")
+            )
     
     def setup_reports_tab(self, parent):
         """Setup the reports tab (Manager only)"""
+        self.current_report = None
+        
         # Generate Report Frame
         report_frame = ttk.LabelFrame(parent, text="Generate Reports", padding=10)
         report_frame.pack(fill=tk.X, padx=10, pady=10)
         
-        ttk.Button(report_frame, text="Generate Attendance Report", command=self.generate_attendance_report).pack(pady=5)
+        ttk.Label(report_frame, text="From (DD-MM-YYYY):").grid(row=0, column=0, padx=5, pady=5, sticky=tk.E)
+        self.report_start_entry = ttk.Entry(report_frame, width=12)
+        self.report_start_entry.grid(row=0, column=1, padx=5, pady=5)
         
-        # Report Display Frame
-        display_frame = ttk.LabelFrame(parent, text="Attendance Report", padding=10)
-        display_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        ttk.Label(report_frame, text="To (DD-MM-YYYY):").grid(row=0, column=2, padx=5, pady=5, sticky=tk.E)
+        self.report_end_entry = ttk.Entry(report_frame, width=12)
+        self.report_end_entry.grid(row=0, column=3, padx=5, pady=5)
         
-        columns = ("Employee ID", "Employee Name", "Attendance Summary")
-        self.report_tree = ttk.Treeview(display_frame, columns=columns, show="headings", selectmode="browse")
+        self.report_monthly_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(report_frame, text="Monthly breakdown", variable=self.report_monthly_var).grid(row=0, column=4, padx=10, pady=5)
         
-        for col in columns:
-            self.report_tree.heading(col, text=col)
-            self.report_tree.column(col, width=200, anchor=tk.CENTER)
+        ttk.Button(report_frame, text="Generate Attendance Report", command=self.generate_attendance_report).grid(row=0, column=5, padx=5, pady=5)
+        ttk.Button(report_frame, text="Absence Streaks", command=self.generate_absence_report).grid(row=0, column=6, padx=5, pady=5)
         
-        scrollbar = ttk.Scrollbar(display_frame, orient=tk.VERTICAL, command=self.report_tree.yview)
-        self.report_tree.configure(yscrollcommand=scrollbar.set)
+        # Report Display: the table and the charts share the date range above
+        display = ttk.Notebook(parent)
+        display.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        display_frame = ttk.Frame(display, padding=10)
+        display.add(display_frame, text="Attendance Report")
+        chart_frame = ttk.Frame(display, padding=10)
+        display.add(chart_frame, text="Charts")
         
-        self.report_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.report_tree = VirtualTable(display_frame, REPORT_COLUMNS, column_width=150, selectmode="browse",
+                                        horizontal_scroll=False, paged=True)
+        self.report_tree.pack(fill=tk.BOTH, expand=True)
         
         # Export button
         btn_frame = ttk.Frame(display_frame)
         btn_frame.pack(fill=tk.X, pady=(5, 0))
         
         ttk.Button(btn_frame, text="Export Report", command=self.export_report).pack(side=tk.LEFT, padx=5)
+        
+        self.setup_charts(chart_frame)
+        display.bind("<<NotebookTabChanged>>",
+                     lambda e: self.show_chart() if display.select() == str(chart_frame) else None)
+    
+    def setup_charts(self, parent):
+        """Setup the Charts view of the reports tab"""
+        self.chart_cache = ChartCache()
+        self.chart_image = None
+        self.chart_kind_var = tk.StringVar(value="daily")
+        
+        controls = ttk.Frame(parent)
+        controls.pack(fill=tk.X, pady=(0, 5))
+        for kind, label in CHART_KINDS.items():
+            ttk.Radiobutton(controls, text=label, value=kind, variable=self.chart_kind_var,
+                            command=self.show_chart).pack(side=tk.LEFT, padx=5)
+        ttk.Button(controls, text="Refresh", command=self.show_chart).pack(side=tk.RIGHT, padx=5)
+        
+        self.chart_label = ttk.Label(parent, anchor=tk.CENTER)
+        self.chart_label.pack(fill=tk.BOTH, expand=True)
+    
+    def show_chart(self):
+        """Show the selected chart for the report date range, rendering it in the background unless cached"""
+        if not self.repo.has_attendance():
+            self.chart_label.configure(image="", text="No attendance data available.")
+            return
+        
+        try:
+            start = self.parse_report_date(self.report_start_entry.get())
+            end = self.parse_report_date(self.report_end_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "Dates must be in DD-MM-YYYY format!")
+            return
+        
+        kind = self.chart_kind_var.get()
+        width = max(self.chart_label.winfo_width(), 480)
+        height = max(self.chart_label.winfo_height(), 320)
+        # A new attendance version means new data, so stale charts are simply never looked up again
+        key = (kind, start, end, width, height, self.repo.attendance_version())
+        png = self.chart_cache.get(key)
+        if png is not None:
+            self.display_chart(png)
+            return
+        
+        self.chart_label.configure(image="", text="Drawing chart...")
+        
+        def render(job):
+            return render_chart(self.repo.attendance_matrix(), kind, start, end, width, height)
+        
+        def on_rendered(png):
+            self.chart_cache.put(key, png)
+            # The user may have picked another chart while this one was drawn
+            if self.chart_kind_var.get() == kind:
+                self.display_chart(png)
+        
+        self.runner.submit(render, on_done=on_rendered, name="chart",
+                           on_error=lambda e: messagebox.showerror("Error", f"Failed to draw chart:\n{str(e)}"))
+    
+    def display_chart(self, png):
+        """Show rendered PNG bytes in the Charts view"""
+        self.chart_image = tk.PhotoImage(data=base64.b64encode(png))
+        self.chart_label.configure(image=self.chart_image, text="")
     
     def generate_attendance_report(self):
         """Generate and display attendance report (Manager only)"""
-        if not os.path.exists(ATTENDANCE_FILE):
+        if not self.repo.has_attendance():
+            messagebox.showinfo("Info", "No attendance data available.")
+            return
+        
+        try:
+            start = self.parse_report_date(self.report_start_entry.get())
+            end = self.parse_report_date(self.report_end_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "Dates must be in DD-MM-YYYY format!")
+            return
+        
+        by_month = self.report_monthly_var.get()
+        
+        def build(job):
+            return self.repo.attendance_report(start, end, by_month=by_month)
+        
+        self.runner.submit(build, on_done=self.show_report, name="attendance_report",
+                           on_error=lambda e: messagebox.showerror("Error", f"Failed to generate report:\n{str(e)}"))
+    
+    def generate_absence_report(self):
+        """Show attendance % and the longest and current absence streak per employee (Manager only)"""
+        if not self.repo.has_attendance():
             messagebox.showinfo("Info", "No attendance data available.")
             return
         
-        df = pd.read_excel(ATTENDANCE_FILE)
-        report = df.groupby(["Employee ID", "Employee Name"])["Status"].apply(
-            lambda x: f"Present: {sum(x == 'P')}, Absent: {sum(x == 'A')}"
-        ).reset_index()
+        try:
+            start = self.parse_report_date(self.report_start_entry.get())
+            end = self.parse_report_date(self.report_end_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "Dates must be in DD-MM-YYYY format!")
+            return
         
-        self.report_tree.delete(*self.report_tree.get_children())
+        def build(job):
+            return self.repo.attendance_matrix().streak_report(start, end)
         
-        for _, row in report.iterrows():
-            self.report_tree.insert("", tk.END, values=(
-                row['Employee ID'],
-                row['Employee Name'],
-                row['Status']
-            ))
+        self.runner.submit(build, on_done=self.show_report, name="absence_report",
+                           on_error=lambda e: messagebox.showerror("Error", f"Failed to generate report:\n{str(e)}"))
+    
+    def show_report(self, report):
+        """Display a generated attendance report"""
+        self.current_report = report
+        if list(report.columns) != self.report_tree.columns:
+            self.report_tree.set_columns(report.columns)
+        self.report_tree.set_rows(report)
+    
+    def parse_report_date(self, text):
+        """Parse an optional DD-MM-YYYY date from a report filter field"""
+        text = text.strip()
+        if not text:
+            return None
+        return datetime.datetime.strptime(text, "%d-%m-%Y").date()
     
     def export_report(self):
         """Export the generated report to Excel (Manager only)"""
-        items = self.report_tree.get_children()
-        if not items:
+        if self.current_report is None or self.current_report.empty:
             messagebox.showinfo("Info", "No report data to export.")
             return
         
@@ -615,18 +796,13 @@ class EmployeeManagementSystem:
         )
         
         if file_path:
-            data = []
-            for item in items:
-                values = self.report_tree.item(item, 'values')
-                data.append({
-                    "Employee ID": values[0],
-                    "Employee Name": values[1],
-                    "Attendance Summary": values[2]
-                })
-            
-            df = pd.DataFrame(data)
-            df.to_excel(file_path, index=False)
-            messagebox.showinfo("Success", f"Report exported to:\n{file_path}")
+            report = self.current_report
+            self.runner.submit(
+                lambda job: report.to_excel(file_path, index=False),
+                title="Exporting Report",
+                on_done=lambda _: messagebox.showinfo("Success", f"Report exported to:\n{file_path}"),
+                on_error=lambda e: messagebox.showerror("Error", f"Failed to export report:\n{str(e)}")
+            )
     
     def setup_settings_tab(self, parent):
         """Setup the settings tab (Manager only)"""
@@ -639,12 +815,15 @@ class EmployeeManagementSystem:
         
         ttk.Button(backup_frame, text="Create Backup", command=self.create_backup).pack(pady=5)
         ttk.Button(backup_frame, text="Restore from Backup", command=self.restore_backup).pack(pady=5)
+        ttk.Button(backup_frame, text="Prune Old Backups", command=self.prune_backups).pack(pady=5)
         
         # Data management section
         data_frame = ttk.LabelFrame(frame, text="Data Management", padding=15)
         data_frame.pack(fill=tk.X, pady=10)
         
         ttk.Button(data_frame, text="Export All Data", command=self.export_all_data).pack(pady=5)
+        ttk.Button(data_frame, text="Compact Attendance Journal", command=self.compact_attendance).pack(pady=5)
+        ttk.Button(data_frame, text="Rebuild Report Summary", command=self.rebuild_report_summary).pack(pady=5)
         ttk.Button(data_frame, text="Clear All Data", command=self.clear_all_data).pack(pady=5)
         
         # System section
@@ -654,58 +833,149 @@ class EmployeeManagementSystem:
         ttk.Button(system_frame, text="About", command=self.show_about).pack(pady=5)
     
     def create_backup(self):
-        """Create a backup of all data files (Manager only)"""
+        """Create a backup snapshot of all data files (Manager only)"""
         backup_dir = filedialog.askdirectory(title="Select Backup Location")
         if not backup_dir:
             return
         
-        try:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_folder = os.path.join(backup_dir, f"ems_backup_{timestamp}")
-            os.makedirs(backup_folder)
-            
-            files_to_backup = [USER_FILE, EMPLOYEE_FILE, ATTENDANCE_FILE]
-            
-            for file in files_to_backup:
-                if os.path.exists(file):
-                    shutil.copy(file, backup_folder)
-            
-            messagebox.showinfo("Success", f"Backup created successfully at:\n{backup_folder}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to create backup:\n{str(e)}")
+        store = BackupStore.for_directory(backup_dir)
+        
+        def on_backed_up(result):
+            messagebox.showinfo(
+                "Success",
+                f"Backup created successfully at:\n{store.root}\n\n"
+                f"Snapshot {result['snapshot']}: {result['stored']} file(s) stored, {result['skipped']} unchanged"
+            )
+        
+        # Runs as a writer, and under the files' locks, so the snapshot never catches a save half-way through
+        self.runner.submit(
+            lambda job: store.create(job, self.repo.data_files(), self.repo.data_locks()),
+            title="Creating Backup",
+            writer=True,
+            on_done=on_backed_up,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to create backup:\n{str(e)}")
+        )
     
     def restore_backup(self):
-        """Restore data from a backup (Manager only)"""
+        """Restore data from a backup snapshot or an old-style backup folder (Manager only)"""
         backup_dir = filedialog.askdirectory(title="Select Backup Location")
         if not backup_dir:
             return
         
+        store = BackupStore.for_directory(backup_dir)
+        if BackupStore.is_store(store.root):
+            self.show_snapshot_dialog(store)
+            return
+        
         try:
             # Verify required files exist in backup
-            required_files = [USER_FILE, EMPLOYEE_FILE, ATTENDANCE_FILE]
-            missing_files = []
-            
-            for file in required_files:
-                if not os.path.exists(os.path.join(backup_dir, os.path.basename(file))):
-                    missing_files.append(file)
-            
+            missing_files = [
+                path for path, required in self.repo.data_files()
+                if required and not os.path.exists(os.path.join(backup_dir, os.path.basename(path)))
+            ]
             if missing_files:
                 messagebox.showerror("Error", f"Backup is missing required files:\n{', '.join(missing_files)}")
                 return
-            
-            # Confirm with user
-            if not messagebox.askyesno("Confirm", "This will overwrite all current data. Continue?"):
-                return
-            
-            # Restore files
-            for file in required_files:
-                backup_file = os.path.join(backup_dir, os.path.basename(file))
-                shutil.copy(backup_file, file)
-            
-            messagebox.showinfo("Success", "Data restored successfully!")
-            self.show_login_screen()  # Restart to reload all data
         except Exception as e:
             messagebox.showerror("Error", f"Failed to restore backup:\n{str(e)}")
+            return
+        
+        self.start_restore(lambda job: restore_legacy_folder(job, backup_dir, self.repo.data_files()))
+    
+    def show_snapshot_dialog(self, store):
+        """Let the manager pick a snapshot to verify or restore"""
+        try:
+            snapshots = store.snapshots()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to read backups:\n{str(e)}")
+            return
+        if not snapshots:
+            messagebox.showinfo("Info", f"No backup snapshots found in:\n{store.root}")
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Restore from Backup")
+        dialog.geometry("460x320")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        ttk.Label(dialog, text="Backup snapshots (newest first):").pack(pady=(10, 5))
+        listbox = tk.Listbox(dialog, height=10, width=60)
+        listbox.pack(fill=tk.BOTH, expand=True, padx=10)
+        for name, manifest in snapshots:
+            size = sum(entry["size"] for entry in manifest["files"]) / (1024 * 1024)
+            listbox.insert(tk.END, f"{manifest['created'].replace('T', ' ')}  -  "
+                                   f"{len(manifest['files'])} files, {size:.1f} MB")
+        listbox.selection_set(0)
+        
+        def selected_snapshot():
+            selection = listbox.curselection()
+            if not selection:
+                messagebox.showerror("Error", "Please select a snapshot", parent=dialog)
+                return None
+            return snapshots[selection[0]][0]
+        
+        def verify():
+            name = selected_snapshot()
+            if name:
+                self.runner.submit(
+                    lambda job: store.verify(job, name),
+                    title="Verifying Backup",
+                    on_done=lambda _: messagebox.showinfo("Success", "Backup verified: all checksums match."),
+                    on_error=lambda e: messagebox.showerror("Error", f"Backup verification failed:\n{str(e)}")
+                )
+        
+        def restore():
+            name = selected_snapshot()
+            if name:
+                dialog.destroy()
+                self.start_restore(lambda job: store.restore(job, name, self.repo.data_files()))
+        
+        button_frame = ttk.Frame(dialog)
+        button_frame.pack(pady=10)
+        ttk.Button(button_frame, text="Verify", command=verify).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Restore", command=restore).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
+    
+    def start_restore(self, restore):
+        """Confirm, then run restore(job) as a writer and reload once it is done"""
+        if not messagebox.askyesno("Confirm", "This will overwrite all current data. Continue?"):
+            return
+        
+        def on_restored(_):
+            messagebox.showinfo("Success", "Data restored successfully!")
+            self.show_login_screen()  # Restart to reload all data
+        
+        self.runner.submit(
+            restore,
+            title="Restoring Backup",
+            writer=True,
+            on_done=on_restored,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to restore backup:\n{str(e)}")
+        )
+    
+    def prune_backups(self):
+        """Delete backup snapshots outside the retention policy (Manager only)"""
+        backup_dir = filedialog.askdirectory(title="Select Backup Location")
+        if not backup_dir:
+            return
+        
+        store = BackupStore.for_directory(backup_dir)
+        if not BackupStore.is_store(store.root):
+            messagebox.showinfo("Info", f"No backup snapshots found in:\n{backup_dir}")
+            return
+        if not messagebox.askyesno("Confirm", f"Delete snapshots older than {KEEP_DAYS} days, "
+                                              f"keeping at least the newest {KEEP_LAST}?"):
+            return
+        
+        self.runner.submit(
+            lambda job: store.prune(),
+            title="Pruning Backups",
+            writer=True,
+            on_done=lambda counts: messagebox.showinfo(
+                "Success", f"Removed {counts[0]} snapshot(s) and {counts[1]} unused blob(s)."),
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to prune backups:\n{str(e)}")
+        )
     
     def export_all_data(self):
         """Export all system data to Excel (Manager only)"""
@@ -718,44 +988,73 @@ class EmployeeManagementSystem:
         if not file_path:
             return
         
-        try:
-            with pd.ExcelWriter(file_path) as writer:
-                # Export users
-                if os.path.exists(USER_FILE):
-                    users = pd.read_csv(USER_FILE, header=None, names=["Username", "Password", "Role", "Employee ID"])
-                    users.to_excel(writer, sheet_name="Users", index=False)
-                
-                # Export employees
-                if os.path.exists(EMPLOYEE_FILE):
-                    employees = pd.read_csv(EMPLOYEE_FILE, header=None, names=["Employee ID", "Employee Name"])
-                    employees.to_excel(writer, sheet_name="Employees", index=False)
-                
-                # Export attendance
-                if os.path.exists(ATTENDANCE_FILE):
-                    attendance = pd.read_excel(ATTENDANCE_FILE)
-                    attendance.to_excel(writer, sheet_name="Attendance", index=False)
-            
-            messagebox.showinfo("Success", f"All data exported to:\n{file_path}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to export data:\n{str(e)}")
+        def on_exported(timings):
+            stages = "\n".join(f"{stage}: {seconds:.2f}s" for stage, seconds in timings.items())
+            messagebox.showinfo("Success", f"All data exported to:\n{file_path}\n\n{stages}")
+        
+        self.runner.submit(
+            lambda job: export_all(job, self.repo, file_path),
+            title="Exporting All Data",
+            on_done=on_exported,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to export data:\n{str(e)}")
+        )
+    
+    def compact_attendance(self):
+        """Fold the attendance journal into the Excel file (Manager only)"""
+        def on_compacted(rows):
+            if rows:
+                messagebox.showinfo("Success", f"Compacted {rows} journal rows into:\n{ATTENDANCE_FILE}")
+            else:
+                messagebox.showinfo("Info", "Attendance journal is already empty.")
+        
+        self.runner.submit(
+            lambda job: self.repo.compact(),
+            title="Compacting Attendance",
+            writer=True,
+            on_done=on_compacted,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to compact attendance:\n{str(e)}")
+        )
+    
+    def compact_if_needed(self):
+        """Fold a grown attendance journal into the workbook in the background, so no save waits for it"""
+        def compact(job):
+            return self.repo.compact() if self.repo.needs_compaction() else 0
+        
+        self.runner.submit(compact, name="auto_compact",
+                           on_error=lambda e: messagebox.showerror("Error", f"Failed to compact attendance:\n{str(e)}"))
+    
+    def rebuild_report_summary(self):
+        """Recount the attendance report summary from the full history (Manager only)"""
+        def on_rebuilt(consistent):
+            if consistent:
+                messagebox.showinfo("Success", "Report summary rebuilt. The previous summary was correct.")
+            else:
+                messagebox.showinfo("Success", "Report summary rebuilt. The previous summary was missing or out of date and has been replaced.")
+        
+        self.runner.submit(
+            lambda job: self.repo.rebuild_summary(),
+            title="Rebuilding Report Summary",
+            writer=True,
+            on_done=on_rebuilt,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to rebuild report summary:\n{str(e)}")
+        )
     
     def clear_all_data(self):
         """Clear all system data (with confirmation, Manager only)"""
         if not messagebox.askyesno("Confirm", "This will DELETE ALL DATA in the system. Are you sure?"):
             return
         
-        try:
-            if os.path.exists(USER_FILE):
-                os.remove(USER_FILE)
-            if os.path.exists(EMPLOYEE_FILE):
-                os.remove(EMPLOYEE_FILE)
-            if os.path.exists(ATTENDANCE_FILE):
-                os.remove(ATTENDANCE_FILE)
-            
+        def on_cleared(_):
             messagebox.showinfo("Success", "All data has been cleared.")
             self.show_login_screen()
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to clear data:\n{str(e)}")
+        
+        self.runner.submit(
+            lambda job: self.repo.clear(),
+            writer=True,
+            name="clear_all_data",
+            on_done=on_cleared,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to clear data:\n{str(e)}")
+        )
     
     def show_about(self):
         """Show about dialog"""
@@ -768,8 +1067,90 @@ class EmployeeManagementSystem:
         
         messagebox.showinfo("About", about_text)
 
+
+# Modules that should not be loaded before the first window is painted
+HEAVY_MODULES = ["pandas", "numpy", "openpyxl", "matplotlib", "PIL"]
+
+
+def report_startup_timings(root):
+    """Paint the first window, print how long startup took and which heavy modules it loaded"""
+    root.update()
+    painted = time.perf_counter()
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    print(f"Imports:     {(_IMPORTED - _STARTED) * 1000:8.1f} ms")
+    print(f"First paint: {(painted - _STARTED) * 1000:8.1f} ms")
+    print(f"Heavy modules loaded: {', '.join(loaded) if loaded else 'none'}")
+
+
+def run_import(args):
+    """Headless bulk import: validate the whole file first, then write it in one batch"""
+    from bulk_import import import_attendance, import_employees
+    
+    repo = open_repository(STORAGE_BACKEND, USER_FILE, EMPLOYEE_FILE, ATTENDANCE_FILE,
+                           ATTENDANCE_JOURNAL_FILE, DATABASE_FILE)
+    importer = import_employees if args.command == "import-employees" else import_attendance
+    try:
+        count = importer(repo, args.csv_file, dry_run=args.dry_run)
+    except (OSError, ValueError) as e:
+        print(f"Import failed:\n{str(e)}", file=sys.stderr)
+        return 1
+    
+    kind = "employees" if args.command == "import-employees" else "attendance records"
+    print(f"{'Validated' if args.dry_run else 'Imported'} {count} {kind} from {args.csv_file}")
+    return 0
+
+
+def run_server(args):
+    """Headless HTTP/JSON service for check-in kiosks"""
+    from server import TOKEN_ENV, serve
+    
+    repo = open_repository(STORAGE_BACKEND, USER_FILE, EMPLOYEE_FILE, ATTENDANCE_FILE,
+                           ATTENDANCE_JOURNAL_FILE, DATABASE_FILE)
+    try:
+        serve(repo, args.host, args.port, token=os.environ.get(TOKEN_ENV))
+    except (OSError, ValueError) as e:
+        print(f"Failed to start the service:\n{str(e)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Employee Management System")
+    parser.add_argument("--startup-timings", action="store_true",
+                        help="print import and first-paint timings, then exit")
+    parser.add_argument("--profile", metavar="ACTION",
+                        help="run ACTION (e.g. job:attendance_report, repo.read_attendance) under "
+                             "cProfile and tracemalloc and write ems_profile_* files")
+    commands = parser.add_subparsers(dest="command", metavar="command",
+                                     help="run a command without opening the window")
+    employees = commands.add_parser("import-employees", help="bulk-import a CSV of Employee ID, Employee Name")
+    attendance = commands.add_parser("import-attendance",
+                                     help="bulk-import a CSV of Date, Employee ID, Status (and optional Time)")
+    for command in (employees, attendance):
+        command.add_argument("csv_file")
+        command.add_argument("--dry-run", action="store_true", help="validate the file without importing it")
+    server = commands.add_parser("serve", help="run the HTTP/JSON service for check-in kiosks")
+    server.add_argument("--host", default="127.0.0.1", help="address to listen on (default: localhost only; "
+                        "any other address needs EMS_SERVICE_TOKEN)")
+    server.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+    
+    if args.command == "serve":
+        return run_server(args)
+    if args.command:
+        return run_import(args)
+    
+    root = tk.Tk()
+    app = EmployeeManagementSystem(root, PerfMonitor(profile_action=args.profile))
+    if args.startup_timings:
+        report_startup_timings(root)
+        app.runner.shutdown()
+        root.destroy()
+        return
+    root.mainloop()
+    app.runner.shutdown()
+
+
 # Main application
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = EmployeeManagementSystem(root)
-    root.mainloop()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,80 @@
+from attendance_store import normalize_emp_id
+
+DATE_FORMAT = "%d-%m-%Y"
+STATUS_CODES = {"P": "Present", "A": "Absent"}
+REPORT_COLUMNS = ["Employee ID", "Employee Name", "Present", "Absent", "Total", "Attendance %"]
+
+
+def parse_dates(dates):
+    """Parse DD-MM-YYYY date strings; anything unparseable becomes NaT"""
+    import pandas as pd
+    
+    return pd.to_datetime(dates, format=DATE_FORMAT, errors="coerce")
+
+
+def filter_date_range(df, start=None, end=None):
+    """Keep the rows whose Date falls inside [start, end]; either bound may be None"""
+    import pandas as pd
+    
+    if start is None and end is None:
+        return df
+    dates = parse_dates(df["Date"])
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= dates >= pd.Timestamp(start)
+    if end is not None:
+        mask &= dates <= pd.Timestamp(end)
+    return df[mask]
+
+
+def report_columns(by_month=False):
+    """Return the report's column names, with Month when the report is broken down by month"""
+    return REPORT_COLUMNS[:2] + (["Month"] if by_month else []) + REPORT_COLUMNS[2:]
+
+
+def _id_sort_key(ids):
+    """Sort numeric IDs numerically and everything else as text"""
+    return ids.astype(str).str.zfill(20)
+
+
+def attendance_report(df, start=None, end=None, by_month=False):
+    """Count Present/Absent days per employee (and per month) with numeric columns
+    
+    The counting is a single grouped value_counts over the Status column, so
+    it stays fast on long histories. Rows with a status other than P or A are
+    ignored, as they were by the old string report.
+    """
+    import pandas as pd
+    
+    df = filter_date_range(df, start, end)
+    if df.empty:
+        return pd.DataFrame(columns=report_columns(by_month))
+    
+    keys = [df["Employee ID"], df["Employee Name"]]
+    if by_month:
+        keys.append(parse_dates(df["Date"]).dt.strftime("%Y-%m").rename("Month"))
+    
+    status = df["Status"].where(df["Status"].isin(list(STATUS_CODES)))
+    counts = status.groupby(keys, sort=False).value_counts().unstack(fill_value=0)
+    counts = counts.reindex(columns=list(STATUS_CODES), fill_value=0).rename(columns=STATUS_CODES)
+    counts.columns.name = None
+    return finish_report(counts.reset_index(), by_month)
+
+
+def finish_report(report, by_month=False):
+    """Add Total and Attendance % to per-employee Present/Absent counts and order the rows"""
+    import pandas as pd
+    
+    columns = report_columns(by_month)
+    if report.empty:
+        return pd.DataFrame(columns=columns)
+    
+    report = report.copy()
+    # Every report path returns IDs as text, whatever type its source held them as
+    report["Employee ID"] = report["Employee ID"].map(normalize_emp_id, na_action="ignore")
+    report["Total"] = report["Present"] + report["Absent"]
+    report["Attendance %"] = (report["Present"] / report["Total"].where(report["Total"] > 0) * 100).round(1).fillna(0.0)
+    
+    sort_by = ["Employee ID", "Month"] if by_month else ["Employee ID"]
+    report = report.sort_values(sort_by, key=lambda col: _id_sort_key(col) if col.name == "Employee ID" else col)
+    return report[columns].reset_index(drop=True)
@@ -0,0 +1,134 @@
+import bisect
+import heapq
+
+
+def _grams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """Type-ahead index over a short text per key (e.g. "<ID> <name>" per employee)
+    
+    Each query word must match. Words of three or more characters match
+    anywhere in the text and are looked up through a trigram index: only the
+    keys listed under the word's rarest trigram are checked. Shorter words
+    match the start of a word of the text, found by bisecting a sorted list
+    of words. Results come back in the order the keys were added.
+    
+    Adding and removing keys is incremental. Removed keys are dropped from
+    the trigram lists lazily (searches skip them), and the lists are rebuilt
+    once stale entries outnumber live ones.
+    """
+    
+    def __init__(self):
+        self._texts = {}
+        self._order = {}
+        self._sequence = 0
+        self._grams = {}
+        self._entries = 0
+        self._stale = 0
+        self._words = {}
+        self._sorted_words = []
+    
+    @classmethod
+    def from_items(cls, items):
+        """Build an index from (key, text) pairs in one pass"""
+        index = cls()
+        for key, text in items:
+            index._insert(key, text)
+        index._sorted_words = sorted(index._words)
+        return index
+    
+    def __len__(self):
+        return len(self._texts)
+    
+    def __contains__(self, key):
+        return key in self._texts
+    
+    def _insert(self, key, text):
+        text = str(text).lower()
+        self._texts[key] = text
+        self._order[key] = self._sequence
+        self._sequence += 1
+        grams = _grams(text)
+        for gram in grams:
+            self._grams.setdefault(gram, []).append(key)
+        self._entries += len(grams)
+        new_words = []
+        for word in set(text.split()):
+            keys = self._words.get(word)
+            if keys is None:
+                keys = self._words[word] = set()
+                new_words.append(word)
+            keys.add(key)
+        return new_words
+    
+    def add(self, key, text):
+        """Index a key, replacing its previous text if it was already indexed"""
+        if key in self._texts:
+            self.remove(key)
+        for word in self._insert(key, text):
+            bisect.insort(self._sorted_words, word)
+    
+    def remove(self, key):
+        text = self._texts.pop(key, None)
+        if text is None:
+            return
+        del self._order[key]
+        for word in set(text.split()):
+            keys = self._words[word]
+            keys.discard(key)
+            if not keys:
+                del self._words[word]
+                del self._sorted_words[bisect.bisect_left(self._sorted_words, word)]
+        
+        self._stale += len(_grams(text))
+        if self._stale > self._entries // 2:
+            self._rebuild_grams()
+    
+    def _rebuild_grams(self):
+        self._grams = {}
+        self._entries = 0
+        for key in sorted(self._texts, key=self._order.get):
+            grams = _grams(self._texts[key])
+            for gram in grams:
+                self._grams.setdefault(gram, []).append(key)
+            self._entries += len(grams)
+        self._stale = 0
+    
+    def _match_word(self, word):
+        """Return the set of keys matching one query word"""
+        if len(word) < 3:
+            matches = set()
+            position = bisect.bisect_left(self._sorted_words, word)
+            while position < len(self._sorted_words) and self._sorted_words[position].startswith(word):
+                matches |= self._words[self._sorted_words[position]]
+                position += 1
+            return matches
+        
+        grams = _grams(word)
+        if not all(gram in self._grams for gram in grams):
+            return set()
+        rarest = min(grams, key=lambda gram: len(self._grams[gram]))
+        texts = self._texts
+        return {key for key in self._grams[rarest] if key in texts and word in texts[key]}
+    
+    def search(self, query, limit=None):
+        """Return the keys whose text matches every word of the query, in the order they were added"""
+        words = str(query).lower().split()
+        if not words:
+            keys = list(self._texts)
+            keys.sort(key=self._order.get)
+            return keys if limit is None else keys[:limit]
+        
+        # Start from the longest word, which usually matches the fewest keys
+        words.sort(key=len, reverse=True)
+        matches = self._match_word(words[0])
+        for word in words[1:]:
+            if not matches:
+                break
+            matches &= self._match_word(word)
+        
+        if limit is not None:
+            return heapq.nsmallest(limit, matches, key=self._order.get)
+        return sorted(matches, key=self._order.get)
@@ -0,0 +1,311 @@
+import asyncio
+import datetime
+import hmac
+import ipaddress
+import json
+from urllib.parse import parse_qs, urlsplit
+
+from attendance_store import ATTENDANCE_COLUMNS
+from reports import DATE_FORMAT, STATUS_CODES
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# A batch of check-ins stays open this long (or until BATCH_MAX records) before it is written
+BATCH_WINDOW = 0.02
+BATCH_MAX = 5000
+MAX_BODY_BYTES = 1024 * 1024
+# Shared token kiosks must send as "Authorization: Bearer <token>"; required to listen beyond localhost
+TOKEN_ENV = "EMS_SERVICE_TOKEN"
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value):
+    """Turn numpy scalars (from DataFrame rows) into plain Python values"""
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def _frame_json(df, columns):
+    """A DataFrame as {"columns": [...], "rows": [[...], ...]} with missing values as null"""
+    df = df[columns].astype(object)
+    return {"columns": columns, "rows": df.where(df.notna(), None).values.tolist()}
+
+
+def is_loopback(host):
+    """Check whether host only accepts connections from this machine"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _query_date(query, name):
+    value = query.get(name, [""])[0].strip()
+    if not value:
+        return None
+    try:
+        return datetime.datetime.strptime(value, DATE_FORMAT).date()
+    except ValueError:
+        raise HTTPError(400, f"{name} must be in DD-MM-YYYY format")
+
+
+class AttendanceService:
+    """Small HTTP/JSON API over a repository, for check-in kiosks that cannot run the Tk app
+    
+    Endpoints:
+        GET  /health                                     service status and write counters
+        GET  /employees                                  the roster
+        POST /attendance                                 {"employee_id": "7", "status": "P"} or {"records": [...]}
+        GET  /attendance?employee_id=&start=&end=        attendance rows (dates as DD-MM-YYYY)
+        GET  /report?start=&end=&by_month=1              the attendance report
+    
+    Repository calls run in worker threads so the event loop keeps accepting
+    connections. Check-ins are queued and written in micro-batches: whatever
+    arrives within BATCH_WINDOW of the first queued request is saved with one
+    append_attendance call, and every request is answered once its batch is
+    durable. Check-ins are always for today.
+    
+    With a token, every request must carry it as a bearer token. Without one
+    the service has no authentication, so it refuses to listen beyond localhost.
+    """
+    
+    def __init__(self, repo, batch_window=BATCH_WINDOW, batch_max=BATCH_MAX, token=None):
+        self.repo = repo
+        self.token = token
+        self.batch_window = batch_window
+        self.batch_max = batch_max
+        self.batches = 0
+        self.records_written = 0
+        self._queue = None
+        self._batcher = None
+        self._server = None
+        self._compaction = None
+    
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Start listening; port 0 picks a free port. Returns the (host, port) actually bound"""
+        if not self.token and not is_loopback(host):
+            raise ValueError(f"Set {TOKEN_ENV} to listen on {host}; without a token only localhost is allowed")
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._write_batches())
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+    
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+        if self._compaction is not None:
+            await self._compaction
+    
+    # Writes
+    async def _write_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            count = len(batch[0][0])
+            deadline = loop.time() + self.batch_window
+            while count < self.batch_max:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+                count += len(batch[-1][0])
+            
+            records = [record for queued, _ in batch for record in queued]
+            try:
+                await asyncio.to_thread(self.repo.append_attendance, records)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.records_written += len(records)
+            for queued, future in batch:
+                if not future.done():
+                    future.set_result(len(queued))
+            if self._compaction is None or self._compaction.done():
+                self._compaction = asyncio.create_task(self._compact_if_needed())
+    
+    async def _compact_if_needed(self):
+        """Fold a grown journal in off the write path; batches keep being written meanwhile"""
+        try:
+            if await asyncio.to_thread(self.repo.needs_compaction):
+                await asyncio.to_thread(self.repo.compact)
+        except Exception as e:
+            print(f"Failed to compact attendance:\n{str(e)}")
+    
+    async def mark(self, records):
+        """Queue records for the next batch and wait until they are saved"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((records, future))
+        return await future
+    
+    def _records_from(self, body):
+        """Validate a POST /attendance body into attendance records"""
+        items = body.get("records", [body]) if isinstance(body, dict) else None
+        if not isinstance(items, list) or not items:
+            raise HTTPError(400, 'Expected {"employee_id": ..., "status": ...} or {"records": [...]}')
+        
+        now = datetime.datetime.now()
+        today = now.date()
+        employees = self.repo.load_employees()
+        records = []
+        for item in items:
+            if not isinstance(item, dict):
+                raise HTTPError(400, "Each record must be an object")
+            emp_id = str(item.get("employee_id", "")).strip()
+            status = str(item.get("status", "P")).strip().upper()
+            if emp_id not in employees:
+                raise HTTPError(400, f"Unknown employee ID '{emp_id}'")
+            if status not in STATUS_CODES:
+                raise HTTPError(400, f"Status must be one of {', '.join(STATUS_CODES)}")
+            if "date" in item:
+                raise HTTPError(400, "Check-ins are always for today; use the app to correct other days")
+            records.append({
+                "Date": today.strftime(DATE_FORMAT),
+                "Time": now.strftime("%H:%M:%S"),
+                "Employee ID": emp_id,
+                "Employee Name": employees[emp_id],
+                "Status": status,
+            })
+        return records
+    
+    # Requests
+    async def route(self, method, path, query, body):
+        """Return (status, JSON-able result) for one request"""
+        if path == "/health":
+            self._require(method, "GET")
+            return 200, {"status": "ok", "batches": self.batches, "records_written": self.records_written}
+        
+        if path == "/employees":
+            self._require(method, "GET")
+            employees = await asyncio.to_thread(self.repo.load_employees)
+            return 200, {"employees": [{"employee_id": emp_id, "name": name} for emp_id, name in employees.items()]}
+        
+        if path == "/attendance" and method == "POST":
+            records = await asyncio.to_thread(self._records_from, body)
+            return 201, {"saved": await self.mark(records)}
+        
+        if path == "/attendance":
+            self._require(method, "GET", "POST")
+            emp_id = query.get("employee_id", [""])[0].strip() or None
+            start, end = _query_date(query, "start"), _query_date(query, "end")
+            df = await asyncio.to_thread(self.repo.read_attendance, emp_id, start, end)
+            return 200, _frame_json(df, ATTENDANCE_COLUMNS)
+        
+        if path == "/report":
+            self._require(method, "GET")
+            start, end = _query_date(query, "start"), _query_date(query, "end")
+            by_month = query.get("by_month", ["0"])[0] in ("1", "true", "yes")
+            report = await asyncio.to_thread(self.repo.attendance_report, start, end, by_month)
+            return 200, _frame_json(report, list(report.columns))
+        
+        raise HTTPError(404, f"No such endpoint: {path}")
+    
+    def _authorized(self, headers):
+        if not self.token:
+            return True
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        return scheme.lower() == "bearer" and hmac.compare_digest(token.strip().encode("utf-8"), self.token.encode("utf-8"))
+    
+    @staticmethod
+    def _require(method, *allowed):
+        if method not in allowed:
+            raise HTTPError(405, f"Use {' or '.join(allowed)}")
+    
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                keep_alive = await self._handle_request(request_line, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _handle_request(self, request_line, reader, writer):
+        """Read one request from the stream and write its response; returns whether to keep the connection"""
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if not line.strip():
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        
+        keep_alive = headers.get("connection", "").lower() != "close"
+        try:
+            method, target, _ = request_line.decode("latin-1").split()
+            if not self._authorized(headers):
+                keep_alive = False
+                raise HTTPError(401, "Missing or wrong service token")
+            length = int(headers.get("content-length", 0))
+            if length > MAX_BODY_BYTES:
+                keep_alive = False
+                raise HTTPError(413, "Request body too large")
+            body = None
+            if length:
+                try:
+                    body = json.loads(await reader.readexactly(length))
+                except ValueError:
+                    raise HTTPError(400, "Body must be JSON")
+            url = urlsplit(target)
+            status, result = await self.route(method.upper(), url.path.rstrip("/") or "/", parse_qs(url.query), body)
+        except HTTPError as e:
+            status, result = e.status, {"error": str(e)}
+        except ValueError:
+            status, result, keep_alive = 400, {"error": "Malformed request"}, False
+        except Exception as e:
+            status, result = 500, {"error": f"Failed to handle request:\n{str(e)}"}
+        
+        payload = json.dumps(result, default=_json_default).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + payload
+        )
+        return keep_alive
+
+
+def serve(repo, host=DEFAULT_HOST, port=DEFAULT_PORT, token=None):
+    """Run the service until interrupted"""
+    async def run():
+        service = AttendanceService(repo, token=token)
+        bound_host, bound_port = await service.start(host, port)
+        print(f"EMS service listening on http://{bound_host}:{bound_port}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await service.close()
+    
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,665 @@
+import argparse
+import datetime
+import os
+import sqlite3
+from contextlib import contextmanager
+
+from attendance_matrix import AttendanceMatrix
+from attendance_partitions import AttendancePartitions, month_key
+from attendance_store import ATTENDANCE_COLUMNS, AttendanceStore, normalize_emp_id
+from attendance_summary import AttendanceSummary, month_span
+from concurrency import GroupCommit
+from employee_directory import EmployeeDirectory
+from file_utils import file_signature
+from reports import DATE_FORMAT, attendance_report, filter_date_range, finish_report, report_columns
+from user_store import User, UserStore
+
+USER_COLUMNS = ["Username", "Password", "Role", "Employee ID"]
+EMPLOYEE_COLUMNS = ["Employee ID", "Employee Name"]
+
+
+class Repository:
+    """Storage interface used by the application; one implementation per backend"""
+    
+    # Users
+    def has_users(self):
+        raise NotImplementedError
+    
+    def user_exists(self, username):
+        raise NotImplementedError
+    
+    def authenticate(self, username, password, role):
+        """Return the matching user record (with username, role and emp_id) or None"""
+        raise NotImplementedError
+    
+    def add_user(self, username, password, role, emp_id=None):
+        """Add an account; raises ValueError when the username is taken"""
+        raise NotImplementedError
+    
+    def users_frame(self):
+        raise NotImplementedError
+    
+    # Employees
+    def load_employees(self):
+        """Return the roster as a dict of employee ID to name"""
+        raise NotImplementedError
+    
+    def add_employee(self, emp_id, emp_name):
+        raise NotImplementedError
+    
+    def add_employees(self, employees):
+        """Add (emp_id, emp_name) pairs in one batch"""
+        raise NotImplementedError
+    
+    def remove_employee(self, emp_id):
+        raise NotImplementedError
+    
+    def has_employee(self, emp_id):
+        return emp_id in self.load_employees()
+    
+    def employees_frame(self):
+        import pandas as pd
+        
+        employees = self.load_employees()
+        return pd.DataFrame(list(employees.items()), columns=EMPLOYEE_COLUMNS)
+    
+    # Attendance
+    def has_attendance(self):
+        raise NotImplementedError
+    
+    def append_attendance(self, records):
+        raise NotImplementedError
+    
+    def read_attendance(self, emp_id=None, start=None, end=None):
+        """Return attendance rows, optionally for one employee and/or a date range"""
+        raise NotImplementedError
+    
+    def attendance_report(self, start=None, end=None, by_month=False):
+        raise NotImplementedError
+    
+    def rebuild_summary(self):
+        """Recount the report summary from scratch; returns True if the old summary was already correct"""
+        raise NotImplementedError
+    
+    def count_attendance(self):
+        raise NotImplementedError
+    
+    def iter_attendance(self, chunk_size=5000):
+        """Yield all attendance rows as lists of tuples in ATTENDANCE_COLUMNS order, one chunk at a time"""
+        raise NotImplementedError
+    
+    def attendance_version(self):
+        """Return a value that changes whenever the attendance changes, or None if unknown"""
+        return None
+    
+    def attendance_matrix(self):
+        """Return the attendance as an AttendanceMatrix, kept until attendance_version() changes"""
+        version = self.attendance_version()
+        cached_version, matrix = getattr(self, "_matrix", (None, None))
+        if matrix is None or version is None or version != cached_version:
+            matrix = self._build_matrix()
+            self._matrix = (version, matrix)
+        return matrix
+    
+    def _build_matrix(self):
+        # Streamed, so the history is never held as a DataFrame
+        return AttendanceMatrix.from_chunks(self.iter_attendance())
+    
+    def attendance_workbook(self):
+        """Return the path of a workbook already holding exactly the attendance rows, or None"""
+        return None
+    
+    def needs_compaction(self):
+        """Check whether enough writes are pending for compact() to be worth running"""
+        return False
+    
+    def compact(self):
+        """Fold pending writes into the main data file; returns the number of rows folded"""
+        return 0
+    
+    # Maintenance
+    def data_files(self):
+        """Return (path, required) pairs for every file holding this backend's data"""
+        raise NotImplementedError
+    
+    def data_locks(self):
+        """Return the locks writers hold on the data files, to be taken in this order for a consistent copy"""
+        return []
+    
+    def clear(self):
+        for path, _ in self.data_files():
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class FlatFileRepository(Repository):
+    """The original users.txt / employees.txt / attendance.xlsx files"""
+    
+    def __init__(self, user_file, employee_file, attendance_file, journal_file):
+        self.user_file = user_file
+        self.employee_file = employee_file
+        self.employees = EmployeeDirectory(employee_file)
+        self.user_store = UserStore(user_file)
+        self.attendance_store = AttendanceStore(attendance_file, journal_file)
+        base, _ = os.path.splitext(attendance_file)
+        self.summary = AttendanceSummary(f"{base}.summary.json")
+        self.by_employee = AttendancePartitions(f"{base}.by_employee", "Employee ID", normalize_emp_id)
+        self.by_month = AttendancePartitions(f"{base}.by_month", "Date", month_key)
+        self.partitions = (self.by_employee, self.by_month)
+        self.attendance_commits = GroupCommit(self._write_attendance)
+    
+    def has_users(self):
+        return os.path.exists(self.user_file)
+    
+    def user_exists(self, username):
+        return self.user_store.exists(username)
+    
+    def authenticate(self, username, password, role):
+        return self.user_store.authenticate(username, password, role)
+    
+    def add_user(self, username, password, role, emp_id=None):
+        return self.user_store.add(username, password, role, emp_id)
+    
+    def users_frame(self):
+        import pandas as pd
+        
+        if not os.path.exists(self.user_file):
+            return pd.DataFrame(columns=USER_COLUMNS)
+        return pd.read_csv(self.user_file, header=None, names=USER_COLUMNS)
+    
+    def load_employees(self):
+        return self.employees.all()
+    
+    def add_employee(self, emp_id, emp_name):
+        self.employees.add(emp_id, emp_name)
+    
+    def add_employees(self, employees):
+        self.employees.add_many(employees)
+    
+    def remove_employee(self, emp_id):
+        self.employees.remove(emp_id)
+    
+    def has_employee(self, emp_id):
+        return emp_id in self.employees
+    
+    def has_attendance(self):
+        return self.attendance_store.exists()
+    
+    def append_attendance(self, records):
+        self.attendance_commits.commit(records)
+    
+    def _write_attendance(self, records):
+        """Append a group-committed batch of records while holding the attendance lock"""
+        store = self.attendance_store
+        with store.lock:
+            signature = store.signature()
+            summary_current = self.summary.is_current(signature)
+            partitions_current = [partitions for partitions in self.partitions if partitions.is_current(signature)]
+            store.append(records)
+            
+            # Keep the report summary and the partitions in step;
+            # stale ones are rebuilt the next time they are needed instead
+            if summary_current:
+                self.summary.add(records, store.signature())
+            for partitions in partitions_current:
+                partitions.add(records, store.signature())
+    
+    def _current(self, partitions):
+        # Under the write lock, so a save cannot land between the rebuild and its own partitions.add()
+        store = self.attendance_store
+        with store.lock:
+            signature = store.signature()
+            if not partitions.is_current(signature):
+                partitions.rebuild(store.read(), signature)
+        return partitions
+    
+    def read_attendance(self, emp_id=None, start=None, end=None):
+        if emp_id is not None:
+            # One employee's rows come from their own partition, not the whole history
+            rows = self._current(self.by_employee).read(normalize_emp_id(emp_id))
+        elif start is not None or end is not None:
+            # Only the months overlapping the range are opened
+            by_month = self._current(self.by_month)
+            first = start.strftime("%Y-%m") if start is not None else ""
+            last = end.strftime("%Y-%m") if end is not None else "9999-99"
+            rows = by_month.read_many(sorted(key for key in by_month.catalog() if first <= key <= last))
+        else:
+            return self.attendance_store.read()
+        return filter_date_range(rows, start, end)
+    
+    def attendance_report(self, start=None, end=None, by_month=False):
+        store = self.attendance_store
+        with store.lock:
+            signature = store.signature()
+            if not self.summary.is_current(signature):
+                self.summary.rebuild(store.read(), signature)
+            report = self.summary.report(start, end, by_month)
+        if report is None:
+            # Ranges that cut through a month need per-day data; the matrix has it unless days were marked twice
+            matrix = self.attendance_matrix()
+            if matrix.exact:
+                return matrix.report(start, end, by_month)
+            report = attendance_report(self.attendance_store.read(), start, end, by_month)
+        return report
+    
+    def rebuild_summary(self):
+        store = self.attendance_store
+        with store.lock:
+            return self.summary.rebuild(store.read(), store.signature())
+    
+    def count_attendance(self):
+        return self.attendance_store.row_count()
+    
+    def iter_attendance(self, chunk_size=5000):
+        return self.attendance_store.iter_rows(chunk_size)
+    
+    def attendance_version(self):
+        return self.attendance_store.signature()
+    
+    def _build_matrix(self):
+        # The parsed frame is usually cached already, and the pickle sidecar makes it cheap when it is not
+        return AttendanceMatrix.from_frame(self.attendance_store.read())
+    
+    def attendance_workbook(self):
+        # With no journal pending the compacted workbook is the whole history
+        store = self.attendance_store
+        if os.path.exists(store.excel_path) and not any(os.path.exists(path) for path in (store.rotated_path, store.journal_path)):
+            return store.excel_path
+        return None
+    
+    def needs_compaction(self):
+        return self.attendance_store.needs_compaction()
+    
+    def compact(self):
+        rows = self.attendance_store.compact(moved=self._keep_current)
+        self.employees.compact()
+        return rows
+    
+    def _keep_current(self, before, after):
+        """Carry the summary and partitions over when the attendance files move but their records do not"""
+        if self.summary.is_current(before):
+            self.summary.mark_current(after)
+        for partitions in self.partitions:
+            if partitions.is_current(before):
+                partitions.mark_current(after)
+    
+    def data_files(self):
+        store = self.attendance_store
+        return [
+            (self.user_file, True),
+            (self.employee_file, True),
+            (store.excel_path, True),
+            # The journal is optional: older backups were taken before it existed
+            (store.journal_path, False),
+            # Only there while a compaction is folding it into the workbook
+            (store.rotated_path, False),
+        ]
+    
+    def data_locks(self):
+        return [self.user_store.lock, self.employees.file_lock, self.attendance_store.lock]
+    
+    def clear(self):
+        super().clear()
+        self.attendance_store.clear()
+        self.summary.clear()
+        for partitions in self.partitions:
+            partitions.clear()
+
+
+def _iso_date(text):
+    """Store dates as YYYY-MM-DD so they sort and range-query correctly; keep anything unparseable as-is"""
+    try:
+        return datetime.datetime.strptime(str(text), DATE_FORMAT).date().isoformat()
+    except ValueError:
+        return str(text)
+
+
+class SQLiteRepository(Repository):
+    """Everything in one SQLite database with indexes on (employee_id, date) and username
+    
+    Per-employee views, date filters and reports are indexed queries instead
+    of full scans of the attendance history. Each call opens its own
+    connection, so the repository can be used from the background workers.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY,
+            username TEXT NOT NULL,
+            password TEXT NOT NULL,
+            role TEXT NOT NULL,
+            employee_id TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_users_username ON users (username);
+        
+        CREATE TABLE IF NOT EXISTS employees (
+            employee_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL
+        );
+        
+        CREATE TABLE IF NOT EXISTS attendance (
+            id INTEGER PRIMARY KEY,
+            date TEXT NOT NULL,
+            time TEXT,
+            employee_id TEXT NOT NULL,
+            employee_name TEXT,
+            status TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_attendance_employee_date ON attendance (employee_id, date);
+        CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance (date);
+        
+        CREATE TABLE IF NOT EXISTS attendance_summary (
+            employee_id TEXT NOT NULL,
+            employee_name TEXT NOT NULL,
+            month TEXT NOT NULL,
+            present INTEGER NOT NULL DEFAULT 0,
+            absent INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (employee_id, employee_name, month)
+        );
+        
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+    
+    # Month of an ISO date, or '' for dates that could not be parsed when stored
+    MONTH_EXPR = "CASE WHEN date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]' THEN substr(date, 1, 7) ELSE '' END"
+    
+    ATTENDANCE_SELECT = """
+        SELECT COALESCE(strftime('%d-%m-%Y', date), date) AS "Date",
+               time AS "Time",
+               employee_id AS "Employee ID",
+               employee_name AS "Employee Name",
+               status AS "Status"
+        FROM attendance
+    """
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.attendance_commits = GroupCommit(self._write_attendance)
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+            summary_built = conn.execute("SELECT 1 FROM meta WHERE key = 'summary_built'").fetchone()
+        if not summary_built:
+            # Databases created before the summary table existed
+            self.rebuild_summary()
+    
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def _scalar(self, sql, params=()):
+        with self._connect() as conn:
+            return conn.execute(sql, params).fetchone()[0]
+    
+    def has_users(self):
+        return self._scalar("SELECT EXISTS (SELECT 1 FROM users)") == 1
+    
+    def user_exists(self, username):
+        return self._scalar("SELECT EXISTS (SELECT 1 FROM users WHERE username = ?)", (username,)) == 1
+    
+    def authenticate(self, username, password, role):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT username, password, role, employee_id FROM users "
+                "WHERE username = ? AND password = ? AND role = ? ORDER BY id LIMIT 1",
+                (username, password, role)
+            ).fetchone()
+        return User(row[0], row[1], row[2], row[3] or None) if row else None
+    
+    def add_user(self, username, password, role, emp_id=None):
+        with self._connect() as conn:
+            # Take the write lock before the check so two registrations cannot both pass it
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM users WHERE username = ?", (username,)).fetchone():
+                raise ValueError(f"Username '{username}' already exists!")
+            conn.execute(
+                "INSERT INTO users (username, password, role, employee_id) VALUES (?, ?, ?, ?)",
+                (username, password, role, emp_id or None)
+            )
+        return User(username, password, role, emp_id or None)
+    
+    def users_frame(self):
+        import pandas as pd
+        
+        with self._connect() as conn:
+            return pd.read_sql_query(
+                'SELECT username AS "Username", password AS "Password", role AS "Role", '
+                'employee_id AS "Employee ID" FROM users ORDER BY id', conn
+            )
+    
+    def load_employees(self):
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT employee_id, name FROM employees ORDER BY rowid"))
+    
+    def add_employee(self, emp_id, emp_name):
+        try:
+            with self._connect() as conn:
+                conn.execute("INSERT INTO employees (employee_id, name) VALUES (?, ?)", (emp_id, emp_name))
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Employee ID '{emp_id}' already exists!")
+    
+    def add_employees(self, employees):
+        with self._connect() as conn:
+            conn.executemany("INSERT INTO employees (employee_id, name) VALUES (?, ?)", list(employees))
+    
+    def remove_employee(self, emp_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM employees WHERE employee_id = ?", (emp_id,))
+    
+    def has_employee(self, emp_id):
+        return self._scalar("SELECT EXISTS (SELECT 1 FROM employees WHERE employee_id = ?)", (emp_id,)) == 1
+    
+    def has_attendance(self):
+        return self._scalar("SELECT EXISTS (SELECT 1 FROM attendance)") == 1
+    
+    def append_attendance(self, records):
+        self.attendance_commits.commit(records)
+    
+    def _write_attendance(self, records):
+        """Insert a group-committed batch of records in one transaction"""
+        rows = [
+            (_iso_date(r["Date"]), r["Time"], normalize_emp_id(r["Employee ID"]), r["Employee Name"], r["Status"])
+            for r in records
+        ]
+        summary = {}
+        for date, _, emp_id, emp_name, status in rows:
+            if status in ("P", "A"):
+                month = date[:7] if len(date) == 10 and date[4] == "-" else ""
+                counts = summary.setdefault((emp_id, emp_name or "", month), [0, 0])
+                counts[0 if status == "P" else 1] += 1
+        
+        # The rows and their summary counters are committed in the same transaction
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO attendance (date, time, employee_id, employee_name, status) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.executemany(
+                "INSERT INTO attendance_summary (employee_id, employee_name, month, present, absent) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (employee_id, employee_name, month) "
+                "DO UPDATE SET present = present + excluded.present, absent = absent + excluded.absent",
+                [key + tuple(counts) for key, counts in summary.items()]
+            )
+    
+    def _where(self, emp_id=None, start=None, end=None):
+        clauses, params = [], []
+        if emp_id is not None:
+            clauses.append("employee_id = ?")
+            params.append(normalize_emp_id(emp_id))
+        if start is not None:
+            clauses.append("date >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            clauses.append("date <= ?")
+            params.append(end.isoformat())
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+    
+    def read_attendance(self, emp_id=None, start=None, end=None):
+        import pandas as pd
+        
+        where, params = self._where(emp_id, start, end)
+        with self._connect() as conn:
+            return pd.read_sql_query(self.ATTENDANCE_SELECT + where + " ORDER BY id", conn, params=params)
+    
+    def attendance_report(self, start=None, end=None, by_month=False):
+        import pandas as pd
+        
+        span = month_span(start, end)
+        if span is None:
+            # Ranges that cut through a month need the individual rows
+            return self._report_from_rows(start, end, by_month)
+        first, last = span
+        
+        clauses, params = [], []
+        if by_month or first or last:
+            clauses.append("month != ''")
+        if first:
+            clauses.append("month >= ?")
+            params.append(first)
+        if last:
+            clauses.append("month <= ?")
+            params.append(last)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        month = ', month AS "Month"' if by_month else ""
+        group_month = ", month" if by_month else ""
+        sql = (
+            f'SELECT employee_id AS "Employee ID", employee_name AS "Employee Name"{month}, '
+            'SUM(present) AS "Present", SUM(absent) AS "Absent" '
+            f"FROM attendance_summary{where} "
+            f"GROUP BY employee_id, employee_name{group_month} "
+            "HAVING SUM(present + absent) > 0"
+        )
+        with self._connect() as conn:
+            counts = pd.read_sql_query(sql, conn, params=params)
+        if counts.empty:
+            return pd.DataFrame(columns=report_columns(by_month))
+        return finish_report(counts, by_month)
+    
+    def _report_from_rows(self, start=None, end=None, by_month=False):
+        import pandas as pd
+        
+        where, params = self._where(start=start, end=end)
+        month = ', substr(date, 1, 7) AS "Month"' if by_month else ""
+        group_month = ", substr(date, 1, 7)" if by_month else ""
+        sql = (
+            f'SELECT employee_id AS "Employee ID", employee_name AS "Employee Name"{month}, '
+            'SUM(status = \'P\') AS "Present", SUM(status = \'A\') AS "Absent" '
+            f"FROM attendance{where} "
+            f"GROUP BY employee_id, employee_name{group_month} "
+            "HAVING SUM(status IN ('P', 'A')) > 0"
+        )
+        with self._connect() as conn:
+            counts = pd.read_sql_query(sql, conn, params=params)
+        if counts.empty:
+            return pd.DataFrame(columns=report_columns(by_month))
+        return finish_report(counts, by_month)
+    
+    def rebuild_summary(self):
+        select = "SELECT employee_id, employee_name, month, present, absent FROM attendance_summary ORDER BY 1, 2, 3"
+        with self._connect() as conn:
+            previous = conn.execute(select).fetchall()
+            conn.execute("DELETE FROM attendance_summary")
+            conn.execute(
+                "INSERT INTO attendance_summary (employee_id, employee_name, month, present, absent) "
+                f"SELECT employee_id, COALESCE(employee_name, ''), {self.MONTH_EXPR}, "
+                "SUM(status = 'P'), SUM(status = 'A') "
+                "FROM attendance WHERE status IN ('P', 'A') GROUP BY 1, 2, 3"
+            )
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('summary_built', '1')")
+            return conn.execute(select).fetchall() == previous
+    
+    def count_attendance(self):
+        return self._scalar("SELECT COUNT(*) FROM attendance")
+    
+    def iter_attendance(self, chunk_size=5000):
+        with self._connect() as conn:
+            cursor = conn.execute(self.ATTENDANCE_SELECT + " ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+    
+    def attendance_version(self):
+        # Any committed write changes the database file; over-invalidating on user or employee changes is harmless
+        return file_signature(self.db_path)
+    
+    def data_files(self):
+        return [(self.db_path, True)]
+    
+    def clear(self):
+        with self._connect() as conn:
+            conn.executescript(
+                "DELETE FROM users; DELETE FROM employees; DELETE FROM attendance; DELETE FROM attendance_summary;"
+            )
+
+
+def open_repository(backend, user_file, employee_file, attendance_file, journal_file, db_file):
+    """Create the repository for the configured storage backend ("flat" or "sqlite")"""
+    if backend == "sqlite":
+        return SQLiteRepository(db_file)
+    if backend == "flat":
+        return FlatFileRepository(user_file, employee_file, attendance_file, journal_file)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def migrate_flat_to_sqlite(source, target):
+    """Copy every user, employee and attendance row from flat files into an empty SQLite repository"""
+    import pandas as pd
+    
+    with target._connect() as conn:
+        if conn.execute("SELECT EXISTS (SELECT 1 FROM users) OR EXISTS (SELECT 1 FROM employees) "
+                        "OR EXISTS (SELECT 1 FROM attendance)").fetchone()[0]:
+            raise ValueError(f"{target.db_path} already contains data; migrate into a new database.")
+        
+        source.user_store.refresh()
+        users = [
+            (user.username, user.password, user.role, user.emp_id)
+            for records in source.user_store.users.values()
+            for user in records
+        ]
+        conn.executemany("INSERT INTO users (username, password, role, employee_id) VALUES (?, ?, ?, ?)", users)
+        
+        employees = list(source.load_employees().items())
+        conn.executemany("INSERT INTO employees (employee_id, name) VALUES (?, ?)", employees)
+        
+        attendance = source.read_attendance()
+        # Rows without an employee ID cannot be queried by employee; leave them out and report them
+        rows = [
+            (_iso_date(date), time, normalize_emp_id(emp_id), name, status)
+            for date, time, emp_id, name, status in attendance[ATTENDANCE_COLUMNS].itertuples(index=False)
+            if pd.notna(emp_id) and str(emp_id).strip()
+        ]
+        conn.executemany(
+            "INSERT INTO attendance (date, time, employee_id, employee_name, status) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+    target.rebuild_summary()
+    return {"users": len(users), "employees": len(employees), "attendance": len(rows),
+            "skipped": len(attendance) - len(rows)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate the EMS flat files into a SQLite database")
+    parser.add_argument("--users", default="users.txt")
+    parser.add_argument("--employees", default="employees.txt")
+    parser.add_argument("--attendance", default="attendance.xlsx")
+    parser.add_argument("--journal", default="attendance_journal.csv")
+    parser.add_argument("--db", default="ems.db")
+    args = parser.parse_args()
+    
+    counts = migrate_flat_to_sqlite(
+        FlatFileRepository(args.users, args.employees, args.attendance, args.journal),
+        SQLiteRepository(args.db)
+    )
+    print(f"Migrated {counts['users']} users, {counts['employees']} employees "
+          f"and {counts['attendance']} attendance rows into {args.db}")
+    if counts["skipped"]:
+        print(f"Skipped {counts['skipped']} attendance rows without an employee ID")
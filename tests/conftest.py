@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+# The application modules live at the top level of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def record(emp_id, name="Asha", status="P", date="03-03-2025"):
+    """One attendance record as the application saves it"""
+    return {"Date": date, "Time": "09:00:00", "Employee ID": emp_id, "Employee Name": name, "Status": status}
+
+
+def make_flat_repo(directory):
+    from storage import FlatFileRepository
+    
+    return FlatFileRepository(str(directory / "users.txt"), str(directory / "employees.txt"),
+                              str(directory / "attendance.xlsx"), str(directory / "attendance_journal.csv"))
+
+
+@pytest.fixture
+def flat_repo(tmp_path):
+    """A flat-file repository in an empty temporary directory"""
+    return make_flat_repo(tmp_path)
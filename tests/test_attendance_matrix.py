@@ -0,0 +1,64 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from attendance_matrix import ABSENT, NOT_RECORDED, PRESENT, AttendanceMatrix
+from conftest import record
+from reports import attendance_report
+
+A, P, _ = ABSENT, PRESENT, NOT_RECORDED
+FIRST_DAY = datetime.date(2025, 3, 3)
+
+
+def fixed_matrix():
+    # Nobody has a record on days 3 and 6 (a weekend, say)
+    return AttendanceMatrix(["1", "2", "3"], ["Asha", "Ravi", "Kumar"], FIRST_DAY, np.array([
+        [A, A, A, _, A, P, _, A],
+        [P, A, P, _, P, P, _, P],
+        [_, _, A, _, _, A, _, A],
+    ], dtype=np.uint8))
+
+
+def test_absence_streaks_skip_days_without_any_record():
+    longest, current = fixed_matrix().absence_streaks()
+    # Asha's first streak runs across day 3; Kumar's own missing record on day 4 breaks his, day 6 does not
+    assert longest.tolist() == [4, 1, 2]
+    assert current.tolist() == [1, 0, 2]
+
+
+def test_absence_streaks_in_a_date_range():
+    longest, current = fixed_matrix().absence_streaks(FIRST_DAY + datetime.timedelta(days=4))
+    assert longest.tolist() == [1, 0, 2]
+    assert current.tolist() == [1, 0, 2]
+
+
+def test_streak_report_lists_the_longest_streaks_first():
+    report = fixed_matrix().streak_report()
+    assert report["Employee ID"].tolist() == ["1", "3", "2"]
+    assert report[["Present", "Absent", "Longest Absence", "Current Absence"]].values.tolist() == [
+        [1, 5, 4, 1],
+        [0, 3, 2, 2],
+        [5, 1, 1, 0],
+    ]
+    assert report["Attendance %"].tolist() == [16.7, 0.0, 83.3]
+
+
+def test_exact_matrix_report_matches_the_row_report():
+    df = pd.DataFrame([
+        record("007", "Bond", "P", "28-02-2025"),
+        record("12", "Asha", "A", "28-02-2025"),
+        record("007", "Bond", "A", "03-03-2025"),
+        record("12", "Asha", "P", "03-03-2025"),
+        record("12", "Asha", "P", "04-03-2025"),
+        record("9", "Ravi", "A", "31-03-2025"),
+    ])
+    matrix = AttendanceMatrix.from_frame(df)
+    assert matrix.exact
+    
+    ranges = [(None, None), (datetime.date(2025, 3, 1), None), (datetime.date(2025, 3, 2), datetime.date(2025, 3, 30))]
+    for start, end in ranges:
+        for by_month in (False, True):
+            assert_frame_equal(matrix.report(start, end, by_month), attendance_report(df, start, end, by_month),
+                               check_dtype=False)
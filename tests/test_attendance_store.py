@@ -0,0 +1,57 @@
+from attendance_store import AttendanceStore, _frame_cache
+from conftest import record
+
+
+def make_store(tmp_path):
+    return AttendanceStore(str(tmp_path / "attendance.xlsx"), str(tmp_path / "attendance_journal.csv"))
+
+
+def test_compaction_keeps_leading_zeros(tmp_path):
+    from openpyxl import load_workbook
+    
+    store = make_store(tmp_path)
+    store.append([record("007"), record("12")])
+    assert store.read()["Employee ID"].tolist() == ["007", "12"]
+    
+    store.compact()
+    workbook = load_workbook(store.excel_path, read_only=True)
+    try:
+        ids = [row[2] for row in workbook.active.iter_rows(min_row=2, values_only=True)]
+    finally:
+        workbook.close()
+    assert ids == ["007", "12"]
+    
+    # Read back from the pickle sidecar, then from the workbook itself
+    _frame_cache.clear()
+    assert make_store(tmp_path).read()["Employee ID"].tolist() == ["007", "12"]
+    _frame_cache.clear()
+    (tmp_path / "attendance.cache.pkl").unlink()
+    assert make_store(tmp_path).read()["Employee ID"].tolist() == ["007", "12"]
+
+
+def test_iter_rows_streams_ids_as_text(tmp_path):
+    store = make_store(tmp_path)
+    store.append([record("007"), record("12")])
+    store.compact()
+    store.append([record("008")])
+    _frame_cache.clear()
+    
+    rows = [row for chunk in store.iter_rows() for row in chunk]
+    assert [row[2] for row in rows] == ["007", "12", "008"]
+
+
+def test_compaction_threshold_grows_with_the_workbook(tmp_path):
+    store = AttendanceStore(str(tmp_path / "attendance.xlsx"), str(tmp_path / "attendance_journal.csv"),
+                            compact_threshold=10)
+    store.append([record(str(i)) for i in range(9)])
+    assert not store.needs_compaction()
+    store.append([record("9")])
+    assert store.needs_compaction()
+    
+    store.append([record(str(i)) for i in range(30)])
+    store.compact()
+    # 40 rows in the workbook: the journal is due at half of that, not at the fixed 10
+    store.append([record(str(i)) for i in range(19)])
+    assert not store.needs_compaction()
+    store.append([record("19")])
+    assert store.needs_compaction()
@@ -0,0 +1,85 @@
+import os
+import threading
+
+from background import Job
+from backup import BackupStore
+from conftest import record
+
+
+def test_prune_waits_for_a_snapshot_being_created(tmp_path):
+    data = tmp_path / "employees.txt"
+    data.write_text("1,Asha\n")
+    store = BackupStore(str(tmp_path / "ems_backups"))
+    store.create(Job(None), [(str(data), True)])
+    
+    # Prune while the next snapshot has stored its blob but not yet written its manifest
+    data.write_text("1,Asha\n2,Ravi\n")
+    store_blob = store._store_blob
+    pruners = []
+    
+    def store_blob_then_prune(job, path, digest):
+        written = store_blob(job, path, digest)
+        pruner = threading.Thread(target=store.prune, kwargs={"keep_last": 1, "keep_days": 0})
+        pruner.start()
+        pruner.join(0.1)
+        pruners.append(pruner)
+        return written
+    
+    store._store_blob = store_blob_then_prune
+    created = store.create(Job(None), [(str(data), True)])
+    for pruner in pruners:
+        pruner.join()
+    
+    # The prune ran once the snapshot was complete: it kept the new one and dropped the old one
+    assert [name for name, _ in store.snapshots()] == [created["snapshot"]]
+    for entry in store.manifest(created["snapshot"])["files"]:
+        assert os.path.exists(store._blob_path(entry["sha256"]))
+
+
+def test_saves_wait_for_a_snapshot_being_created(tmp_path, flat_repo):
+    repo = flat_repo
+    repo.add_employee("1", "Asha")
+    repo.append_attendance([record("1")])
+    store = BackupStore(str(tmp_path / "ems_backups"))
+    
+    # Save while the snapshot is storing the first data file
+    store_blob = store._store_blob
+    savers = []
+    
+    def store_blob_then_save(job, path, digest):
+        if not savers:
+            saver = threading.Thread(target=repo.append_attendance, args=([record("1", date="04-03-2025")],))
+            saver.start()
+            saver.join(0.1)
+            savers.append(saver)
+            assert saver.is_alive()
+        return store_blob(job, path, digest)
+    
+    store._store_blob = store_blob_then_save
+    created = store.create(Job(None), repo.data_files(), repo.data_locks())
+    for saver in savers:
+        saver.join()
+    
+    # The snapshot holds the journal as it was before the save, which went through afterwards
+    journal = os.path.basename(repo.attendance_store.journal_path)
+    sizes = {entry["name"]: entry["size"] for entry in store.manifest(created["snapshot"])["files"]}
+    assert sizes[journal] < os.path.getsize(repo.attendance_store.journal_path)
+    assert len(repo.read_attendance()) == 2
+
+
+def test_files_removed_during_a_snapshot_are_skipped(tmp_path):
+    data = tmp_path / "employees.txt"
+    data.write_text("1,Asha\n")
+    journal = tmp_path / "attendance_journal.csv"
+    journal.write_text("Date\n")
+    
+    class RemovingJob(Job):
+        def progress(self, fraction=None, message=""):
+            # The journal disappears once the snapshot has listed it, as when a compaction folds it in
+            if journal.exists():
+                journal.unlink()
+    
+    store = BackupStore(str(tmp_path / "ems_backups"))
+    created = store.create(RemovingJob(None), [(str(data), True), (str(journal), False)])
+    
+    assert [entry["name"] for entry in store.manifest(created["snapshot"])["files"]] == ["employees.txt"]
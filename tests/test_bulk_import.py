@@ -0,0 +1,87 @@
+import datetime
+
+import pytest
+
+from bulk_import import import_attendance, import_employees
+
+
+def write_csv(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_bad_employee_rows_are_all_reported_and_none_imported(tmp_path, flat_repo):
+    flat_repo.add_employee("1", "Asha")
+    path = write_csv(tmp_path, "new.csv", (
+        "Employee ID,Employee Name\n"
+        "2,Ravi\n"
+        "2,Ravi Again\n"
+        "1,Asha Again\n"
+        '3,"Kumar, Jr"\n'
+        "4,\n"
+    ))
+    
+    with pytest.raises(ValueError) as error:
+        import_employees(flat_repo, path)
+    
+    message = str(error.value)
+    assert message.startswith("4 problem(s) found, nothing was imported")
+    assert "Line 3: duplicate Employee ID '2'" in message
+    assert "Line 4: Employee ID '1' already exists" in message
+    assert "Line 5: commas are not allowed" in message
+    assert "Line 6: missing Employee Name for ID '4'" in message
+    assert flat_repo.load_employees() == {"1": "Asha"}
+
+
+def test_bad_attendance_rows_are_all_reported_and_none_imported(tmp_path, flat_repo):
+    flat_repo.add_employee("1", "Asha")
+    tomorrow = (datetime.date.today() + datetime.timedelta(days=1)).strftime("%d-%m-%Y")
+    path = write_csv(tmp_path, "badges.csv", (
+        "Date,Employee ID,Status\n"
+        "03-03-2025,1,P\n"
+        "03-03-2025,1,A\n"
+        "03-03-2025,9,P\n"
+        f"{tomorrow},1,P\n"
+        "2025/03/04,1,P\n"
+        "05-03-2025,1,Late\n"
+    ))
+    
+    with pytest.raises(ValueError) as error:
+        import_attendance(flat_repo, path)
+    
+    lines = str(error.value).splitlines()
+    assert lines[0] == "5 problem(s) found, nothing was imported:"
+    assert lines[1:] == [
+        "Line 3: duplicate row for Employee ID '1' on 03-03-2025",
+        "Line 4: unknown Employee ID '9'",
+        f"Line 5: date '{tomorrow}' is in the future",
+        "Line 6: bad date '2025/03/04' (use DD-MM-YYYY)",
+        "Line 7: bad status 'Late' (use P or A)",
+    ]
+    assert not flat_repo.has_attendance()
+
+
+def test_status_aliases_iso_dates_and_roster_names(tmp_path, flat_repo):
+    flat_repo.add_employees([("007", "Bond"), ("12", "Asha")])
+    path = write_csv(tmp_path, "badges.csv", (
+        "Date,Employee ID,Status,Time\n"
+        "03-03-2025,007,present,08:55:00\n"
+        "2025-03-03, 12 ,Absent,\n"
+    ))
+    
+    assert import_attendance(flat_repo, path) == 2
+    
+    df = flat_repo.read_attendance()
+    assert df[["Date", "Time", "Employee ID", "Employee Name", "Status"]].values.tolist() == [
+        ["03-03-2025", "08:55:00", "007", "Bond", "P"],
+        ["03-03-2025", "00:00:00", "12", "Asha", "A"],
+    ]
+
+
+def test_dry_run_validates_without_writing(tmp_path, flat_repo):
+    flat_repo.add_employee("1", "Asha")
+    path = write_csv(tmp_path, "badges.csv", "Date,Employee ID,Status\n03-03-2025,1,P\n04-03-2025,1,A\n")
+    
+    assert import_attendance(flat_repo, path, dry_run=True) == 2
+    assert not flat_repo.has_attendance()
@@ -0,0 +1,11 @@
+from employee_directory import EmployeeDirectory
+
+
+def test_append_after_a_hand_edit_without_trailing_newline(tmp_path):
+    path = tmp_path / "employees.txt"
+    path.write_text("1,Asha\n2,Ravi")
+    
+    EmployeeDirectory(str(path)).add("3", "Meera")
+    EmployeeDirectory(str(path)).remove("1")
+    
+    assert EmployeeDirectory(str(path)).all() == {"2": "Ravi", "3": "Meera"}
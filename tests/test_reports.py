@@ -0,0 +1,56 @@
+import datetime
+
+import pandas as pd
+
+from conftest import make_flat_repo, record
+from reports import attendance_report
+from storage import SQLiteRepository
+
+
+RECORDS = [
+    record("007", "Bond", "P", "03-03-2025"),
+    record("12", "Asha", "A", "03-03-2025"),
+    record("12", "Asha", "P", "04-03-2025"),
+]
+
+
+def test_row_report_returns_text_ids():
+    df = pd.DataFrame([[7, "Bond", "P", "03-03-2025"], [12, "Asha", "A", "03-03-2025"]],
+                      columns=["Employee ID", "Employee Name", "Status", "Date"])
+    assert attendance_report(df)["Employee ID"].tolist() == ["7", "12"]
+
+
+def test_every_report_path_returns_the_same_text_ids(tmp_path, flat_repo):
+    flat = flat_repo
+    sqlite = SQLiteRepository(str(tmp_path / "ems.db"))
+    flat.append_attendance(RECORDS)
+    sqlite.append_attendance(RECORDS)
+    
+    whole_months = (None, None)
+    mid_month = (datetime.date(2025, 3, 2), datetime.date(2025, 3, 20))
+    for repo in (flat, sqlite):
+        for start, end in (whole_months, mid_month):
+            report = repo.attendance_report(start, end)
+            assert report["Employee ID"].tolist() == ["007", "12"]
+            assert report["Absent"].tolist() == [0, 1]
+    
+    # Marking a day twice sends the flat backend to the row-based report
+    flat.append_attendance([record("12", "Asha", "A", "04-03-2025")])
+    assert flat.attendance_report(*mid_month)["Employee ID"].tolist() == ["007", "12"]
+
+
+def test_summary_written_by_another_process_is_used(monkeypatch, tmp_path, flat_repo):
+    other = make_flat_repo(tmp_path)
+    flat_repo.append_attendance(RECORDS[:1])
+    assert other.attendance_report()["Present"].tolist() == [1]
+    
+    # The first repository keeps the shared summary current as it saves
+    flat_repo.append_attendance(RECORDS[1:])
+    
+    def rebuild(df, signature):
+        raise AssertionError("the current summary on disk was rebuilt")
+    
+    monkeypatch.setattr(other.summary, "rebuild", rebuild)
+    report = other.attendance_report()
+    assert report["Employee ID"].tolist() == ["007", "12"]
+    assert report["Present"].tolist() == [1, 1]
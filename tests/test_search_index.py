@@ -0,0 +1,60 @@
+from search_index import SearchIndex
+
+
+def make_index():
+    return SearchIndex.from_items([
+        ("1", "1 Asha Kumar"),
+        ("2", "2 Ravi Mani"),
+        ("3", "3 Asha Rao"),
+        ("12", "12 Ramesh Kumar"),
+    ])
+
+
+def test_remove_then_add_the_same_key():
+    index = make_index()
+    index.remove("2")
+    assert index.search("ravi") == []
+    assert "2" not in index
+    
+    index.add("2", "2 Priya Nair")
+    assert index.search("ravi") == []
+    assert index.search("mani") == []
+    assert index.search("priya") == ["2"]
+    assert index.search("ni") == []
+    # A re-added key counts as added last
+    assert index.search("") == ["1", "3", "12", "2"]
+    assert len(index) == 4
+
+
+def test_search_after_the_trigram_lists_are_rebuilt():
+    index = SearchIndex.from_items((str(emp_id), f"{emp_id} Employee {emp_id}") for emp_id in range(100))
+    for emp_id in range(60):
+        index.remove(str(emp_id))
+    # Removing most keys rebuilt the lists without their stale entries
+    assert index._stale < index._entries // 2
+    assert all("5" not in keys for keys in index._grams.values())
+    
+    index.add("5", "5 Asha Kumar")
+    assert index.search("employee 61") == ["61"]
+    assert index.search("employee 5") == []
+    assert index.search("asha") == ["5"]
+    assert index.search("loyee", limit=3) == ["60", "61", "62"]
+
+
+def test_multi_word_queries():
+    index = make_index()
+    assert index.search("asha kumar") == ["1"]
+    assert index.search("kumar asha") == ["1"]
+    assert index.search("asha") == ["1", "3"]
+    assert index.search("kumar 12") == ["12"]
+    assert index.search("asha nobody") == []
+
+
+def test_short_words_match_the_start_of_a_word():
+    index = make_index()
+    # "ra" starts "ravi", "rao" and "ramesh" but only appears inside "kumar"
+    assert index.search("ra") == ["2", "3", "12"]
+    assert index.search("as ra") == ["3"]
+    assert index.search("ku ra") == ["12"]
+    assert index.search("1") == ["1", "12"]
+    assert index.search("ma") == ["2"]
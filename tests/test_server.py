@@ -0,0 +1,134 @@
+import asyncio
+import datetime
+import json
+
+import pytest
+
+from conftest import make_flat_repo
+from reports import DATE_FORMAT
+from server import AttendanceService
+
+
+async def request(port, method, path, body=None, token=None):
+    """Send one HTTP request to the service and return (status, decoded JSON)"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    payload = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8") if body is not None else b""
+    authorization = f"Authorization: Bearer {token}\r\n" if token else ""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n{authorization}"
+                 f"Content-Length: {len(payload)}\r\n\r\n".encode("latin-1") + payload)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    result = json.loads(await reader.readexactly(length))
+    writer.close()
+    return status, result
+
+
+def run_service(tmp_path, scenario, **options):
+    repo = make_flat_repo(tmp_path)
+    repo.add_employees([(str(emp_id), f"Employee {emp_id}") for emp_id in range(1, 21)])
+    
+    async def main():
+        service = AttendanceService(repo, **options)
+        _, port = await service.start("127.0.0.1", 0)
+        try:
+            return await scenario(service, port)
+        finally:
+            await service.close()
+    
+    return repo, asyncio.run(main())
+
+
+def test_concurrent_check_ins_are_written_in_one_batch(tmp_path):
+    async def scenario(service, port):
+        responses = await asyncio.gather(*[
+            request(port, "POST", "/attendance", {"employee_id": str(emp_id), "status": "P"})
+            for emp_id in range(1, 21)
+        ])
+        return service, responses
+    
+    repo, (service, responses) = run_service(tmp_path, scenario, batch_window=0.5)
+    
+    assert all(response == (201, {"saved": 1}) for response in responses)
+    assert service.batches == 1
+    assert service.records_written == 20
+    assert len(repo.read_attendance()) == 20
+
+
+def test_report_and_errors(tmp_path):
+    async def scenario(service, port):
+        await request(port, "POST", "/attendance", {"records": [
+            {"employee_id": "1", "status": "P"},
+            {"employee_id": "2", "status": "A"},
+        ]})
+        return {
+            "report": await request(port, "GET", "/report"),
+            "dated": await request(port, "POST", "/attendance", {"employee_id": "3", "date": "03-03-2025"}),
+            "unknown_employee": await request(port, "POST", "/attendance", {"employee_id": "99"}),
+            "bad_status": await request(port, "POST", "/attendance", {"employee_id": "1", "status": "X"}),
+            "bad_json": await request(port, "POST", "/attendance", b"{not json"),
+            "bad_date": await request(port, "GET", "/report?start=2025-03-01"),
+            "wrong_method": await request(port, "DELETE", "/report"),
+            "missing": await request(port, "GET", "/nowhere"),
+        }
+    
+    repo, responses = run_service(tmp_path, scenario)
+    
+    status, report = responses["report"]
+    assert status == 200
+    assert report["rows"] == [["1", "Employee 1", 1, 0, 1, 100.0], ["2", "Employee 2", 0, 1, 1, 0.0]]
+    # Check-ins are always for today
+    assert repo.read_attendance()["Date"].unique().tolist() == [datetime.date.today().strftime(DATE_FORMAT)]
+    for case in ("dated", "unknown_employee", "bad_status", "bad_json", "bad_date"):
+        assert responses[case][0] == 400, case
+        assert "error" in responses[case][1]
+    assert responses["wrong_method"][0] == 405
+    assert responses["missing"][0] == 404
+
+
+def test_serve_command_answers_on_a_free_port(tmp_path):
+    import os
+    import subprocess
+    import sys
+    from urllib.request import urlopen
+    
+    main_py = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+    process = subprocess.Popen([sys.executable, "-u", main_py, "serve", "--port", "0"], cwd=tmp_path,
+                               stdout=subprocess.PIPE, text=True)
+    try:
+        url = process.stdout.readline().split()[-1]
+        with urlopen(f"{url}/health", timeout=10) as response:
+            assert response.status == 200
+            assert json.loads(response.read())["status"] == "ok"
+    finally:
+        process.terminate()
+        process.wait(10)
+
+
+def test_token_is_required_when_set(tmp_path):
+    async def scenario(service, port):
+        return {
+            "missing": await request(port, "GET", "/health"),
+            "wrong": await request(port, "POST", "/attendance", {"employee_id": "1"}, token="guess"),
+            "right": await request(port, "POST", "/attendance", {"employee_id": "1"}, token="s3cret"),
+        }
+    
+    repo, responses = run_service(tmp_path, scenario, token="s3cret")
+    
+    assert responses["missing"][0] == 401
+    assert responses["wrong"][0] == 401
+    assert responses["right"] == (201, {"saved": 1})
+    assert len(repo.read_attendance()) == 1
+
+
+def test_refuses_other_hosts_without_a_token(tmp_path):
+    service = AttendanceService(make_flat_repo(tmp_path))
+    with pytest.raises(ValueError):
+        asyncio.run(service.start("0.0.0.0", 0))
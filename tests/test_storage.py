@@ -0,0 +1,150 @@
+import os
+import threading
+
+from conftest import record
+
+
+def test_readers_during_writes_do_not_count_rows_twice(flat_repo):
+    repo = flat_repo
+    repo.append_attendance([record("1", "Asha", "P")])
+    repo.attendance_report()
+    repo.read_attendance(emp_id="1")
+    
+    # Run a reader right after each journal append, before the summary and partitions are updated
+    store = repo.attendance_store
+    append = store.append
+    readers = []
+    
+    def read_all():
+        repo.attendance_report()
+        repo.read_attendance(emp_id="1")
+        repo.read_attendance(emp_id="2")
+    
+    def append_then_read(records):
+        append(records)
+        reader = threading.Thread(target=read_all)
+        reader.start()
+        reader.join(0.1)
+        readers.append(reader)
+    
+    store.append = append_then_read
+    for day in range(1, 6):
+        repo.append_attendance([record("2", "Ravi", "A", f"{day:02d}-02-2025")])
+        repo.append_attendance([record("1", "Asha", "P", f"{day:02d}-02-2025")])
+    for reader in readers:
+        reader.join()
+    
+    report = repo.attendance_report().set_index("Employee ID")
+    assert report.loc["1", "Present"] == 6
+    assert report.loc["2", "Absent"] == 5
+    assert len(repo.read_attendance(emp_id="1")) == 6
+    assert len(repo.read_attendance(emp_id="2")) == 5
+
+
+def test_ids_with_leading_zeros_find_their_partition(flat_repo):
+    repo = flat_repo
+    repo.append_attendance([record("007", "Bond", "P"), record("7", "Seven", "A")])
+    
+    assert repo.read_attendance(emp_id="007")["Employee Name"].tolist() == ["Bond"]
+    assert repo.read_attendance(emp_id="7")["Employee Name"].tolist() == ["Seven"]
+    assert sorted(repo.by_employee.catalog()) == ["007", "7"]
+    
+    repo.compact()
+    assert repo.read_attendance(emp_id="007")["Employee Name"].tolist() == ["Bond"]
+
+
+def test_float_id_column_in_workbook(tmp_path, flat_repo):
+    import pandas as pd
+    
+    # A blank ID cell is enough for pandas to read the whole column as floats
+    pd.DataFrame([
+        ["03-03-2025", "09:00:00", 121, "Asha", "P"],
+        ["03-03-2025", "09:00:00", None, "Nobody", "P"],
+        ["04-03-2025", "09:00:00", 121, "Asha", "A"],
+    ], columns=["Date", "Time", "Employee ID", "Employee Name", "Status"]).to_excel(tmp_path / "attendance.xlsx", index=False)
+    repo = flat_repo
+    
+    assert repo.read_attendance(emp_id="121")["Status"].tolist() == ["P", "A"]
+    assert "121" in repo.by_employee.catalog()
+    assert "121.0" not in repo.by_employee.catalog()
+
+
+def test_migration_normalizes_employee_ids(tmp_path, flat_repo):
+    import pandas as pd
+    
+    from storage import SQLiteRepository, migrate_flat_to_sqlite
+    
+    pd.DataFrame([
+        ["03-03-2025", "09:00:00", 121, "Asha", "P"],
+        ["03-03-2025", "09:00:00", None, "Nobody", "P"],
+    ], columns=["Date", "Time", "Employee ID", "Employee Name", "Status"]).to_excel(tmp_path / "attendance.xlsx", index=False)
+    source = flat_repo
+    source.append_attendance([record("007", "Bond", "A")])
+    target = SQLiteRepository(str(tmp_path / "ems.db"))
+    
+    counts = migrate_flat_to_sqlite(source, target)
+    
+    assert counts["attendance"] == 2
+    assert counts["skipped"] == 1
+    assert target.read_attendance(emp_id="121")["Employee Name"].tolist() == ["Asha"]
+    assert target.read_attendance(emp_id="007")["Employee Name"].tolist() == ["Bond"]
+
+
+def test_saves_never_compact(flat_repo):
+    store = flat_repo.attendance_store
+    store.compact_threshold = 10
+    for day in range(1, 4):
+        flat_repo.append_attendance([record(str(i), date=f"{day:02d}-03-2025") for i in range(20)])
+    
+    assert flat_repo.needs_compaction()
+    assert not os.path.exists(store.excel_path)
+    assert flat_repo.compact() == 60
+    assert not flat_repo.needs_compaction()
+
+
+def test_saves_go_through_while_a_compaction_writes_the_workbook(monkeypatch, flat_repo):
+    import pandas as pd
+    
+    repo = flat_repo
+    store = repo.attendance_store
+    repo.append_attendance([record(str(i), date="01-03-2025") for i in range(10)])
+    repo.attendance_report()
+    repo.read_attendance(emp_id="1")
+    
+    # Hold the compaction in the middle of writing the new workbook until both writers are done
+    writing = threading.Event()
+    writers_done = threading.Event()
+    to_excel = pd.DataFrame.to_excel
+    
+    def slow_to_excel(df, *args, **kwargs):
+        writing.set()
+        writers_done.wait(10)
+        return to_excel(df, *args, **kwargs)
+    
+    monkeypatch.setattr(pd.DataFrame, "to_excel", slow_to_excel)
+    compaction = threading.Thread(target=repo.compact)
+    compaction.start()
+    assert writing.wait(10)
+    
+    def save(day):
+        for i in range(10):
+            repo.append_attendance([record(str(i), date=f"{day:02d}-03-2025")])
+    
+    writers = [threading.Thread(target=save, args=(day,)) for day in (2, 3)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join(5)
+    assert not any(writer.is_alive() for writer in writers)
+    assert len(repo.read_attendance()) == 30
+    
+    writers_done.set()
+    compaction.join()
+    
+    assert not os.path.exists(store.rotated_path)
+    assert store.journal_rows() == 20
+    assert len(pd.read_excel(store.excel_path)) == 10
+    report = repo.attendance_report().set_index("Employee ID")
+    assert report["Present"].tolist() == [3] * 10
+    assert len(repo.read_attendance(emp_id="1")) == 3
+    assert sum(len(chunk) for chunk in repo.iter_attendance()) == 30
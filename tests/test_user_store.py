@@ -0,0 +1,58 @@
+from user_store import User, UserStore
+
+
+def make_store(tmp_path):
+    path = tmp_path / "users.txt"
+    path.write_text("alice,pw1,manager,\nbob,pw2,employee,7\n")
+    store = UserStore(str(path))
+    store.refresh()
+    return path, store
+
+
+def record_loads(store):
+    """Wrap store._load to note the (offset, complete_lines_only) of every call"""
+    calls = []
+    load = store._load
+    
+    def recording_load(offset, complete_lines_only=False):
+        calls.append((offset, complete_lines_only))
+        return load(offset, complete_lines_only)
+    
+    store._load = recording_load
+    return calls
+
+
+def test_lines_appended_by_another_process_are_read_incrementally(tmp_path):
+    path, store = make_store(tmp_path)
+    size = path.stat().st_size
+    calls = record_loads(store)
+    with open(path, "a") as file:
+        file.write("carol,pw3,employee,8\n")
+    
+    assert store.authenticate("carol", "pw3", "employee") == User("carol", "pw3", "employee", "8")
+    assert calls == [(size, True)]
+    assert store.authenticate("alice", "pw1", "manager") is not None
+
+
+def test_a_half_written_last_line_waits_for_its_newline(tmp_path):
+    path, store = make_store(tmp_path)
+    with open(path, "a") as file:
+        file.write("carol,pw3,emp")
+    
+    assert not store.exists("carol")
+    with open(path, "a") as file:
+        file.write("loyee,8\n")
+    
+    assert store.authenticate("carol", "pw3", "employee") == User("carol", "pw3", "employee", "8")
+    assert not store.duplicates
+
+
+def test_a_file_rewritten_in_place_is_read_again(tmp_path):
+    path, store = make_store(tmp_path)
+    calls = record_loads(store)
+    path.write_text("alice,new,manager,\nbob,pw2,employee,7\ncarol,pw3,employee,8\n")
+    
+    assert store.authenticate("alice", "new", "manager") is not None
+    assert store.authenticate("alice", "pw1", "manager") is None
+    assert store.exists("carol")
+    assert calls == [(0, False)]
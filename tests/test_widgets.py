@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from widgets import VirtualTable, sort_index
+
+
+def sorted_values(values, descending=False):
+    """The column as VirtualTable shows it, sorted through the cached argsort"""
+    table = SimpleNamespace(columns=["Value"], _sort_column="Value", _sort_cache={},
+                            _rows=np.array([[value] for value in values], dtype=object), _descending=descending)
+    return [values[i] for i in VirtualTable._sorted_order(table)]
+
+
+def test_numbers_sort_numerically():
+    order, blanks = sort_index(["10", "9", "100", "9.5"])
+    assert [["10", "9", "100", "9.5"][i] for i in order] == ["9", "9.5", "10", "100"]
+    assert blanks == 0
+
+
+def test_dates_sort_by_date_across_years():
+    dates = ["01-02-2025", "31-12-2024", "15-01-2025", "02-01-2024"]
+    assert sorted_values(dates) == ["02-01-2024", "31-12-2024", "15-01-2025", "01-02-2025"]
+    assert sorted_values(dates, descending=True) == ["01-02-2025", "15-01-2025", "31-12-2024", "02-01-2024"]
+
+
+def test_blanks_stay_last_in_both_directions():
+    values = ["9", "", "10", None, " ", "1"]
+    _, blanks = sort_index(values)
+    assert blanks == 3
+    assert sorted_values(values)[:3] == ["1", "9", "10"]
+    assert sorted_values(values, descending=True)[:3] == ["10", "9", "1"]
+    assert all(value is None or not value.strip() for value in sorted_values(values, descending=True)[3:])
+
+
+def test_text_sorts_case_insensitively_and_stably():
+    values = ["bond", "Asha", "asha", "Ravi"]
+    assert sorted_values(values) == ["Asha", "asha", "bond", "Ravi"]
@@ -0,0 +1,132 @@
+import os
+from collections import namedtuple
+
+from concurrency import FileLock
+from file_utils import file_signature
+
+User = namedtuple("User", ["username", "password", "role", "emp_id"])
+
+# Bytes before the read offset compared on refresh to make sure the file was only appended to
+_TAIL_CHECK_BYTES = 64
+
+
+class UserStore:
+    """Accounts from the users file, indexed by username
+    
+    The file is parsed once into a dict and refreshed when its mtime or size
+    changes. When the file has only grown, just the appended lines are parsed.
+    Usernames registered more than once by older versions keep every record, so
+    those accounts can still log in, and are listed in ``duplicates``.
+    Registration holds a lock on users.txt.lock from the duplicate check to
+    the append, so two people cannot register the same name at once.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.users = {}
+        self.duplicates = set()
+        self._signature = None
+        self._offset = 0
+        self._tail = b""
+        self.lock = FileLock(path)
+    
+    def refresh(self):
+        """Bring the index up to date with the users file"""
+        signature = file_signature(self.path)
+        if signature == self._signature:
+            return
+        
+        if signature is None:
+            self._reset()
+        elif self._signature is not None and signature[1] > self._offset and self._is_append(signature):
+            self._load(self._offset, complete_lines_only=True)
+        else:
+            self._reset()
+            self._load(0)
+        self._signature = signature
+    
+    def _reset(self):
+        self.users = {}
+        self.duplicates = set()
+        self._signature = None
+        self._offset = 0
+        self._tail = b""
+    
+    def _is_append(self, signature):
+        """Check that the bytes already indexed are unchanged, i.e. the file was only appended to"""
+        start = self._offset - len(self._tail)
+        with open(self.path, "rb") as file:
+            file.seek(start)
+            return file.read(len(self._tail)) == self._tail
+    
+    def _load(self, offset, complete_lines_only=False):
+        """Index the lines of the users file starting at a byte offset"""
+        with open(self.path, "rb") as file:
+            file.seek(offset)
+            data = file.read()
+        
+        if complete_lines_only and not data.endswith(b"\n"):
+            # Leave a half-written last line for the next refresh
+            data = data[:data.rfind(b"\n") + 1]
+        
+        for line in data.decode("utf-8", errors="replace").splitlines():
+            self._index(line)
+        
+        self._offset = offset + len(data)
+        with open(self.path, "rb") as file:
+            start = max(self._offset - _TAIL_CHECK_BYTES, 0)
+            file.seek(start)
+            self._tail = file.read(self._offset - start)
+    
+    def _index(self, line):
+        parts = line.strip().split(",")
+        username = parts[0]
+        if not username:
+            return
+        
+        if username in self.users:
+            self.duplicates.add(username)
+        records = self.users.setdefault(username, [])
+        
+        # Lines without an employee ID column never could log in, but they still reserve the name
+        if len(parts) >= 4:  # username,password,role,emp_id
+            records.append(User(username, parts[1], parts[2], parts[3] if parts[3] else None))
+    
+    def exists(self, username):
+        """Check whether a username is already registered"""
+        self.refresh()
+        return username in self.users
+    
+    def authenticate(self, username, password, role):
+        """Return the matching account, or None if the credentials or role are wrong"""
+        self.refresh()
+        for user in self.users.get(username, ()):
+            if user.password == password and user.role == role:
+                return user
+        return None
+    
+    def add(self, username, password, role, emp_id=None):
+        """Append a new account to the users file and the index"""
+        with self.lock:
+            return self._add(username, password, role, emp_id)
+    
+    def _add(self, username, password, role, emp_id):
+        self.refresh()
+        if username in self.users:
+            raise ValueError(f"Username '{username}' already exists!")
+        
+        needs_newline = False
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, "rb") as file:
+                file.seek(-1, os.SEEK_END)
+                needs_newline = file.read(1) != b"\n"
+        
+        line = f"{username},{password},{role},{emp_id if emp_id else ''}\n"
+        with open(self.path, "a") as file:
+            if needs_newline:
+                file.write("\n")
+            file.write(line)
+        
+        # Pick up exactly what was appended without re-reading the rest of the file
+        self.refresh()
+        return self.users[username][0]
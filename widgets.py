@@ -0,0 +1,538 @@
+import tkinter as tk
+from tkinter import ttk
+
+from reports import STATUS_CODES, parse_dates
+from search_index import SearchIndex
+
+# Tk modifier bits in event.state
+_SHIFT_MASK = 0x0001
+_CONTROL_MASK = 0x0004
+_SORT_ARROWS = {False: " \u25b2", True: " \u25bc"}
+
+
+def sort_index(values):
+    """Return (order, blanks): a stable ascending argsort of a column, with its blank values last
+    
+    A column whose values all read as numbers sorts numerically and one
+    whose values are all DD-MM-YYYY dates sorts by date; anything else sorts
+    as case-insensitive text. blanks is how many positions at the end of the
+    order are blank values.
+    
+    Only the distinct values are parsed and compared; the rows are then
+    ordered by the integer rank of their value.
+    """
+    import numpy as np
+    import pandas as pd
+    
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+    uniques = pd.Series(uniques, dtype=object)
+    blank = (uniques.isna() | (uniques.astype(str).str.strip() == "")).to_numpy()
+    filled = uniques[~blank]
+    keys = pd.to_numeric(filled, errors="coerce")
+    if keys.isna().any():
+        keys = parse_dates(filled.astype(str))
+        if keys.isna().any():
+            keys = filled.astype(str).str.lower()
+    keys = keys.to_numpy(dtype=str) if keys.dtype == object else keys.to_numpy()
+    
+    # Rank the distinct values (blanks after everything else), then sort the rows by rank
+    rank = np.empty(len(uniques), dtype=np.int64)
+    ranked = np.concatenate([np.flatnonzero(~blank)[np.argsort(keys, kind="stable")], np.flatnonzero(blank)])
+    rank[ranked] = np.arange(len(uniques))
+    order = np.argsort(rank[codes], kind="stable")
+    return order, int(np.count_nonzero(blank[codes]))
+
+
+class VirtualTable(ttk.Frame):
+    """Treeview that materializes only the rows in its viewport
+    
+    The data stays in a 2-D array (or any sequence of row sequences). The
+    Treeview only holds a pool of about one screenful of items whose values are
+    rewritten as the user scrolls, so filling or scrolling the table costs the
+    same with a hundred rows as with a million.
+    
+    Clicking a heading sorts by that column (again to reverse it). Sorting
+    only reorders a permutation of the row indexes, and the argsort of each
+    column is cached until the rows are replaced, so switching back and forth
+    between columns is a lookup. Indexes passed to and returned by the
+    table's methods always refer to rows(), whatever the sort order. With
+    paged=True a bar under the table steps through the rows a screenful at a
+    time.
+    """
+    
+    def __init__(self, parent, columns, column_width=120, selectmode="extended", horizontal_scroll=True, paged=False):
+        super().__init__(parent)
+        self.columns = list(columns)
+        self.column_width = column_width
+        self._rows = []
+        self._order = None
+        self._sort_column = None
+        self._descending = False
+        self._sort_cache = {}
+        self._page_var = None
+        self._first = 0
+        self._visible = 30
+        self._items = []
+        self._selected = set()
+        self._synced_selection = set()
+        self._extend_selection = False
+        
+        self.tree = ttk.Treeview(self, columns=self.columns, show="headings", selectmode=selectmode)
+        self._configure_columns()
+        
+        self.scroll_y = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.tree.grid(row=0, column=0, sticky=tk.NSEW)
+        self.scroll_y.grid(row=0, column=1, sticky=tk.NS)
+        if horizontal_scroll:
+            scroll_x = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.tree.xview)
+            self.tree.configure(xscrollcommand=scroll_x.set)
+            scroll_x.grid(row=1, column=0, sticky=tk.EW)
+        if paged:
+            self._build_page_bar().grid(row=2, column=0, columnspan=2, sticky=tk.EW, pady=(5, 0))
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+        
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(3))
+        self.tree.bind("<Button-1>", self._on_click, add="+")
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<Up>", lambda e: self._on_arrow(-1))
+        self.tree.bind("<Down>", lambda e: self._on_arrow(1))
+        self.tree.bind("<Prior>", lambda e: self._scroll_by(-self._visible))
+        self.tree.bind("<Next>", lambda e: self._scroll_by(self._visible))
+        self.tree.bind("<Home>", lambda e: self.scroll_to(0))
+        self.tree.bind("<End>", lambda e: self.scroll_to(len(self._rows)))
+    
+    def _build_page_bar(self):
+        bar = ttk.Frame(self)
+        ttk.Button(bar, text="<<", width=3, command=lambda: self.show_page(1)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(bar, text="<", width=3, command=lambda: self.show_page(self.current_page() - 1)).pack(side=tk.LEFT, padx=2)
+        ttk.Label(bar, text="Page").pack(side=tk.LEFT, padx=(5, 2))
+        self._page_var = tk.StringVar(value="1")
+        page_entry = ttk.Entry(bar, textvariable=self._page_var, width=7)
+        page_entry.pack(side=tk.LEFT)
+        page_entry.bind("<Return>", lambda e: self._go_to_typed_page())
+        self._page_label = ttk.Label(bar)
+        self._page_label.pack(side=tk.LEFT, padx=(2, 5))
+        ttk.Button(bar, text=">", width=3, command=lambda: self.show_page(self.current_page() + 1)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(bar, text=">>", width=3, command=lambda: self.show_page(self.page_count())).pack(side=tk.LEFT, padx=2)
+        self._rows_label = ttk.Label(bar)
+        self._rows_label.pack(side=tk.RIGHT, padx=5)
+        return bar
+    
+    def _configure_columns(self):
+        for col in self.columns:
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
+            self.tree.column(col, width=self.column_width, anchor=tk.CENTER)
+    
+    def _update_headings(self):
+        for col in self.columns:
+            arrow = _SORT_ARROWS[self._descending] if col == self._sort_column else ""
+            self.tree.heading(col, text=f"{col}{arrow}")
+    
+    def set_columns(self, columns):
+        """Switch the table to a different set of columns, dropping the current rows"""
+        self.columns = list(columns)
+        self._sort_column = None
+        self.clear()
+        self.tree.configure(columns=self.columns)
+        self._configure_columns()
+    
+    def set_rows(self, rows):
+        """Replace the table contents with a DataFrame or a sequence of rows"""
+        if hasattr(rows, "to_numpy"):
+            rows = rows.to_numpy(dtype=object)
+        self._rows = rows
+        self._sort_cache = {}
+        self._order = self._sorted_order() if self._sort_column is not None else None
+        self._first = 0
+        self._selected = set()
+        self._render()
+    
+    def clear(self):
+        """Remove all rows"""
+        self.set_rows([])
+    
+    def rows(self):
+        """Return the rows currently held by the table"""
+        return self._rows
+    
+    def sort_by(self, column, descending=None):
+        """Show the rows ordered by a column; by default ascending, or reversed if already sorted by it"""
+        if descending is None:
+            descending = column == self._sort_column and not self._descending
+        self._sort_column = column
+        self._descending = descending
+        self._order = self._sorted_order()
+        self._first = 0
+        self._update_headings()
+        self._render()
+    
+    def _sorted_order(self):
+        """The display order for the current sort column and direction, from the cached argsort"""
+        import numpy as np
+        
+        position = self.columns.index(self._sort_column)
+        cached = self._sort_cache.get(position)
+        if cached is None:
+            if hasattr(self._rows, "ndim") and self._rows.ndim == 2:
+                values = self._rows[:, position]
+            else:
+                values = [row[position] for row in self._rows]
+            cached = self._sort_cache[position] = sort_index(values)
+        order, blanks = cached
+        if not self._descending:
+            return order
+        filled = len(order) - blanks
+        return np.concatenate([order[:filled][::-1], order[filled:]])
+    
+    def _data_index(self, position):
+        """Index in rows() of the row shown at a display position"""
+        return position if self._order is None else int(self._order[position])
+    
+    def __len__(self):
+        return len(self._rows)
+    
+    def row_values(self, index):
+        """Return the display values of one row"""
+        return tuple("" if value is None or value != value else value for value in self._rows[index])
+    
+    def index_of(self, item):
+        """Return the data index shown by a Treeview item, or None for items outside the pool"""
+        if item not in self._items:
+            return None
+        return self._data_index(self._first + self._items.index(item))
+    
+    def refresh(self):
+        """Redraw the visible rows after the row data was changed in place
+        
+        The rows keep their current order; the cached sort indexes are
+        dropped so the next sort sees the new values.
+        """
+        self._sort_cache = {}
+        self._render()
+    
+    def selected_rows(self):
+        """Return the data indexes of the selected rows, including ones scrolled out of view"""
+        return sorted(self._selected)
+    
+    def scroll_to(self, first):
+        """Show the window of rows starting at the given index"""
+        first = max(0, min(int(first), len(self._rows) - self._visible))
+        if first != self._first:
+            self._first = first
+            self._render()
+    
+    def _scroll_by(self, step):
+        self.scroll_to(self._first + step)
+        return "break"
+    
+    def page_count(self):
+        return max(1, -(-len(self._rows) // self._visible))
+    
+    def current_page(self):
+        """1-based number of the page holding the first visible row"""
+        if self._first + self._visible >= len(self._rows):
+            return self.page_count()
+        return self._first // self._visible + 1
+    
+    def show_page(self, number):
+        """Scroll to a page of one screenful of rows"""
+        number = max(1, min(int(number), self.page_count()))
+        self.scroll_to((number - 1) * self._visible)
+    
+    def _go_to_typed_page(self):
+        try:
+            self.show_page(int(self._page_var.get().replace(",", "")))
+        except ValueError:
+            pass
+        self._render()
+    
+    def _update_page_bar(self, count):
+        total = len(self._rows)
+        self._page_var.set(str(self.current_page()))
+        self._page_label.configure(text=f"of {self.page_count():,}")
+        if total:
+            self._rows_label.configure(text=f"Rows {self._first + 1:,}-{self._first + count:,} of {total:,}")
+        else:
+            self._rows_label.configure(text="No rows")
+    
+    def _render(self):
+        """Rewrite the item pool with the rows in the viewport"""
+        total = len(self._rows)
+        count = max(0, min(self._visible, total - self._first))
+        
+        while len(self._items) < count:
+            self._items.append(self.tree.insert("", tk.END))
+        while len(self._items) > count:
+            self.tree.delete(self._items.pop())
+        
+        selected_items = []
+        for offset, item in enumerate(self._items):
+            index = self._data_index(self._first + offset)
+            self.tree.item(item, values=self.row_values(index))
+            if index in self._selected:
+                selected_items.append(item)
+        
+        # <<TreeviewSelect>> arrives later from the event queue; remember what we set so it can be ignored
+        self._synced_selection = set(selected_items)
+        self.tree.selection_set(selected_items)
+        
+        if total:
+            self.scroll_y.set(self._first / total, (self._first + count) / total)
+        else:
+            self.scroll_y.set(0, 1)
+        if self._page_var is not None:
+            self._update_page_bar(count)
+    
+    def _on_resize(self, event):
+        row_height = ttk.Style().lookup("Treeview", "rowheight")
+        row_height = int(row_height) if row_height else 20
+        # Leave room for the heading row so the Treeview never scrolls on its own
+        visible = max(1, (event.height - row_height - 6) // row_height)
+        if visible != self._visible:
+            self._visible = visible
+            self._first = max(0, min(self._first, len(self._rows) - self._visible))
+            self._render()
+    
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * len(self._rows))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self._visible
+            self._scroll_by(step)
+    
+    def _on_mousewheel(self, event):
+        step = -1 if event.delta > 0 else 1
+        return self._scroll_by(step * 3)
+    
+    def _on_click(self, event):
+        self._extend_selection = bool(event.state & (_SHIFT_MASK | _CONTROL_MASK))
+    
+    def _on_select(self, event):
+        selection = set(self.tree.selection())
+        if selection == self._synced_selection:
+            return
+        if not self._extend_selection:
+            self._selected = set()
+        for offset, item in enumerate(self._items):
+            index = self._data_index(self._first + offset)
+            if item in selection:
+                self._selected.add(index)
+            else:
+                self._selected.discard(index)
+        self._synced_selection = selection
+        self._extend_selection = False
+    
+    def _on_arrow(self, step):
+        """Scroll the window when the keyboard cursor moves past its edge"""
+        focus = self.tree.focus()
+        if focus not in self._items:
+            return None
+        position = self._items.index(focus)
+        at_edge = (step < 0 and position == 0) or (step > 0 and position == len(self._items) - 1)
+        if not at_edge:
+            return None
+        
+        target = self._first + position + step
+        if 0 <= target < len(self._rows):
+            self.scroll_to(self._first + step)
+            self._selected = {self._data_index(target)}
+            self._render()
+            self.tree.focus(self._items[target - self._first])
+        return "break"
+
+
+class SearchEntry(ttk.Frame):
+    """Labelled entry that calls on_search(text) once typing pauses, so each keystroke does not refilter"""
+    
+    DELAY_MS = 150
+    
+    def __init__(self, parent, on_search, label="Search:", width=30):
+        super().__init__(parent)
+        self._on_search = on_search
+        self._job = None
+        if label:
+            ttk.Label(self, text=label).pack(side=tk.LEFT)
+        self.var = tk.StringVar()
+        self.entry = ttk.Entry(self, textvariable=self.var, width=width)
+        self.entry.pack(side=tk.LEFT, padx=5)
+        self.var.trace_add("write", lambda *args: self._schedule())
+    
+    def get(self):
+        return self.var.get().strip()
+    
+    def set(self, text):
+        self.var.set(text)
+    
+    def focus_set(self):
+        self.entry.focus_set()
+    
+    def _schedule(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+        self._job = self.after(self.DELAY_MS, self._search)
+    
+    def _search(self):
+        self._job = None
+        self._on_search(self.get())
+
+
+class EmployeePicker(ttk.Frame):
+    """Type-ahead employee chooser: an entry with the best matches from a SearchIndex listed under it"""
+    
+    MAX_SUGGESTIONS = 8
+    
+    def __init__(self, parent, employees, index):
+        super().__init__(parent)
+        self.employees = employees
+        self.index = index
+        
+        self.search = SearchEntry(self, self._suggest, label="Employee:", width=28)
+        self.search.pack(fill=tk.X)
+        self.suggestions = tk.Listbox(self, height=self.MAX_SUGGESTIONS, activestyle="none", exportselection=False)
+        self.suggestions.pack(fill=tk.X, pady=(5, 0))
+        self._ids = []
+        
+        self.suggestions.bind("<<ListboxSelect>>", self._on_pick)
+        self.search.entry.bind("<Down>", self._focus_suggestions)
+    
+    def selected_id(self):
+        """The employee ID typed or picked, or the only match of what was typed"""
+        text = self.search.get()
+        if text in self.employees:
+            return text
+        matches = self.index.search(text, limit=2) if text else []
+        return matches[0] if len(matches) == 1 else text
+    
+    def set(self, emp_id):
+        self.search.set(emp_id)
+    
+    def focus_set(self):
+        self.search.focus_set()
+    
+    def _suggest(self, text):
+        self._ids = self.index.search(text, limit=self.MAX_SUGGESTIONS) if text else []
+        self.suggestions.delete(0, tk.END)
+        for emp_id in self._ids:
+            self.suggestions.insert(tk.END, f"{emp_id} - {self.employees.get(emp_id, '')}")
+    
+    def _on_pick(self, event):
+        selection = self.suggestions.curselection()
+        if selection:
+            self.search.set(self._ids[selection[0]])
+    
+    def _focus_suggestions(self, event):
+        if self._ids:
+            self.suggestions.focus_set()
+            self.suggestions.selection_set(0)
+            self.suggestions.event_generate("<<ListboxSelect>>")
+        return "break"
+
+
+class AttendanceGrid(ttk.Frame):
+    """Present/Absent editor for the whole roster in a single VirtualTable
+    
+    Clicking a row's Status cell (or pressing Space on selected rows) toggles
+    it, and the bulk buttons act on everyone, on the selection or on the rows
+    matching the search box. Only the visible rows are ever Tk items, so the
+    grid opens instantly with tens of thousands of employees. Searching uses
+    the SearchIndex passed in (keyed by employee ID), or one built here.
+    """
+    
+    COLUMNS = ["Employee ID", "Employee Name", "Status"]
+    
+    def __init__(self, parent, employees, default="P", index=None):
+        super().__init__(parent)
+        self._ids = list(employees)
+        self._names = [employees[emp_id] for emp_id in self._ids]
+        self._status = [default] * len(self._ids)
+        self._positions = {emp_id: position for position, emp_id in enumerate(self._ids)}
+        self._index = index if index is not None else SearchIndex.from_items((emp_id, f"{emp_id} {employees[emp_id]}") for emp_id in self._ids)
+        self._shown = list(range(len(self._ids)))
+        
+        search_frame = ttk.Frame(self)
+        search_frame.pack(fill=tk.X, pady=(0, 5))
+        self.search_entry = SearchEntry(search_frame, self._search)
+        self.search_entry.pack(side=tk.LEFT)
+        self.summary = ttk.Label(search_frame)
+        self.summary.pack(side=tk.RIGHT)
+        
+        self.table = VirtualTable(self, self.COLUMNS, column_width=180, horizontal_scroll=False)
+        self.table.pack(fill=tk.BOTH, expand=True)
+        self.table.tree.bind("<Button-1>", self._on_click, add="+")
+        self.table.tree.bind("<space>", lambda e: self.invert_selected())
+        
+        actions = ttk.Frame(self)
+        actions.pack(fill=tk.X, pady=(5, 0))
+        ttk.Button(actions, text="All Present", command=lambda: self.mark_all("P")).pack(side=tk.LEFT, padx=2)
+        ttk.Button(actions, text="Invert Selected", command=self.invert_selected).pack(side=tk.LEFT, padx=2)
+        ttk.Button(actions, text="Shown Present", command=lambda: self.mark_shown("P")).pack(side=tk.LEFT, padx=2)
+        ttk.Button(actions, text="Shown Absent", command=lambda: self.mark_shown("A")).pack(side=tk.LEFT, padx=2)
+        
+        self._show()
+        self.search_entry.focus_set()
+    
+    def statuses(self):
+        """Return the chosen status code for every employee ID"""
+        return dict(zip(self._ids, self._status))
+    
+    def mark_all(self, status):
+        self._status = [status] * len(self._ids)
+        self._relabel()
+    
+    def mark_shown(self, status):
+        """Apply a status to the employees matching the search"""
+        for index in self._shown:
+            self._status[index] = status
+        self._relabel()
+    
+    def invert_selected(self):
+        for position in self.table.selected_rows():
+            index = self._shown[position]
+            self._status[index] = "A" if self._status[index] == "P" else "P"
+        self._relabel()
+        return "break"
+    
+    def _on_click(self, event):
+        tree = self.table.tree
+        if tree.identify_region(event.x, event.y) != "cell" or tree.identify_column(event.x) != "#3":
+            return None
+        position = self.table.index_of(tree.identify_row(event.y))
+        if position is not None:
+            index = self._shown[position]
+            self._status[index] = "A" if self._status[index] == "P" else "P"
+            self._relabel()
+        return None
+    
+    def _search(self, text):
+        if text:
+            positions = self._positions
+            self._shown = sorted(positions[emp_id] for emp_id in self._index.search(text) if emp_id in positions)
+        else:
+            self._shown = list(range(len(self._ids)))
+        self._show()
+    
+    def _show(self):
+        """Load the rows matching the search into the table"""
+        self.table.set_rows([
+            [self._ids[index], self._names[index], STATUS_CODES[self._status[index]]] for index in self._shown
+        ])
+        self._update_summary()
+    
+    def _relabel(self):
+        """Update the Status column in place, keeping the scroll position and selection"""
+        rows = self.table.rows()
+        for position, index in enumerate(self._shown):
+            rows[position][2] = STATUS_CODES[self._status[index]]
+        self.table.refresh()
+        self._update_summary()
+    
+    def _update_summary(self):
+        present = self._status.count("P")
+        self.summary.configure(text=f"Present: {present:,}   Absent: {len(self._status) - present:,}   "
+                                    f"Shown: {len(self._shown):,}")